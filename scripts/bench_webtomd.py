@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import argparse
+import random
+import subprocess
+import sys
+import textwrap
+import time
+from typing import Callable, List
+
+from markdownify import MarkdownConverter
+
+from webtomd.convert.html_to_markdown import to_markdown
+from webtomd.convert.wrap import reflow_paragraphs
+from webtomd.normalize.html_cleaner import to_clean_html
+
+
+WORDS = (
+    "the quick brown fox jumps over lazy dog markdown converter paragraph wrap "
+    "performance engineering throughput latency `inline_code()` [a link](https://example.com/x) "
+    "lorem ipsum dolor sit amet consectetur adipiscing elit"
+).split()
+
+
+def synthetic_markdown(size_mb: float, seed: int = 0) -> str:
+    """Build a Markdown document mixing prose, lists, tables, quotes and code."""
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    parts: List[str] = []
+    total = 0
+    n = 0
+    while total < target:
+        n += 1
+        kind = n % 6
+        if kind == 0:
+            block = f"## Section {n}"
+        elif kind == 1:
+            block = "\n".join(f"{i}. " + " ".join(rng.choices(WORDS, k=rng.randint(5, 30))) for i in range(1, 13))
+        elif kind == 2:
+            block = "| a | b |\n| --- | --- |\n" + "\n".join(f"| {i} | {i * 2} |" for i in range(10))
+        elif kind == 3:
+            block = "```\n" + "\n".join(" ".join(rng.choices(WORDS, k=15)) for _ in range(5)) + "\n```"
+        elif kind == 4:
+            block = "> " + " ".join(rng.choices(WORDS, k=20))
+        else:
+            block = " ".join(rng.choices(WORDS, k=rng.randint(40, 400)))
+        parts.append(block)
+        total += len(block) + 2
+    return "\n\n".join(parts) + "\n"
+
+
+def legacy_reflow(md: str, width: int = 80) -> str:
+    # Reference implementation from 0.1.0 (textwrap-based), kept for comparison
+    lines = md.splitlines()
+    out = []
+    in_code = False
+    in_table = False
+    buf = []
+
+    def flush_buf():
+        nonlocal buf
+        if not buf:
+            return
+        para = " ".join([l.strip() for l in buf])
+        out.extend(textwrap.fill(para, width=width).splitlines())
+        buf = []
+
+    for line in lines:
+        if line.strip().startswith("```"):
+            flush_buf()
+            in_code = not in_code
+            out.append(line)
+            continue
+        if in_code:
+            out.append(line)
+            continue
+        if "|" in line:
+            flush_buf()
+            out.append(line)
+            in_table = True if line.strip() else in_table
+            continue
+        if in_table and not line.strip():
+            in_table = False
+            out.append(line)
+            continue
+        if not line.strip():
+            flush_buf()
+            out.append("")
+            continue
+        if line.lstrip().startswith(("#", ">", "- ", "* ", "1. ")):
+            flush_buf()
+            out.append(line)
+            continue
+        buf.append(line)
+    flush_buf()
+    out.append("")
+    return "\n".join(out)
+
+
+class LegacyTableConverter(MarkdownConverter):
+    # convert_table from 0.1.0 (find_all + find_parent per row), kept for comparison
+    def _el_text(self, el) -> str:
+        return " ".join(" ".join(list(el.stripped_strings)).split())
+
+    def convert_table(self, el, text, parent_tags):
+        rows = []
+        header = []
+        thead = el.find("thead")
+        if thead is not None:
+            tr = thead.find("tr")
+            if tr is not None:
+                header = [self._el_text(td) for td in tr.find_all(["th", "td"]) or []]
+        trs = [tr for tr in el.find_all("tr") if tr.find_parent("thead") is None]
+        if not header and trs:
+            header = [self._el_text(td) for td in trs.pop(0).find_all(["th", "td"]) or []]
+        for tr in trs:
+            cells = tr.find_all("td") or tr.find_all("th")
+            if cells:
+                rows.append([self._el_text(td) for td in cells])
+        n = len(header)
+        parts = ["", "| " + " | ".join(header) + " |", "| " + " | ".join(["---"] * n) + " |"]
+        for r in rows:
+            parts.append("| " + " | ".join((r + [""] * n)[:n]) + " |")
+        parts.append("")
+        return "\n".join(parts)
+
+
+def synthetic_table(rows: int, cols: int = 6) -> str:
+    head = "".join(f"<th>col {c}</th>" for c in range(cols))
+    body = "".join("<tr>" + "".join(f"<td>r{r} <b>c{c}</b></td>" for c in range(cols)) + "</tr>" for r in range(rows))
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def _time(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_wrap(args: argparse.Namespace) -> None:
+    md = synthetic_markdown(args.size_mb)
+    mb = len(md.encode("utf-8")) / (1024 * 1024)
+    print(f"wrap: {mb:.2f} MB synthetic Markdown, width={args.width}, best of {args.repeat}")
+    for name, fn in (
+        ("reflow_paragraphs", lambda: reflow_paragraphs(md, width=args.width)),
+        ("legacy textwrap", lambda: legacy_reflow(md, width=args.width)),
+    ):
+        secs = _time(fn, args.repeat)
+        print(f"  {name:<20} {secs * 1000:9.1f} ms  {mb / secs:8.2f} MB/s")
+
+
+def bench_tables(args: argparse.Namespace) -> None:
+    src = synthetic_table(args.rows)
+    print(f"tables: {args.rows} rows x 6 columns, best of {args.repeat}")
+    legacy = LegacyTableConverter(bullets="*", escape_asterisks=False, strip="\n")
+    root = to_clean_html(f"<main>{src}</main>")
+    for name, fn in (
+        ("render_table", lambda: to_markdown(root)),
+        ("legacy markdownify", lambda: legacy.convert(src)),
+    ):
+        secs = _time(fn, args.repeat)
+        print(f"  {name:<20} {secs * 1000:9.1f} ms  {args.rows / secs:10.0f} rows/s")
+
+
+def _importtime(module: str) -> List[tuple]:
+    # Parse `python -X importtime` output into (cumulative_us, self_us, module)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        rows.append((int(parts[1]), int(parts[0].split(":")[-1]), parts[2].strip()))
+    return rows
+
+
+def bench_startup(args: argparse.Namespace) -> None:
+    heavy = "import webtomd.pipeline, webtomd.convert.html_to_markdown, webtomd.fetchers.http_fetcher, webtomd.evaluate.heuristics"
+    cases = (
+        ("webtomd --version", [sys.executable, "-m", "webtomd", "--version"]),
+        ("import webtomd.cli", [sys.executable, "-c", "import webtomd.cli"]),
+        ("import webtomd.pipeline", [sys.executable, "-c", "import webtomd.pipeline"]),
+        ("HTTP conversion deps", [sys.executable, "-c", heavy]),
+        ("bare interpreter", [sys.executable, "-c", "pass"]),
+    )
+    print(f"startup: best wall time of {args.repeat} runs")
+    for name, cmd in cases:
+        secs = _time(lambda: subprocess.run(cmd, check=True, capture_output=True), args.repeat)
+        print(f"  {name:<24} {secs * 1000:8.1f} ms")
+    rows = _importtime(args.module)
+    print(f"slowest imports under {args.module} (cumulative / self, ms):")
+    for cum, own, mod in sorted(rows, reverse=True)[: args.top]:
+        print(f"  {cum / 1000:8.1f} {own / 1000:8.1f}  {mod}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Micro-benchmarks for webtomd hot paths")
+    sub = p.add_subparsers(dest="bench", required=True)
+    w = sub.add_parser("wrap", help="Paragraph reflow throughput")
+    w.add_argument("--size-mb", type=float, default=4.0, help="Size of the synthetic document")
+    w.add_argument("--width", type=int, default=80)
+    w.add_argument("--repeat", type=int, default=3)
+    w.set_defaults(func=bench_wrap)
+    t = sub.add_parser("tables", help="Pipe-table rendering of one large table")
+    t.add_argument("--rows", type=int, default=10000)
+    t.add_argument("--repeat", type=int, default=3)
+    t.set_defaults(func=bench_tables)
+    s = sub.add_parser("startup", help="Interpreter start and import time of the CLI")
+    s.add_argument("--repeat", type=int, default=5)
+    s.add_argument("--module", default="webtomd.cli", help="Module for the import-time breakdown")
+    s.add_argument("--top", type=int, default=15)
+    s.set_defaults(func=bench_startup)
+    args = p.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""In-process stand-in for a Redis server: the commands RedisQueue uses, over RESP2."""
+
+import socketserver
+import threading
+import time
+
+
+def _bulk(value):
+    if value is None:
+        return b"$-1\r\n"
+    data = str(value).encode("utf-8")
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+def _encode(value):
+    if isinstance(value, bool):
+        return b":%d\r\n" % int(value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode(v) for v in value)
+    if isinstance(value, Exception):
+        return b"-ERR %s\r\n" % str(value).encode()
+    if value == "OK":
+        return b"+OK\r\n"
+    return _bulk(value)
+
+
+def _score(s):
+    return {"-inf": float("-inf"), "+inf": float("inf"), "inf": float("inf")}.get(s) or float(s)
+
+
+class Store:
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.lock = threading.Lock()
+
+    def _get(self, key, default=None):
+        deadline = self.expires.get(key)
+        if deadline is not None and time.monotonic() >= deadline:
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key, default)
+
+    def call(self, name, *args):
+        with self.lock:
+            try:
+                return getattr(self, "cmd_" + name.lower())(*args)
+            except Exception as exc:
+                return exc
+
+    def cmd_ping(self):
+        return "OK"
+
+    def cmd_auth(self, *args):
+        return "OK"
+
+    def cmd_select(self, db):
+        return "OK"
+
+    def cmd_get(self, key):
+        return self._get(key)
+
+    def cmd_set(self, key, value, *opts):
+        opts = [o.upper() for o in opts]
+        exists = self._get(key) is not None
+        if ("NX" in opts and exists) or ("XX" in opts and not exists):
+            return None
+        self.data[key] = value
+        self.expires.pop(key, None)
+        if "PX" in opts:
+            self.expires[key] = time.monotonic() + int(opts[opts.index("PX") + 1]) / 1000
+        return "OK"
+
+    def cmd_del(self, *keys):
+        n = 0
+        for key in keys:
+            if self._get(key) is not None:
+                n += 1
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return n
+
+    def cmd_pexpire(self, key, ms):
+        if self._get(key) is None:
+            return 0
+        self.expires[key] = time.monotonic() + int(ms) / 1000
+        return 1
+
+    def _hash(self, key):
+        return self.data.setdefault(key, {}) if self._get(key) is None else self.data[key]
+
+    def cmd_hset(self, key, *pairs):
+        h = self._hash(key)
+        new = sum(1 for f in pairs[::2] if f not in h)
+        h.update(zip(pairs[::2], pairs[1::2]))
+        return new
+
+    def cmd_hsetnx(self, key, field, value):
+        h = self._hash(key)
+        if field in h:
+            return 0
+        h[field] = value
+        return 1
+
+    def cmd_hget(self, key, field):
+        return (self._get(key) or {}).get(field)
+
+    def cmd_hgetall(self, key):
+        return [x for kv in (self._get(key) or {}).items() for x in kv]
+
+    def cmd_hincrby(self, key, field, n):
+        h = self._hash(key)
+        h[field] = str(int(h.get(field, 0)) + int(n))
+        return int(h[field])
+
+    def cmd_sadd(self, key, *members):
+        s = self.data.setdefault(key, set())
+        new = len(set(members) - s)
+        s.update(members)
+        return new
+
+    def cmd_srem(self, key, *members):
+        s = self._get(key) or set()
+        n = len(s & set(members))
+        s.difference_update(members)
+        return n
+
+    def cmd_smembers(self, key):
+        return sorted(self._get(key) or ())
+
+    def cmd_zadd(self, key, *args):
+        flags = []
+        while args and args[0].upper() in ("NX", "XX", "CH"):
+            flags.append(args[0].upper())
+            args = args[1:]
+        z = self.data.setdefault(key, {})
+        added = 0
+        for score, member in zip(args[::2], args[1::2]):
+            if ("NX" in flags and member in z) or ("XX" in flags and member not in z):
+                continue
+            added += member not in z
+            z[member] = float(score)
+        return added
+
+    def cmd_zrem(self, key, *members):
+        z = self._get(key) or {}
+        return sum(1 for m in members if z.pop(m, None) is not None)
+
+    def _sorted(self, key):
+        return sorted((self._get(key) or {}).items(), key=lambda kv: (kv[1], kv[0]))
+
+    def cmd_zrangebyscore(self, key, lo, hi, *opts):
+        items = [m for m, s in self._sorted(key) if _score(lo) <= s <= _score(hi)]
+        if opts and opts[0].upper() == "LIMIT":
+            offset, count = int(opts[1]), int(opts[2])
+            items = items[offset : offset + count]
+        return items
+
+    def cmd_zrange(self, key, start, stop, *opts):
+        items = self._sorted(key)
+        stop = int(stop)
+        items = items[int(start) : None if stop == -1 else stop + 1]
+        if opts and opts[0].upper() == "WITHSCORES":
+            return [x for m, s in items for x in (m, repr(s))]
+        return [m for m, _ in items]
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            n = int(line[1:])
+            args = []
+            for _ in range(n):
+                size = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(size + 2)[:-2].decode("utf-8"))
+            self.wfile.write(_encode(self.server.store.call(*args)))
+
+
+class RespStub(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.store = Store()
+        threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True).start()
+
+    @property
+    def url(self):
+        return f"redis://127.0.0.1:{self.server_address[1]}/0"
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,117 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from lxml import html
+
+from webtomd.assets import AssetStore, image_urls, localize_images, resolve_images
+from webtomd.fetchers import http_fetcher
+from webtomd.pipeline import RunConfig, execute
+
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+TEXT = "Every figure in this article is stored next to the Markdown so it still renders offline. " * 8
+
+
+class _Images(BaseHTTPRequestHandler):
+    files = {
+        "/a.png": ("image/png", PNG),
+        "/copy.png": ("image/png", PNG),
+        "/big.png": ("image/png", b"\x00" * 5000),
+        "/page.html": ("text/html", b"<p>not an image</p>"),
+    }
+    hits = []
+
+    def do_GET(self):
+        self.hits.append(self.path)
+        if self.path not in self.files:
+            self.send_error(404)
+            return
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        ctype, body = self.files[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Images.hits = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Images)
+    threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_resolve_picks_srcset_candidate():
+    root = html.fromstring(
+        '<div><img src="s.jpg" srcset="s.jpg 320w, m.jpg 1024w, l.jpg 1600w, xl.jpg 4000w">'
+        '<img src="data:image/gif;base64,R0lGOD" data-src="/lazy.jpg">'
+        '<img src="a.jpg" srcset="a.jpg, a@2x.jpg 2x"></div>'
+    )
+    resolve_images(root, "https://example.com/blog/post")
+    assert [img.get("src") for img in root.iter("img")] == [
+        "https://example.com/blog/l.jpg",
+        "https://example.com/lazy.jpg",
+        "https://example.com/blog/a@2x.jpg",
+    ]
+    assert root.find(".//img").get("srcset") is None
+
+
+def test_localize_dedups_and_limits(tmp_path, server):
+    md = (
+        f"![a]({server}/a.png)\n\n![again](/copy.png \"same bytes\")\n\n![big]({server}/big.png)\n\n"
+        f"![html]({server}/page.html)\n\n```\n![code]({server}/a.png)\n```\n"
+    )
+    assert image_urls(md, server + "/post") == [f"{server}/a.png", f"{server}/copy.png", f"{server}/big.png", f"{server}/page.html"]
+    out = tmp_path / "pages" / "post.md"
+    with AssetStore(tmp_path / "assets", max_bytes=1000, per_host=2) as store:
+        new, counts = localize_images(md, server + "/post", out, store)
+    assert counts == {"downloaded": 1, "stored": 1, "failed": 2, "bytes": 2 * len(PNG)}
+    local = [line for line in new.splitlines() if line.startswith("![")]
+    assert local[0].startswith("![a](../assets/") and local[0].endswith(".png)")
+    assert local[1] == local[0].replace("![a]", "![again]")[:-1] + ' "same bytes")'
+    assert local[2] == f"![big]({server}/big.png)" and f"![code]({server}/a.png)" in new
+    assert len(list((tmp_path / "assets").glob("*/*.png"))) == 1
+
+
+def test_repeated_runs_skip_unchanged(tmp_path, server):
+    clock = type("Clock", (), {"now": 1000.0, "__call__": lambda self: self.now})()
+    with AssetStore(tmp_path / "assets", max_age=60, clock=clock) as store:
+        assert store.fetch(f"{server}/a.png").status == "downloaded"
+        assert store.fetch(f"{server}/a.png").status == "cached"
+        assert _Images.hits == ["/a.png"]
+        clock.now += 120
+        assert store.fetch(f"{server}/a.png").status == "revalidated"
+        assert _Images.hits == ["/a.png", "/a.png"]
+
+
+def test_pipeline_downloads_images(tmp_path, server, monkeypatch):
+    page = f'<html><head><title>Figures</title></head><body><main><h1>Figures</h1><p>{TEXT}</p><img alt="chart" src="../a.png" srcset="../a.png 1x, ../copy.png 2x"></main></body></html>'
+    monkeypatch.setattr(
+        http_fetcher, "fetch", lambda url, **kw: http_fetcher.FetchResult(url=url, status_code=200, headers={}, html=page)
+    )
+    with AssetStore(tmp_path / "out" / "assets") as store:
+        cfg = RunConfig(
+            page=f"{server}/blog/post",
+            output=tmp_path / "out" / "post.md",
+            respect_robots=False,
+            browser=False,
+            llm_eval=False,
+            keep_images=True,
+            assets=store,
+        )
+        report = execute(cfg)
+    assert _Images.hits == ["/copy.png"]
+    assert report.assets == {"downloaded": 1, "bytes": len(PNG)}
+    assert "![chart](assets/" in (tmp_path / "out" / "post.md").read_text()
@@ -0,0 +1,55 @@
+from webtomd.fetchers import browser_fetcher, http_fetcher
+from webtomd.normalize.browser_prune import prune_options
+from webtomd.pipeline import RunConfig, execute
+
+
+TEXT = "The rendered article body is all the converter needs from a heavy single-page app. " * 8
+SHELL = '<html><body><div id="root"></div><noscript>Please enable JavaScript.</noscript></body></html>'
+FULL = (
+    '<html><head><title>Shop | Post</title><meta property="og:site_name" content="Shop">'
+    '<style>body{color:red}</style><script>var big = 1;</script></head>'
+    '<body><header><h1 class="logo">Shop</h1><nav><a href="/">Home</a></nav></header>'
+    f'<main><article><h2>Rendered post</h2><p style="margin:0">{TEXT}</p><svg><path d="M0 0"/></svg>'
+    '<script type="application/ld+json">{"@type": "Article", "headline": "Rendered post", "author": "Ann"}</script>'
+    "</article></main><footer>(c) Shop</footer></body></html>"
+)
+# What PRUNE_SCRIPT returns for FULL
+PRUNED = (
+    '<!DOCTYPE html><html><head><title>Shop | Post</title><meta property="og:site_name" content="Shop">'
+    '<script type="application/ld+json">{"@type": "Article", "headline": "Rendered post", "author": "Ann"}</script></head>'
+    f"<body><template><h1>Shop</h1></template><article><h2>Rendered post</h2><p>{TEXT}</p></article></body></html>"
+)
+
+
+def test_prune_options_mirror_cleaner_rules():
+    opts = prune_options(False, ("[class*='share']", "//div[@id='ad']"), "semantic")
+    assert {"script", "svg", "nav", "img", "template"} <= set(opts["drop"])
+    assert opts["css"] == ["[class*='share']"] and opts["xpath"] == ["//div[@id='ad']"]
+    assert "img" not in prune_options(True)["drop"]
+    assert prune_options(extractor="score")["semantic"] is False
+
+
+def test_pruned_document_converts_like_full_dom(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        http_fetcher, "fetch", lambda url, **kw: http_fetcher.FetchResult(url=url, status_code=200, headers={}, html=SHELL)
+    )
+    seen = []
+
+    def fake_browser(url, timeout=60.0, wait_selector=None, prune=None):
+        seen.append(prune)
+        html = PRUNED if prune else FULL
+        return browser_fetcher.BrowserFetchResult(url=url, html=html, pruned=prune is not None)
+
+    monkeypatch.setattr(browser_fetcher, "browser_available", lambda: True)
+    monkeypatch.setattr(browser_fetcher, "fetch_with_browser", fake_browser)
+    outputs = []
+    for flag in (False, True):
+        out = tmp_path / f"{flag}.md"
+        cfg = RunConfig(
+            page="https://shop.example/post", output=out, respect_robots=False, llm_eval=False, browser_prune=flag
+        )
+        assert execute(cfg).strategy == "browser"
+        outputs.append([line for line in out.read_text().splitlines() if not line.startswith("retrieved_at")])
+    assert seen[0] is None and seen[1]["semantic"] is True
+    assert outputs[0] == outputs[1]
+    assert "title: 'Shop'" in outputs[1] and "author: 'Ann'" in outputs[1]
@@ -0,0 +1,59 @@
+import time
+
+from webtomd.convert.html_to_markdown import to_markdown
+from webtomd.normalize.html_cleaner import to_clean_html
+from webtomd.utils.budget import ResourceBudget
+
+
+def _comments(n):
+    return "".join(f"<div class='c'><p>Comment {i} <em>with</em> text</p></div>" for i in range(n))
+
+
+def test_node_budget_truncates_in_document_order():
+    meter = ResourceBudget(max_nodes=50).start()
+    root = to_clean_html(f"<html><body><main><h1>Thread</h1>{_comments(5000)}</main></body></html>", meter=meter)
+    assert sum(1 for _ in root.iter()) <= 50
+    md = to_markdown(root)
+    assert md.startswith("Thread") and "Comment 0" in md and "Comment 4999" not in md
+    assert meter.truncations[0]["limit"] == "max_nodes"
+
+
+def test_text_budget():
+    meter = ResourceBudget(max_text_bytes=2000).start()
+    para = "<p>" + "é" * 500 + "</p>"
+    root = to_clean_html("<main>" + para * 20 + "</main>", meter=meter)
+    assert sum(len(t.encode("utf-8")) for t in root.itertext()) <= 2000
+    assert meter.truncations[0]["limit"] == "max_text_bytes"
+
+
+def test_table_budget_keeps_header_and_first_rows():
+    rows = "".join(f"<tr><td>{i}</td><td>{i * 2}</td></tr>" for i in range(1000))
+    src = f"<main><table><thead><tr><th>a</th><th>b</th></tr></thead><tbody>{rows}</tbody></table></main>"
+    meter = ResourceBudget(max_table_rows=11).start()
+    md = to_markdown(to_clean_html(src, meter=meter))
+    lines = [l for l in md.splitlines() if l.startswith("|")]
+    assert lines[0] == "| a | b |" and lines[-1] == "| 9 | 18 |" and len(lines) == 12
+    assert meter.truncations == [{"limit": "max_table_rows", "stage": "clean", "rows_kept": 11, "rows_total": 1001}]
+
+    meter = ResourceBudget(max_table_cells=7).start()
+    wide = "<main><table><tr>" + "<td>x</td>" * 100 + "</tr><tr><td>y</td></tr></table></main>"
+    root = to_clean_html(wide, meter=meter)
+    assert len(root.findall(".//td")) == 7
+
+
+def test_table_budget_counts_own_rows_only():
+    inner = "<table>" + "<tr><td>inner</td></tr>" * 20 + "</table>"
+    src = f"<main><table><tr><th>k</th><th>v</th></tr><tr><td>a</td><td>{inner}</td></tr><tr><td>b</td><td>2</td></tr></table></main>"
+    meter = ResourceBudget(max_table_rows=5).start()
+    root = to_clean_html(src, meter=meter)
+    outer, inner = root.iter("table")
+    assert [tr.findtext("td") for tr in outer.xpath("tr | */tr")] == [None, "a", "b"]
+    assert len(inner.xpath("tr | */tr")) == 5
+    assert meter.truncations == [{"limit": "max_table_rows", "stage": "clean", "rows_kept": 5, "rows_total": 20}]
+
+
+def test_expired_deadline_stops_conversion():
+    meter = ResourceBudget(deadline=0.0).start(started=time.perf_counter() - 1)
+    root = to_clean_html(f"<main><h1>T</h1>{_comments(10)}</main>")
+    assert to_markdown(root, meter) == "\n"
+    assert meter.truncations[-1] == {"limit": "deadline", "stage": "convert", "blocks": 0}
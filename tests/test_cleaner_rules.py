@@ -0,0 +1,48 @@
+import sys
+
+from webtomd.normalize.html_cleaner import BOILERPLATE_SELECTORS, DROP, KEEP, UNWRAP, compile_rules, to_clean_html
+
+
+def test_rules_are_cached_per_configuration():
+    assert compile_rules(False) is compile_rules(False)
+    assert compile_rules(True) is not compile_rules(False)
+    rules = compile_rules(False)
+    assert rules.action("script") == DROP
+    assert rules.action("img") == DROP
+    assert compile_rules(True).action("img") == KEEP
+    assert rules.action("span") == UNWRAP
+    assert rules.action("P") == KEEP
+
+
+def test_drop_selectors_remove_boilerplate():
+    src = """
+    <html><body><main>
+      <p>Body text</p>
+      <div class="share-bar"><p>Share this</p></div>
+      <section id="related"><p>More posts</p></section>
+    </main></body></html>
+    """
+    root = to_clean_html(src, drop_selectors=("//div[contains(@class, 'share')]", "//*[@id='related']"))
+    text = " ".join(root.text_content().split())
+    assert "Body text" in text
+    assert "Share this" not in text
+    assert "More posts" not in text
+
+
+def test_strip_boilerplate_matches_whole_name_parts(monkeypatch):
+    monkeypatch.setitem(sys.modules, "cssselect", None)  # XPath only
+    assert compile_rules.__wrapped__(False, BOILERPLATE_SELECTORS).drop_xpath is not None
+    src = """
+    <html><body><main><div class="shared-layout promotional">
+      <p>Body text</p>
+      <div class="post_share icons"><p>Share this</p></div>
+      <div id="cookie-banner"><p>We use cookies</p></div>
+      <section class="Related related-posts"><p>More posts</p></section>
+      <p>Unrelated <span aria-hidden="true">*</span>point</p>
+      <div aria-hidden="true"><p>Kept while a dialog is open</p></div>
+    </div></main></body></html>
+    """
+    root = to_clean_html(src, drop_selectors=BOILERPLATE_SELECTORS)
+    text = " ".join(root.text_content().split())
+    assert "Body text" in text and "Unrelated point" in text and "Kept while a dialog is open" in text
+    assert not any(s in text for s in ("Share this", "cookies", "More posts", "*"))
@@ -1,4 +1,5 @@
 from click.testing import CliRunner
+from typer.testing import CliRunner as TyperRunner
 from webtomd.cli import app
 
 
@@ -8,3 +9,9 @@ def test_version_flag():
     assert result.exit_code == 0
     assert result.output.strip()
 
+
+
+def test_unknown_extractor_is_rejected():
+    result = TyperRunner().invoke(app, ["--page", "https://example.com/", "--extractor", "bogus"])
+    assert result.exit_code == 2
+    assert "--extractor" in result.output
@@ -0,0 +1,146 @@
+import gzip
+import json
+from dataclasses import replace
+
+from typer.testing import CliRunner
+
+from webtomd.cli import app
+from webtomd.crawl import crawl, page_links, parse_sitemap, rewrite_links
+from webtomd.fetchers import http_fetcher
+from webtomd.pipeline import RunConfig
+from webtomd.utils.bloom import BloomFilter
+
+
+TEXT = "This guide explains how the converter reads a page and writes clean markdown for people. " * 12
+
+
+def _page(title, links=""):
+    return f"<html><head><title>{title}</title></head><body><main><h1>{title}</h1><p>{TEXT}</p>{links}</main></body></html>"
+
+
+PAGES = {
+    "https://docs.example.com/guide/": _page("Guide", '<p><a href="intro">Intro</a> and <a href="/guide/api#auth">API auth</a></p>'),
+    "https://docs.example.com/guide/intro": _page("Intro", '<p><a href="deep">Deep</a> <a href="https://other.example.com/x">elsewhere</a></p>'),
+    "https://docs.example.com/guide/api": _page("API", '<p><a href="/blog/post">Blog</a></p>'),
+    "https://docs.example.com/guide/deep": _page("Deep", '<p><a href="deeper">Deeper</a></p>'),
+    "https://docs.example.com/guide/deeper": _page("Deeper"),
+    "https://docs.example.com/guide/from-sitemap": _page("Listed"),
+}
+
+INDEX = b"""<?xml version="1.0"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://docs.example.com/sitemap-1.xml.gz</loc></sitemap>
+</sitemapindex>"""
+
+URLSET = b"""<?xml version="1.0"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://docs.example.com/guide/from-sitemap</loc></url>
+  <url><loc>https://docs.example.com/blog/post</loc></url>
+</urlset>"""
+
+SITEMAPS = {
+    "https://docs.example.com/sitemap.xml": INDEX,
+    "https://docs.example.com/sitemap-1.xml.gz": gzip.compress(URLSET),
+}
+
+
+def _fake_fetch(url, **kwargs):
+    return http_fetcher.FetchResult(url=url, status_code=200, headers={}, html=PAGES[url])
+
+
+def _fake_stream(url, **kwargs):
+    data = SITEMAPS[url]
+    for i in range(0, len(data), 7):
+        yield data[i : i + 7]
+
+
+def _base():
+    return RunConfig(page="", output=None, respect_robots=False, browser=False, llm_eval=False, js_detect=False, wrap=False)
+
+
+def test_parse_sitemap_streams_gzip_chunks():
+    assert list(parse_sitemap(_fake_stream("https://docs.example.com/sitemap-1.xml.gz"))) == [
+        ("url", "https://docs.example.com/guide/from-sitemap"),
+        ("url", "https://docs.example.com/blog/post"),
+    ]
+
+
+def test_links_outside_code_blocks_only():
+    md = "See [a](intro) and ![img](pic.png).\n\n```\n[b](code)\n```\n[c](<api> \"t\")\n"
+    assert page_links(md, "https://x.org/d/") == ["https://x.org/d/intro", "https://x.org/d/api"]
+    local = {"https://x.org/d/intro": "intro.md"}.get
+    assert rewrite_links(md, "https://x.org/d/", local).startswith("See [a](intro.md) and")
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(1000, error_rate=0.01)
+    assert sum(bloom.add(f"https://x.org/{i}") for i in range(1000)) > 980
+    assert not bloom.add("https://x.org/5") and "https://x.org/5" in bloom
+    false_positives = sum(f"https://y.org/{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_crawl_sitemap_links_and_rewrite(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_fetcher, "fetch", _fake_fetch)
+    monkeypatch.setattr(http_fetcher, "stream", _fake_stream)
+    reports = crawl(["https://docs.example.com/guide/"], _base(), tmp_path, max_depth=2, seen_capacity=10000)
+    urls = sorted(r.url for r in reports)
+    # deeper is three hops away; /blog/ and other hosts are out of scope
+    assert urls == [
+        "https://docs.example.com/guide/",
+        "https://docs.example.com/guide/api",
+        "https://docs.example.com/guide/deep",
+        "https://docs.example.com/guide/from-sitemap",
+        "https://docs.example.com/guide/intro",
+    ]
+    by_url = {r.url: r for r in reports}
+    guide = by_url["https://docs.example.com/guide/"].output.read_text()
+    assert f"[Intro]({by_url['https://docs.example.com/guide/intro'].output.name})" in guide
+    assert f"[API auth]({by_url['https://docs.example.com/guide/api'].output.name}#auth)" in guide
+    intro = by_url["https://docs.example.com/guide/intro"].output.read_text()
+    assert "(https://other.example.com/x)" in intro
+    assert "[Deeper](deeper)" in by_url["https://docs.example.com/guide/deep"].output.read_text()
+    assert len((tmp_path / "manifest.jsonl").read_text().splitlines()) == 5
+
+
+def test_rewrite_keeps_section_offsets(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_fetcher, "fetch", _fake_fetch)
+    base = replace(_base(), sections="json", chunk_tokens=40)
+    reports = crawl(["https://docs.example.com/guide/"], base, tmp_path, use_sitemaps=False, max_depth=1)
+    guide = next(r for r in reports if r.url == "https://docs.example.com/guide/").output
+    data = guide.read_bytes()
+    assert b"(https://" not in data  # links were rewritten, changing the length
+    index = json.loads(guide.with_name(f"{guide.stem}.sections.json").read_text())
+    assert index["bytes"] == len(data) and index["sections"][-1]["end"] == len(data)
+    assert data[index["sections"][0]["start"] :].startswith(b"Guide\n=====")
+    for chunk in index["chunks"]:
+        assert len(data[chunk["start"] : chunk["end"]].decode()) == chunk["chars"]
+
+
+def test_links_resolve_against_the_redirect_target(tmp_path, monkeypatch):
+    pages = {
+        "https://docs.example.com/docs/a/": _page("A", '<p><a href="b">B</a></p>'),
+        "https://docs.example.com/docs/a/b": _page("B", '<p><a href="./">Back to A</a></p>'),
+    }
+
+    def fetch(url, **kwargs):
+        final = url + "/" if url.endswith("/a") else url  # /docs/a redirects to /docs/a/
+        return http_fetcher.FetchResult(url=final, status_code=200, headers={}, html=pages[final])
+
+    monkeypatch.setattr(http_fetcher, "fetch", fetch)
+    reports = crawl(["https://docs.example.com/docs/a"], _base(), tmp_path, use_sitemaps=False, max_depth=1)
+    by_url = {r.url: r for r in reports}
+    assert sorted(by_url) == ["https://docs.example.com/docs/a", "https://docs.example.com/docs/a/b"]
+    a, b = by_url["https://docs.example.com/docs/a"], by_url["https://docs.example.com/docs/a/b"]
+    assert a.final_url == "https://docs.example.com/docs/a/"
+    assert f"[B]({b.output.name})" in a.output.read_text()
+    assert f"[Back to A]({a.output.name})" in b.output.read_text()
+
+
+def test_crawl_command(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_fetcher, "fetch", _fake_fetch)
+    monkeypatch.setattr(http_fetcher, "stream", _fake_stream)
+    args = ["--ignore-robots", "--no-browser", "--no-llm", "--out-dir", str(tmp_path), "--plain-log"]
+    result = CliRunner().invoke(app, args + ["crawl", "https://docs.example.com/guide/", "--no-sitemaps", "--max-depth", "0"])
+    assert result.exit_code == 0, result.output
+    assert len((tmp_path / "manifest.jsonl").read_text().splitlines()) == 1
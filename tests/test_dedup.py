@@ -0,0 +1,69 @@
+import random
+
+from webtomd.batch import run_batch
+from webtomd.fetchers import http_fetcher
+from webtomd.pipeline import RunConfig
+from webtomd.utils.dedup import Deduplicator, SimHashIndex, simhash, tokens
+from webtomd.utils.url import normalize_url
+
+
+WORDS = (
+    "the a page of this converter reads text from every site and writes clean markdown files "
+    "with links lists tables and code blocks for people who want to read them later"
+).split()
+
+
+def _text(seed, n=300):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def test_exact_and_near_duplicates():
+    d = Deduplicator()
+    base = _text(1)
+    assert d.check("a.md", base) is None
+    exact = d.check("b.md", base.upper().replace(" ", "\n\n"))
+    assert exact is not None and exact.kind == "exact" and exact.canonical == "a.md"
+    # A print view with a different footer
+    near = d.check("c.md", base + " printed from example com")
+    assert near is not None and near.kind == "near" and near.canonical == "a.md"
+    assert d.check("d.md", _text(2)) is None
+
+
+def test_simhash_index_finds_within_distance():
+    index = SimHashIndex(max_distance=3)
+    fp = simhash(tokens(_text(3)))
+    index.add(fp, "x")
+    assert index.query(fp ^ 0b101) == ("x", 2)
+    assert index.query(fp ^ 0b1111) is None
+
+
+def test_normalize_url_strips_tracking_params():
+    url = "https://example.com/post?id=3&utm_source=news&fbclid=abc"
+    assert normalize_url(url) == "https://example.com/post?id=3"
+    assert normalize_url("https://example.com/?q=a+b") == "https://example.com/?q=a+b"
+
+
+def test_batch_links_duplicates(tmp_path, monkeypatch):
+    body = "<p>" + _text(4) + "</p>"
+    pages = {
+        "https://example.com/a": f"<html><head><title>A</title></head><body><main><h1>Post</h1>{body}</main></body></html>",
+        "https://example.com/a/print": f"<html><body><article><h1>Post</h1>{body}</article></body></html>",
+        "https://example.com/b": f"<html><body><main><h1>Other</h1><p>{_text(5)}</p></main></body></html>",
+    }
+
+    def fake_fetch(url, **kwargs):
+        return http_fetcher.FetchResult(url=url, status_code=200, headers={}, html=pages[url])
+
+    monkeypatch.setattr(http_fetcher, "fetch", fake_fetch)
+    base = RunConfig(page="", output=None, respect_robots=False, browser=False, llm_eval=False, js_detect=False)
+    urls = list(pages) + ["https://example.com/a?utm_campaign=x"]
+    reports = run_batch(urls, base, tmp_path, concurrency=1)
+
+    a, printed, b, tracked = reports
+    assert a.duplicate_kind is None and a.output.is_file()
+    assert printed.duplicate_kind == "exact" and printed.output.is_symlink()
+    assert printed.output.read_text() == a.output.read_text()
+    assert b.duplicate_kind is None
+    assert tracked.duplicate_kind == "url" and tracked.duplicate_of == a.url
+    assert len((tmp_path / "manifest.jsonl").read_text().splitlines()) == 4
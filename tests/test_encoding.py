@@ -0,0 +1,60 @@
+import codecs
+
+from webtomd.evaluate.js_detect import detect_js_requirement
+from webtomd.fetchers import http_fetcher
+from webtomd.normalize.html_cleaner import parse_html
+from webtomd.pipeline import RunConfig, execute
+from webtomd.utils.encoding import meta_charset, sniff_encoding
+
+
+TEXT = "Le café du coin sert un crème brûlée à l’ancienne tous les jours de la semaine. " * 8
+
+
+def _page(charset_meta=""):
+    return f"<html><head>{charset_meta}<title>Café</title></head><body><main><h1>Café</h1><p>{TEXT}</p></main></body></html>"
+
+
+def test_sniff_order():
+    utf8 = _page().encode("utf-8")
+    assert sniff_encoding(codecs.BOM_UTF8 + utf8, "text/html; charset=iso-8859-1").source == "bom"
+    d = sniff_encoding(_page().encode("cp1252"), "text/html; charset=ISO-8859-1")
+    assert (d.encoding, d.source, d.mojibake) == ("cp1252", "header", None)
+    d = sniff_encoding(_page('<meta charset="windows-1252">').encode("cp1252"), "text/html")
+    assert (d.encoding, d.source) == ("cp1252", "meta")
+    assert sniff_encoding(_page().encode("cp1252")).encoding == "cp1252"
+    assert sniff_encoding(utf8).encoding == "utf-8"
+    # Commented-out and too-late declarations don't count
+    assert meta_charset(b"<!-- <meta charset=koi8-r> --><meta charset=utf-8>") == "utf-8"
+    assert meta_charset(b" " * 5000 + b"<meta charset=koi8-r>") is None
+
+
+def test_mojibake_is_reported():
+    d = sniff_encoding(_page().encode("utf-8"), "text/html; charset=iso-8859-1")
+    assert d.encoding == "utf-8" and d.declared == "cp1252" and "body is utf-8" in d.mojibake
+    double = _page().encode("utf-8").decode("cp1252").encode("utf-8")
+    assert sniff_encoding(double, "text/html; charset=utf-8").mojibake == "double-encoded utf-8"
+    assert sniff_encoding(_page().encode("cp1252"), "text/html; charset=utf-8").mojibake == "invalid utf-8"
+
+
+def test_parse_bytes_and_js_detect():
+    data = "<p>日本語の記事</p>".encode("euc_jp")
+    assert parse_html(data, "euc_jp").text_content() == "日本語の記事"
+    page = _page()
+    assert detect_js_requirement(page.encode()).decision == detect_js_requirement(page).decision
+
+
+def test_http_bytes_reach_lxml(tmp_path, monkeypatch):
+    data = _page('<meta http-equiv="Content-Type" content="text/html; charset=windows-1252">').encode("cp1252")
+
+    def fake_fetch(url, **kwargs):
+        headers = {"content-type": "text/html"}
+        return http_fetcher.FetchResult(
+            url=url, status_code=200, headers=headers, content=data, decoding=sniff_encoding(data, headers["content-type"])
+        )
+
+    monkeypatch.setattr(http_fetcher, "fetch", fake_fetch)
+    cfg = RunConfig(page="https://example.fr/cafe", output=tmp_path / "cafe.md", respect_robots=False, browser=False, llm_eval=False)
+    report = execute(cfg)
+    md = (tmp_path / "cafe.md").read_text(encoding="utf-8")
+    assert "crème brûlée à l’ancienne" in md
+    assert report.encoding == {"encoding": "cp1252", "source": "meta", "declared": None, "mojibake": None}
@@ -0,0 +1,61 @@
+import threading
+
+import webtomd
+from webtomd.fetchers import http_fetcher
+from webtomd.pipeline import RunConfig, execute
+from webtomd.utils.budget import ResourceBudget
+
+
+TEXT = "A converter configured once serves every request of the embedding service. "
+
+
+def _page(i):
+    return (
+        f"<html><head><title>Post {i}</title><meta name='author' content='Ann'></head><body><nav>menu</nav>"
+        f"<main><h1>Post {i}</h1><p>{TEXT * 6}</p><p><a href='/next'>Next</a></p>"
+        f"<table><tr><th>k</th><th>v</th></tr><tr><td>n</td><td>{i}</td></tr></table></main></body></html>"
+    )
+
+
+def _body(text):
+    return [line for line in text.splitlines() if not line.startswith("retrieved_at")]
+
+
+def test_engine_matches_pipeline_output(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        http_fetcher, "fetch", lambda url, **kw: http_fetcher.FetchResult(url=url, status_code=200, headers={}, html=_page(1))
+    )
+    out = tmp_path / "post.md"
+    execute(RunConfig(page="https://blog.example/p/1", output=out, respect_robots=False, browser=False, llm_eval=False))
+    result = webtomd.Engine().convert_html(_page(1), "https://blog.example/p/1")
+    assert _body(result.markdown) == _body(out.read_text())
+    assert result.metadata.title == "Post 1" and result.metadata.author == "Ann"
+
+
+def test_bytes_input_and_options():
+    page = "<html><head><meta charset='windows-1252'></head><body><main><p>Caf\xe9 cr\xe8me</p></main></body></html>"
+    engine = webtomd.Engine(front_matter=False, wrap=False)
+    assert engine.convert_html(page.encode("cp1252")).markdown == "Café crème\n"
+    limited = webtomd.Engine(budget=ResourceBudget(max_table_rows=1)).convert_html(_page(2))
+    assert limited.truncations[0]["limit"] == "max_table_rows"
+    assert webtomd.Engine(front_matter=False).convert_html("<p>x</p>").metadata.url is None
+
+
+def test_shared_across_threads():
+    engine = webtomd.Engine(align_tables=True)
+    expected = [engine.convert_html(_page(i), f"https://blog.example/p/{i}").markdown for i in range(16)]
+    pages = [(_page(i), f"https://blog.example/p/{i}") for i in range(16)]
+    got = [r.markdown for r in engine.convert_many(pages, workers=4)]
+    assert _body("".join(got)) == _body("".join(expected))
+    # Direct use from many threads at once
+    results = {}
+
+    def work(i):
+        results[i] = engine.convert_html(*pages[i]).markdown
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert [_body(results[i]) for i in range(16)] == [_body(m) for m in expected]
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+
+from webtomd.fetchers import firecrawl_fetcher, http_fetcher, jina_reader
+from webtomd.pipeline import RunConfig, RunReport, execute
+from webtomd.utils.budget import ResourceBudget
+
+
+TEXT = "Hedged requests keep the slowest pages from setting the latency of the whole run. " * 12
+PAGE = f"<html><head><title>Post</title></head><body><main><h1>Post</h1><p>{TEXT}</p></main></body></html>"
+
+
+def _cfg(tmp_path, **kw):
+    return RunConfig(
+        page="https://example.com/post",
+        output=tmp_path / "post.md",
+        respect_robots=False,
+        browser=False,
+        llm_eval=False,
+        js_detect=False,
+        **kw,
+    )
+
+
+def _providers(monkeypatch, jina, firecrawl=None):
+    monkeypatch.setattr(jina_reader, "fetch_markdown", jina)
+    monkeypatch.setattr(firecrawl_fetcher, "fetch_markdown", firecrawl or jina)
+
+
+def test_slow_http_is_hedged(tmp_path, monkeypatch):
+    release = threading.Event()
+
+    def slow_fetch(url, **kwargs):
+        release.wait(5)
+        return http_fetcher.FetchResult(url=url, status_code=200, headers={}, html=PAGE)
+
+    monkeypatch.setattr(http_fetcher, "fetch", slow_fetch)
+    _providers(monkeypatch, lambda url, timeout=60.0: f"# From Jina\n\n{TEXT}")
+    t0 = time.perf_counter()
+    report = execute(_cfg(tmp_path, hedge_delay=0.1))
+    release.set()
+    assert time.perf_counter() - t0 < 2
+    assert report.strategy == "jina" and report.strategies_tried == ["http", "jina"]
+    assert "From Jina" in (tmp_path / "post.md").read_text()
+
+
+def test_failed_strategy_starts_next_at_once(tmp_path, monkeypatch):
+    def refused(url, **kwargs):
+        raise ConnectionError("refused")
+
+    monkeypatch.setattr(http_fetcher, "fetch", refused)
+    _providers(monkeypatch, refused, lambda url, timeout=60.0: f"# Firecrawl\n\n{TEXT}")
+    t0 = time.perf_counter()
+    report = execute(_cfg(tmp_path, hedge_delay=30))
+    assert time.perf_counter() - t0 < 2
+    assert report.strategy == "firecrawl" and report.strategies_tried == ["http", "jina", "firecrawl"]
+
+
+def test_fast_http_wins_alone(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        http_fetcher, "fetch", lambda url, **kw: http_fetcher.FetchResult(url=url, status_code=200, headers={}, html=PAGE)
+    )
+    _providers(monkeypatch, lambda url, timeout=60.0: pytest.fail("hedged without need"))
+    report = execute(_cfg(tmp_path, hedge_delay=5))
+    assert report.strategy == "http" and report.strategies_tried == ["http"]
+
+
+def test_page_deadline_bounds_the_race(tmp_path, monkeypatch):
+    release = threading.Event()
+
+    def hang(url, **kwargs):
+        release.wait(5)
+        raise RuntimeError("gave up")
+
+    monkeypatch.setattr(http_fetcher, "fetch", hang)
+    _providers(monkeypatch, hang)
+    report = RunReport(url="")
+    t0 = time.perf_counter()
+    with pytest.raises(SystemExit):
+        execute(_cfg(tmp_path, hedge_delay=0.05, budget=ResourceBudget(deadline=0.4)), report)
+    release.set()
+    assert time.perf_counter() - t0 < 2
+    assert report.strategies_tried == ["http", "jina", "firecrawl"]
+    assert report.truncations[-1]["limit"] == "deadline"
+    assert "cancelled" not in report.to_dict()
+
+
+def test_page_deadline_caps_fetch_timeouts(tmp_path, monkeypatch):
+    timeouts = []
+
+    def empty_page(url, timeout=60.0, **kwargs):
+        timeouts.append(timeout)
+        return http_fetcher.FetchResult(url=url, status_code=200, headers={}, html="<html><body></body></html>")
+
+    def provider_error(url, timeout=60.0):
+        timeouts.append(timeout)
+        raise ConnectionError("refused")
+
+    monkeypatch.setattr(http_fetcher, "fetch", empty_page)
+    _providers(monkeypatch, provider_error)
+    with pytest.raises(SystemExit):
+        execute(_cfg(tmp_path, budget=ResourceBudget(deadline=3.0)))
+    assert len(timeouts) == 3 and all(0 < t <= 3.0 for t in timeouts)
@@ -0,0 +1,114 @@
+import json
+
+from lxml import html
+
+from webtomd.convert.html_to_markdown import to_markdown
+from webtomd.normalize.html_cleaner import to_clean_html
+from webtomd.normalize.hydration import extract_hydrated_content
+
+
+BODY = "<p>" + "Hydrated paragraph with real article text. " * 10 + "</p><h2>Part two</h2><p>More text here.</p>"
+
+
+def _next_page():
+    state = {
+        "props": {
+            "pageProps": {
+                "post": {
+                    "title": "Next Post Title",
+                    "author": {"name": "Ada Lovelace"},
+                    "publishedAt": "2024-05-01",
+                    "html": BODY,
+                }
+            }
+        }
+    }
+    return (
+        "<html><head><title>Site</title></head><body><div id='__next'><p>Loading…</p></div>"
+        f"<script id='__NEXT_DATA__' type='application/json'>{json.dumps(state)}</script></body></html>"
+    )
+
+
+def test_extracts_next_data_body_and_metadata():
+    hc = extract_hydrated_content(html.fromstring(_next_page()))
+    assert hc is not None
+    assert hc.source == "next_data"
+    assert hc.title == "Next Post Title"
+    assert hc.metadata["author"] == "Ada Lovelace"
+    assert hc.metadata["date_published"] == "2024-05-01"
+
+
+# Nuxt 3 payload as devalue writes it: a flat array of values referenced by index
+NUXT_DATA = [
+    ["ShallowReactive", 1],
+    {"data": 2, "state": 11, "once": 13, "_errors": 14, "serverRendered": 16, "path": 17},
+    ["ShallowReactive", 3],
+    {"post-/blog/nuxt-post": 4},
+    {"id": 5, "title": 6, "author": 7, "publishedAt": 9, "html": 10},
+    42,
+    "Nuxt Post Title",
+    {"name": 8},
+    "Evan You",
+    "2024-06-01",
+    BODY,
+    ["Reactive", 12],
+    {},
+    ["Set"],
+    ["ShallowReactive", 15],
+    {"post-/blog/nuxt-post": -1},
+    True,
+    "/blog/nuxt-post",
+]
+
+
+def test_extracts_nuxt_devalue_payload():
+    src = (
+        "<html><body><div id='__nuxt'></div><script type='application/json' data-nuxt-data='nuxt-app' data-ssr='true'"
+        f" id='__NUXT_DATA__'>{json.dumps(NUXT_DATA)}</script></body></html>"
+    )
+    hc = extract_hydrated_content(html.fromstring(src))
+    assert hc is not None and hc.source == "nuxt_data"
+    assert hc.html == BODY and hc.title == "Nuxt Post Title"
+    assert hc.metadata["author"] == "Evan You" and hc.metadata["date_published"] == "2024-06-01"
+
+
+def test_json_ld_article_body():
+    ld = {
+        "@context": "https://schema.org",
+        "@type": "NewsArticle",
+        "headline": "LD Headline",
+        "datePublished": "2023-01-02",
+        "author": [{"@type": "Person", "name": "Grace"}],
+        "articleBody": "First paragraph of the body. " * 8 + "\n\nSecond paragraph.",
+    }
+    src = f"<html><head><script type='application/ld+json'>{json.dumps(ld)}</script></head><body><div id='app'></div></body></html>"
+    hc = extract_hydrated_content(html.fromstring(src))
+    assert hc is not None and hc.source == "json_ld"
+    assert hc.metadata["author"] == "Grace"
+    assert hc.html.count("<p>") == 2
+
+
+def test_hydrated_content_replaces_empty_shell():
+    doc = html.fromstring(_next_page())
+    hc = extract_hydrated_content(doc)
+    root = to_clean_html(doc, hydrated=hc)
+    md = to_markdown(root)
+    assert "Next Post Title" in md
+    assert "Hydrated paragraph" in md
+    assert "Loading" not in md
+    assert "__NEXT_DATA__" not in md
+
+
+def test_server_rendered_article_keeps_its_dom():
+    text = "Server rendered article text for every reader. " * 20
+    ld = {"@type": "NewsArticle", "headline": "LD headline", "articleBody": text + "Plus a closing line. " * 8}
+    src = (
+        "<html><head><script type='application/ld+json'>" + json.dumps(ld) + "</script></head>"
+        f"<body><article><h1>DOM headline</h1><p>{text}</p><h2>Only in the DOM</h2></article></body></html>"
+    )
+    doc = html.fromstring(src)
+    hc = extract_hydrated_content(doc)
+    assert hc is not None and hc.source == "json_ld"
+    md = to_markdown(to_clean_html(doc, hydrated=hc))
+    assert "Only in the DOM" in md
+    assert "LD headline" not in md
@@ -0,0 +1,147 @@
+import time
+from dataclasses import replace
+
+import httpx
+import pytest
+
+from webtomd.fetchers import http_fetcher
+from webtomd.jobs import DONE, FAILED, IN_FLIGHT, PENDING, JobQueue, JobStore, run_jobs
+from webtomd.pipeline import RunConfig, RunReport
+
+
+TEXT = "Every page in this batch has enough words in one paragraph to pass the coverage check. " * 10
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _base():
+    return RunConfig(page="", output=None, respect_robots=False, browser=False, llm_eval=False, js_detect=False)
+
+
+def test_claim_backoff_and_failure(tmp_path):
+    clock = Clock()
+    store = JobStore(tmp_path / "jobs.sqlite", max_attempts=2, backoff=10, clock=clock)
+    assert store.add(["https://x.org/a", "https://x.org/b?utm_source=n"]) == 2
+    assert store.add(["https://x.org/b"]) == 0
+
+    a, b = store.claim(10)
+    assert store.claim(10) == []
+    store.complete([(a, RunReport(url=a.url, strategy="http")), (b, RunReport(url=b.url, error="all strategies failed"))])
+    assert store.counts() == {PENDING: 1, IN_FLIGHT: 0, DONE: 1, FAILED: 0}
+    assert store.claim(10) == [] and store.next_wakeup() == 1010.0
+
+    clock.now = 1010.0
+    (b,) = store.claim(10)
+    assert b.attempts == 2
+    store.complete([(b, RunReport(url=b.url, error="all strategies failed"))])
+    assert store.counts()[FAILED] == 1
+    assert store.retry_failed() == 1 and store.claim(10)[0].attempts == 1
+
+
+def test_incomplete_backend_fails_at_construction():
+    class PutOnly(JobQueue):
+        def put(self, jobs):
+            return 0
+
+    with pytest.raises(TypeError, match="claim"):
+        PutOnly()
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    clock = Clock()
+    store = JobStore(tmp_path / "jobs.sqlite", clock=clock)
+    store.add(["https://x.org/a"])
+    (job,) = store.claim(1, worker="w1", lease=30)
+    clock.now += 31
+    (again,) = store.claim(1, worker="w2")
+    assert again.attempts == 2
+    # w1's late result is dropped; w2 still owns the job
+    store.complete([(job, RunReport(url=job.url))], worker="w1")
+    assert store.counts()[IN_FLIGHT] == 1
+
+
+def test_run_resumes_and_retries(tmp_path, monkeypatch):
+    calls = []
+
+    def flaky_fetch(url, **kwargs):
+        calls.append(url)
+        if url.endswith("/flaky") and calls.count(url) == 1:
+            raise httpx.ConnectError("connection reset")
+        return http_fetcher.FetchResult(url=url, status_code=200, headers={}, html=f"<main><h1>{url[-5:]}</h1><p>{url} {TEXT}</p></main>")
+
+    monkeypatch.setattr(http_fetcher, "fetch", flaky_fetch)
+    db = tmp_path / "jobs.sqlite"
+    store = JobStore(db, backoff=0)
+    store.add([f"https://x.org/{n}" for n in ("one", "two", "flaky")])
+    # An earlier run died holding a job
+    (held,) = store.claim(1)
+    store.close()
+
+    store = JobStore(db, backoff=0)
+    counts = run_jobs(store, _base(), tmp_path / "out", concurrency=2)
+    assert counts == {PENDING: 0, IN_FLIGHT: 0, DONE: 3, FAILED: 0}
+    assert calls.count("https://x.org/flaky") == 2
+    assert held.url == "https://x.org/one" and calls.count(held.url) == 1
+    assert len((tmp_path / "out" / "manifest.jsonl").read_text().splitlines()) == 3
+
+    # Nothing left: a rerun converts nothing
+    calls.clear()
+    assert run_jobs(store, _base(), tmp_path / "out")[DONE] == 3 and calls == []
+
+
+def test_results_awaiting_commit_keep_their_leases(tmp_path, monkeypatch):
+    clock = Clock()
+
+    def fetch(url, **kwargs):
+        if url.endswith("/slow"):
+            # Well past the lease while /fast waits for the batch commit
+            for _ in range(20):
+                clock.now += 0.1
+                time.sleep(0.1)
+        return http_fetcher.FetchResult(url=url, status_code=200, headers={}, html=f"<main><h1>{url[-4:]}</h1><p>{url} {TEXT}</p></main>")
+
+    monkeypatch.setattr(http_fetcher, "fetch", fetch)
+    store = JobStore(tmp_path / "jobs.sqlite", clock=clock)
+    store.add(["https://x.org/fast", "https://x.org/slow"])
+    counts = run_jobs(store, _base(), tmp_path / "out", concurrency=2, lease=0.6)
+    assert counts[DONE] == 2
+    # An expired lease would have been claimed again, as a second attempt
+    assert store.db.execute("SELECT url, attempts FROM jobs ORDER BY url").fetchall() == [
+        ("https://x.org/fast", 1),
+        ("https://x.org/slow", 1),
+    ]
+
+
+class SlowBatch:
+    """Providers whose Firecrawl batch job outlasts the lease; another worker claims at its end."""
+
+    def __init__(self, clock, db):
+        self.clock = clock
+        self.db = db
+        self.stolen = []
+
+    def firecrawl_batch(self, urls):
+        for _ in range(20):
+            self.clock.now += 0.1
+            time.sleep(0.1)
+        self.stolen = JobStore(self.db, clock=self.clock).claim(10, worker="w2")
+        return len(urls)
+
+    def fetch(self, provider, url, timeout=None):
+        return f"# {url[-1]}\n\n{TEXT}\n"
+
+
+def test_prefetch_keeps_leases(tmp_path):
+    clock = Clock()
+    store = JobStore(tmp_path / "jobs.sqlite", clock=clock)
+    store.add(["https://x.org/a", "https://x.org/b"])
+    providers = SlowBatch(clock, tmp_path / "jobs.sqlite")
+    base = replace(_base(), use_firecrawl=True, providers=providers)
+    assert run_jobs(store, base, tmp_path / "out", worker="w1", wait_for_retries=False, lease=0.6)[DONE] == 2
+    assert providers.stolen == []
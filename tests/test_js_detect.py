@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from webtomd.evaluate.js_detect import BROWSER, INLINE_STATE, STATIC, detect_js_requirement
+from webtomd.fetchers import browser_fetcher, firecrawl_fetcher, http_fetcher, jina_reader
+from webtomd.pipeline import RunConfig, execute
+from webtomd.utils.strategy_memory import StrategyMemory
+
+
+TEXT = "Static fallback text that the server rendered for crawlers and readers. " * 12
+# Flagged as needing a browser, but the static HTML still converts
+SHELL = (
+    '<html><head><title>App</title><script src="/bundle.js"></script></head><body>'
+    '<noscript>You need to enable JavaScript to run this app.</noscript><div id="root"></div>'
+    f"<main><h1>App</h1><p>{TEXT}</p></main></body></html>"
+)
+
+
+def test_static_article_is_static():
+    body = "<p>" + "Plenty of server rendered article text. " * 40 + "</p>"
+    v = detect_js_requirement(f"<html><head><title>T</title></head><body><article>{body}</article></body></html>")
+    assert v.decision == STATIC
+    assert v.text_chars > 1000
+
+
+def test_empty_spa_shell_needs_browser():
+    src = """
+    <html><head><script src="/bundle.js"></script></head>
+    <body><noscript>You need to enable JavaScript to run this app.</noscript><div id="root"></div></body></html>
+    """
+    v = detect_js_requirement(src)
+    assert v.decision == BROWSER
+    assert v.needs_browser
+    assert "empty_spa_root" in v.signals and "noscript_enable_js" in v.signals
+    assert v.confidence >= 0.6
+
+
+def test_next_data_is_inline_state():
+    state = '{"props": {"pageProps": {"post": {"html": "' + "<p>text</p>" * 200 + '"}}}}'
+    src = f'<html><body><div id="__next"></div><script id="__NEXT_DATA__" type="application/json">{state}</script></body></html>'
+    v = detect_js_requirement(src)
+    assert v.decision == INLINE_STATE
+    assert v.has_inline_state
+    assert v.state_bytes >= len(state)
+
+
+def test_detector_is_cheap_per_kb():
+    src = "<html><body>" + "<div class='x'><p>Some text here and there</p></div>" * 20000 + "</body></html>"
+    kb = len(src) / 1024
+    t0 = time.perf_counter()
+    detect_js_requirement(src)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    assert elapsed_ms / kb < 1.0
+
+
+@pytest.fixture
+def shell_page(monkeypatch):
+    def paid(url, **kwargs):
+        pytest.fail("fell through to a paid provider")
+
+    monkeypatch.setattr(
+        http_fetcher, "fetch", lambda url, **kw: http_fetcher.FetchResult(url=url, status_code=200, headers={}, html=SHELL)
+    )
+    monkeypatch.setattr(jina_reader, "fetch_markdown", paid)
+    monkeypatch.setattr(firecrawl_fetcher, "fetch_markdown", paid)
+
+
+def _cfg(tmp_path, **kw):
+    return RunConfig(page="https://app.example/post", output=tmp_path / "post.md", respect_robots=False, llm_eval=False, **kw)
+
+
+def test_without_playwright_http_body_is_converted(tmp_path, monkeypatch, shell_page):
+    monkeypatch.setattr(browser_fetcher, "browser_available", lambda: False)
+    report = execute(_cfg(tmp_path))
+    assert report.js["decision"] == BROWSER
+    assert report.strategy == "http" and report.strategies_tried == ["http"]
+
+
+@pytest.mark.parametrize("hedge_delay", [None, 5.0])
+def test_failed_browser_falls_back_to_http_body(tmp_path, monkeypatch, shell_page, hedge_delay):
+    def broken(url, **kwargs):
+        raise RuntimeError("browser crashed")
+
+    monkeypatch.setattr(browser_fetcher, "browser_available", lambda: True)
+    monkeypatch.setattr(browser_fetcher, "fetch_with_browser", broken)
+    memory = tmp_path / "strategies.json"
+    report = execute(_cfg(tmp_path, hedge_delay=hedge_delay, strategy_memory=memory))
+    assert report.strategy == "http" and report.strategies_tried == ["http", "browser"]
+    assert "Static fallback text" in (tmp_path / "post.md").read_text()
+    stats = StrategyMemory(memory).stats("https://app.example/post")
+    assert (stats["http"].successes, stats["http"].failures) == (1, 0)
+    assert (stats["browser"].successes, stats["browser"].failures) == (0, 1)
@@ -24,3 +24,41 @@ def test_table_converts_to_pipe_table():
     assert "---" in md
     assert "| 1 | 2 |" in md
 
+
+def test_spans_and_nested_tables():
+    src = """
+    <main><table>
+      <thead>
+        <tr><th rowspan="2">Region</th><th colspan="2">Sales</th></tr>
+        <tr><th>Q1</th><th>Q2</th></tr>
+      </thead>
+      <tbody>
+        <tr><td rowspan="2">North</td><td>1</td><td>2 | 3</td></tr>
+        <tr><td>4</td><td><table><tr><td>inner</td></tr></table></td></tr>
+      </tbody>
+    </table></main>
+    """
+    lines = [l for l in to_markdown(to_clean_html(src)).splitlines() if l.startswith("|")]
+    assert lines == [
+        "| Region | Sales Q1 | Q2 |",
+        "| --- | --- | --- |",
+        "| North | 1 | 2 \\| 3 |",
+        "| North | 4 | inner |",
+    ]
+
+
+def test_aligned_columns_and_csv_sidecar(tmp_path):
+    from webtomd.convert.tables import TableOptions, TableSidecars
+
+    rows = "".join(f"<tr><td>{i}</td><td>{'x' * (i % 4)}</td></tr>" for i in range(50))
+    root = to_clean_html(f"<main><p>Intro</p><table><tr><th>id</th><th>value</th></tr>{rows}</table></main>")
+
+    md = to_markdown(root, tables=TableOptions(align=True))
+    assert "| id  | value |" in md and "| --- | ----- |" in md and "| 3   | xxx   |" in md
+
+    sidecars = TableSidecars("page")
+    md = to_markdown(root, tables=TableOptions(csv_threshold=20, preview_rows=2, sidecars=sidecars))
+    assert "| 1 | x |" in md and "| 2 | xx |" not in md
+    assert "[Full table: 50 rows × 2 columns](page.table-1.csv)" in md
+    (path,) = sidecars.write(tmp_path)
+    assert path.read_text().splitlines()[:2] == ["id,value", "0,"]
@@ -0,0 +1,59 @@
+import json
+
+from lxml import html
+
+from webtomd.convert.frontmatter import compose_front_matter
+from webtomd.convert.html_to_markdown import markdown_title
+from webtomd.normalize.hydration import extract_hydrated_content
+from webtomd.utils.json_ld import parse_json_ld
+from webtomd.utils.metadata import collect_meta_tags, extract_metadata
+
+
+SRC = """
+<html><head>
+  <title>Doc Title | Site</title>
+  <meta name="description" content="Short summary">
+  <meta property="og:site_name" content="Example Site">
+  <meta property="article:published_time" content="2024-02-03T10:00:00Z">
+  <script type="application/ld+json">{ld}</script>
+</head><body><main><h1>Heading One</h1><p>Body</p></main></body></html>
+""".replace("{ld}", json.dumps({"@type": "BlogPosting", "headline": "LD", "author": {"name": "Alan Turing"}, "dateModified": "2024-03-01"}))
+
+
+def test_collect_meta_tags_single_pass():
+    found = collect_meta_tags(html.fromstring(SRC))
+    assert found["title"] == "Doc Title | Site"
+    assert found["h1"] == "Heading One"
+    assert found["name:description"] == "Short summary"
+    assert found["ld:author"] == "Alan Turing"
+
+
+def test_extract_metadata_feeds_front_matter():
+    meta = extract_metadata(html.fromstring(SRC), "https://example.com/post")
+    assert meta.title == "Heading One"
+    assert meta.author == "Alan Turing"
+    assert meta.date_published == "2024-02-03T10:00:00Z"
+    assert meta.date_modified == "2024-03-01"
+    assert meta.site_name == "Example Site"
+    fm = compose_front_matter(meta.to_dict())
+    assert fm.startswith("---\ntitle: 'Heading One'\n")
+    assert "author: 'Alan Turing'" in fm
+
+
+def test_json_ld_parsed_once_and_shared(monkeypatch):
+    doc = html.fromstring(SRC)
+    json_ld = parse_json_ld(doc)
+    assert [block["headline"] for block in json_ld] == ["LD"]
+
+    def no_reparse(*args, **kwargs):
+        raise AssertionError("JSON-LD parsed again")
+
+    monkeypatch.setattr(json, "loads", no_reparse)
+    assert extract_metadata(doc, None, json_ld).author == "Alan Turing"
+    assert extract_hydrated_content(doc, json_ld) is None  # no body long enough
+
+
+def test_markdown_title_atx_and_setext():
+    assert markdown_title("intro\n\n# Title\n") == "Title"
+    assert markdown_title("Title\n=====\n\nbody\n") == "Title"
+    assert markdown_title("no heading\n") is None
@@ -0,0 +1,71 @@
+from webtomd.convert.html_to_markdown import to_markdown
+from webtomd.convert.tables import TableOptions, TableSidecars
+from webtomd.convert.wrap import independent_runs, reflow_lines, reflow_lines_parallel
+from webtomd.fetchers import http_fetcher
+from webtomd.normalize.html_cleaner import to_clean_html
+from webtomd.pipeline import RunConfig, execute
+from webtomd.utils.io import iter_lines
+from webtomd.utils.parallel import ParallelOptions, partition
+
+
+PARALLEL = ParallelOptions(threshold=1, workers=2)
+WORDS = "a very long manual keeps going with `inline code` and [links](https://example.com/x) "
+
+
+def _page(sections=24):
+    parts = ["<html><head><title>Manual</title></head><body><main><h1>Manual</h1>"]
+    for i in range(sections):
+        parts.append(f"<h2>Part {i}</h2><p>{WORDS * (i % 5 + 2)}</p>")
+        parts.append(f"<ul><li>{WORDS * 2}</li><li>two</li><li>three</li><li>four<ul><li>nested {i}</li></ul></li></ul>")
+        parts.append(f"<pre><code class='language-py'>def f{i}():\n\n    return {i}</code></pre>")
+        rows = "".join(f"<tr><td>r{r}</td><td>{r * i}</td></tr>" for r in range(i % 7 + 1))
+        parts.append(f"<table><tr><th>k</th><th>v</th></tr>{rows}</table>")
+        parts.append(f"<div><p>inside div</p><table><tr><th>n</th></tr>{rows}</table></div>")
+        parts.append(f"<blockquote><p>{WORDS}</p></blockquote><h1>Also top {i}</h1>")
+    parts.append("</main></body></html>")
+    return "".join(parts)
+
+
+def test_partition_is_contiguous_and_balanced():
+    ranges = partition([5, 1, 1, 1, 5, 1, 1, 1], 2)
+    assert ranges == [(0, 4), (4, 8)]
+    assert partition([1] * 3, 8) == [(0, 1), (1, 2), (2, 3)]
+    assert partition([], 4) == []
+
+
+def test_conversion_matches_serial():
+    page = _page()
+    serial = to_markdown(to_clean_html(page))
+    assert to_markdown(to_clean_html(page), parallel=PARALLEL) == serial
+    # Sidecar CSVs keep their document-order names
+    sidecars = [TableSidecars("doc"), TableSidecars("doc")]
+    outputs = [
+        to_markdown(to_clean_html(page), tables=TableOptions(csv_threshold=3, sidecars=sidecars[0])),
+        to_markdown(to_clean_html(page), tables=TableOptions(csv_threshold=3, sidecars=sidecars[1]), parallel=PARALLEL),
+    ]
+    assert outputs[0] == outputs[1] and "](doc.table-1.csv)" in outputs[1]
+    assert sidecars[0].tables == sidecars[1].tables and len(sidecars[0].tables) > 4
+
+
+def test_reflow_matches_serial():
+    md = to_markdown(to_clean_html(_page()))
+    runs = list(independent_runs(iter_lines(md)))
+    assert [line for run in runs for line in run] == list(iter_lines(md))
+    assert any("" in run[1:-1] for run in runs)  # blank lines inside code fences don't split
+    for width, indent in ((80, None), (40, 2)):
+        expected = list(reflow_lines(iter_lines(md), width, indent))
+        assert list(reflow_lines_parallel(iter_lines(md), PARALLEL, width, indent)) == expected
+
+
+def test_pipeline_output_is_identical(tmp_path, monkeypatch):
+    page = _page(40)
+    monkeypatch.setattr(
+        http_fetcher, "fetch", lambda url, **kw: http_fetcher.FetchResult(url=url, status_code=200, headers={}, html=page)
+    )
+    outputs = []
+    for parallel in (None, ParallelOptions(threshold=20_000, workers=2)):
+        out = tmp_path / f"{parallel is not None}.md"
+        cfg = RunConfig(page="https://x.org/manual", output=out, respect_robots=False, browser=False, llm_eval=False, parallel=parallel)
+        execute(cfg)
+        outputs.append([line for line in out.read_text().splitlines() if not line.startswith("retrieved_at")])
+    assert outputs[0] == outputs[1]
@@ -0,0 +1,48 @@
+import pstats
+
+from webtomd.batch import run_batch
+from webtomd.fetchers import http_fetcher
+from webtomd.pipeline import RunConfig, execute
+
+
+BODY = "<p>" + "Profiling reads every page of this site and writes clean markdown files. " * 20 + "</p>"
+
+
+def _fake_fetch(url, **kwargs):
+    html = f"<html><head><title>Post</title></head><body><main><h1>Post</h1>{BODY}</main></body></html>"
+    return http_fetcher.FetchResult(url=url, status_code=200, headers={}, html=html)
+
+
+def _cfg(tmp_path):
+    return RunConfig(
+        page="https://example.com/post",
+        output=tmp_path / "post.md",
+        respect_robots=False,
+        browser=False,
+        llm_eval=False,
+        profile=tmp_path / "prof",
+    )
+
+
+def test_profile_single_page(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_fetcher, "fetch", _fake_fetch)
+    report = execute(_cfg(tmp_path))
+    stats = pstats.Stats(str(tmp_path / "prof" / "https-example-com-post.pstats"))
+    assert any(f.endswith("html_cleaner.py") for f, _, _ in stats.stats)
+    summary = (tmp_path / "prof" / "https-example-com-post.profile.txt").read_text()
+    for stage in ("fetch", "clean", "convert", "evaluate", "write"):
+        assert stage in report.profiler.stages
+        assert f"\n{stage} " in summary
+    assert "\nhtml_cleaner\n" in summary and "\nhtml_to_markdown\n" in summary
+    assert report.to_dict()["profile"].endswith("https-example-com-post.profile.txt")
+    assert "profiler" not in report.to_dict()
+
+
+def test_profile_aggregates_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_fetcher, "fetch", _fake_fetch)
+    urls = ["https://example.com/a", "https://example.com/b"]
+    reports = run_batch(urls, _cfg(tmp_path), tmp_path / "out", concurrency=4, dedup=False)
+    assert all(r.error is None for r in reports)
+    assert sorted(p.name for p in (tmp_path / "prof").iterdir()) == ["batch.profile.txt", "batch.pstats"]
+    stages = {l.split()[0]: l.split()[1:] for l in (tmp_path / "prof" / "batch.profile.txt").read_text().splitlines()[1:7]}
+    assert stages["clean"][0] == "2" and stages["write"][0] == "2"
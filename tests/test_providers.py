@@ -0,0 +1,163 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from webtomd.batch import run_batch
+from webtomd.pipeline import RunConfig
+from webtomd.providers import ProviderCache, ProviderLimits, ProviderPool, ProviderQuotaError
+
+
+TEXT = "Provider output is cached so that retries and reruns do not pay twice for the same page. " * 8
+
+
+class _Providers(BaseHTTPRequestHandler):
+    """Jina Reader (GET /<url>) and Firecrawl v2 scrape and batch scrape."""
+
+    protocol_version = "HTTP/1.1"
+    hits = []
+    in_flight = 0
+    max_in_flight = 0
+    polls = 0
+    lock = threading.Lock()
+    delay = 0.0
+
+    def _send(self, body, ctype="application/json"):
+        data = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _enter(self):
+        cls = type(self)
+        with cls.lock:
+            cls.hits.append((self.command, self.path))
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        time.sleep(cls.delay)
+        with cls.lock:
+            cls.in_flight -= 1
+
+    def do_GET(self):
+        self._enter()
+        if self.path.startswith("/v2/batch/scrape/b1"):
+            cls = type(self)
+            cls.polls += 1
+            if cls.polls == 1:
+                return self._send({"status": "scraping", "completed": 0, "total": 3})
+            if "page=2" in self.path:
+                return self._send({"status": "completed", "data": [_doc("https://x.org/c")]})
+            base = f"http://{self.headers['Host']}"
+            return self._send(
+                {
+                    "status": "completed",
+                    "creditsUsed": 3,
+                    "data": [_doc("https://x.org/a"), _doc("https://X.org/b")],
+                    "next": f"{base}/v2/batch/scrape/b1?page=2",
+                }
+            )
+        self._send(f"# Jina {self.path[1:]}\n\n{TEXT}", "text/plain")
+
+    def do_POST(self):
+        self._enter()
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path == "/v2/scrape":
+            return self._send({"success": True, "data": {"markdown": f"# Scraped\n\n{TEXT}", "metadata": {"creditsUsed": 1}}})
+        if self.path == "/v2/batch/scrape":
+            assert body["urls"] and body["formats"] == ["markdown"]
+            return self._send({"success": True, "id": "b1"})
+        self.send_error(404)
+
+    def log_message(self, *args):
+        pass
+
+
+def _doc(url):
+    return {"markdown": f"# Batch {url}\n\n{TEXT}", "metadata": {"sourceURL": url}}
+
+
+@pytest.fixture
+def server(monkeypatch):
+    _Providers.hits, _Providers.in_flight, _Providers.max_in_flight, _Providers.polls, _Providers.delay = [], 0, 0, 0, 0.0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Providers)
+    threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+    base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    monkeypatch.setenv("JINA_READER_URL", base)
+    monkeypatch.setenv("FIRECRAWL_API_URL", base)
+    monkeypatch.setenv("FIRECRAWL_API_KEY", "test")
+    yield base
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_disk_cache_with_ttl(tmp_path, server):
+    clock = Clock()
+    with ProviderPool(ProviderCache(tmp_path / "cache", ttl=60, clock=clock)) as pool:
+        first = pool.fetch("jina", "https://x.org/a")
+        assert first.startswith("# Jina https://x.org/a") and pool.fetch("jina", "https://x.org/a") == first
+    # A new run reads the same files
+    with ProviderPool(ProviderCache(tmp_path / "cache", ttl=60, clock=clock)) as pool:
+        assert pool.fetch("jina", "https://x.org/a") == first
+        assert pool.usage["jina"].cache_hits == 1 and pool.usage["jina"].calls == 0
+        clock.now += 61
+        pool.fetch("jina", "https://x.org/a")
+        assert pool.usage["jina"].calls == 1
+    assert len(_Providers.hits) == 2
+
+
+def test_concurrency_and_rate_limits(server):
+    _Providers.delay = 0.1
+    limits = {"jina": ProviderLimits(concurrency=2), "firecrawl": ProviderLimits(concurrency=4, per_minute=600)}
+    with ProviderPool(limits=limits) as pool:
+        threads = [threading.Thread(target=pool.fetch, args=("jina", f"https://x.org/{i}")) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert _Providers.max_in_flight == 2
+        t0 = time.perf_counter()
+        threads = [threading.Thread(target=pool.fetch, args=("firecrawl", f"https://x.org/{i}")) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        # 600/min: starts 0.1s apart
+        assert time.perf_counter() - t0 >= 0.3
+        assert pool.usage["firecrawl"].credits == 4
+
+
+def test_credit_budget(server):
+    with ProviderPool(max_credits=2) as pool:
+        pool.fetch("firecrawl", "https://x.org/a")
+        pool.fetch("firecrawl", "https://x.org/b")
+        pool.fetch("firecrawl", "https://x.org/a")  # cached, free
+        with pytest.raises(ProviderQuotaError):
+            pool.fetch("firecrawl", "https://x.org/c")
+        pool.fetch("jina", "https://x.org/c")  # Jina costs no credits
+        assert "firecrawl 2 calls for 2 pages, 1 cached" in pool.summary()
+
+
+def test_batch_scrape_feeds_bulk_runs(tmp_path, server):
+    with ProviderPool() as pool:
+        base = RunConfig(
+            page="", output=None, use_firecrawl=True, respect_robots=False, llm_eval=False, providers=pool
+        )
+        reports = run_batch(["https://x.org/a", "https://x.org/b", "https://x.org/c"], base, tmp_path, concurrency=2)
+        assert [r.strategy for r in reports] == ["firecrawl"] * 3
+        assert ("POST", "/v2/scrape") not in _Providers.hits
+        assert pool.usage["firecrawl"].calls == 1 and pool.usage["firecrawl"].pages == 3
+        assert pool.usage["firecrawl"].credits == 3 and pool.usage["firecrawl"].cache_hits == 3
+    # Matched although Firecrawl reported the host as X.org
+    assert "Batch https://X.org/b" in reports[1].output.read_text()
@@ -0,0 +1,46 @@
+from lxml import html
+
+from webtomd.normalize.html_cleaner import pick_content_root, to_clean_html
+from webtomd.normalize.readability_fallback import pick_best_candidate, score_candidates
+
+
+DIV_SOUP = """
+<html><body>
+  <div class="menu"><a href="/a">Home</a> <a href="/b">About</a> <a href="/c">Contact us today</a></div>
+  <div class="wrapper">
+    <div class="post-content">
+      <p>First paragraph of the story, with enough words, commas, and detail to count.</p>
+      <p>Second paragraph continues the article text, adding more content, for scoring.</p>
+      <p>Third paragraph wraps it up with a final thought, and a <a href="/x">link</a>.</p>
+    </div>
+    <div class="sidebar"><p>Related: a list of other stories you might enjoy reading.</p></div>
+  </div>
+</body></html>
+"""
+
+
+def test_scorer_picks_content_div_in_div_soup():
+    doc = html.fromstring(DIV_SOUP)
+    best = pick_best_candidate(doc)
+    assert best.get("class") == "post-content"
+    scores = score_candidates(doc)
+    menu = doc.xpath("//div[@class='menu']")[0]
+    assert scores.get(menu, 0.0) < scores[best]
+
+
+def test_semantic_root_priority():
+    doc = html.fromstring("<html><body><article id='a'>x</article><main><article id='b'>y</article></main></body></html>")
+    assert pick_content_root(doc).get("id") == "b"
+    doc = html.fromstring("<html><body><main id='m'><p>x</p></main><article id='a'>y</article></body></html>")
+    assert pick_content_root(doc).get("id") == "a"
+    # A fragment: no <body> to find the article under
+    doc = html.fromstring("<div id='d'><p>nav</p><article id='a'><p>y</p></article></div>")
+    assert pick_content_root(doc).get("id") == "a"
+
+
+def test_score_extractor_in_to_clean_html():
+    root = to_clean_html(DIV_SOUP, extractor="score")
+    text = " ".join(root.text_content().split())
+    assert "First paragraph" in text
+    assert "Home" not in text
+    assert "Related:" not in text
@@ -0,0 +1,102 @@
+import json
+
+from webtomd.convert.sections import SectionIndex
+from webtomd.fetchers import http_fetcher
+from webtomd.pipeline import RunConfig, execute
+
+
+MD = """Intro before any heading, with a café.
+
+Guide
+=====
+
+First paragraph of the guide.
+
+## Install
+
+* one
+* two
+
+```sh
+# not a heading
+
+pip install webtomd
+```
+
+### Options
+
+| k | v |
+| --- | --- |
+| a | 1 |
+
+Usage
+-----
+
+Last words.
+"""
+
+
+def _index(md, chunk_tokens=None, offset=0, step=7):
+    index = SectionIndex(chunk_tokens, offset=offset)
+    # Arbitrary chunk boundaries, as the writer may produce them
+    out = "".join(index.feed(md[i : i + step] for i in range(0, len(md), step)))
+    assert out == md
+    return index
+
+
+def test_sections_follow_headings():
+    index = _index(MD, offset=10)
+    data = ("x" * 10 + MD).encode("utf-8")
+    assert [(s.heading, s.level, s.path) for s in index.sections] == [
+        (None, 0, []),
+        ("Guide", 1, ["Guide"]),
+        ("Install", 2, ["Guide", "Install"]),
+        ("Options", 3, ["Guide", "Install", "Options"]),
+        ("Usage", 2, ["Guide", "Usage"]),
+    ]
+    assert index.sections[2].blocks == {"heading": 1, "list": 1, "code": 1}
+    assert index.sections[3].blocks == {"heading": 1, "table": 1}
+    assert data[index.sections[1].start :].startswith(b"Guide\n=====")
+    assert data[index.sections[0].start : index.sections[0].end].decode() == MD[: MD.index("Guide")]
+    assert index.sections[-1].end == index.size == len(data)
+    assert sum(s.chars for s in index.sections) == len(MD)
+
+
+def test_chunks_are_bounded_and_keep_code_whole():
+    md = "# Title\n\n" + "\n".join(f"Line {i} of a long paragraph that will not fit." for i in range(12)) + "\n\n"
+    md += "```\n" + "x = 1\n" * 40 + "```\n\n| a |\n| --- |\n| 1 |\n"
+    index = _index(md, chunk_tokens=60)
+    data = md.encode("utf-8")
+    for chunk in index.chunks:
+        text = data[chunk.start : chunk.end].decode()
+        assert chunk.chars == len(text) and chunk.path == ["Title"]
+        assert chunk.tokens <= 60 or chunk.blocks == ["code"]
+        if "code" in chunk.blocks:
+            assert text.startswith("```") and text.rstrip().endswith("```")
+    assert [c.blocks for c in index.chunks][-2:] == [["code"], ["table"]]
+    assert any(b == "paragraph+" for c in index.chunks for b in c.blocks)
+    assert "".join(data[c.start : c.end].decode() for c in index.chunks).replace("\n", "") == md.replace("\n", "")
+    # Same input, same chunks, whatever the stream boundaries
+    assert [c.start for c in _index(md, chunk_tokens=60, step=1).chunks] == [c.start for c in index.chunks]
+
+
+def test_pipeline_writes_sidecar(tmp_path, monkeypatch):
+    text = "Each section of this page is indexed while the Markdown is written to disk. " * 4
+    page = f"<html><head><title>Doc</title></head><body><main><h1>Doc</h1><p>{text}</p><h2>Part é</h2><p>{text}</p><pre><code>a\n\nb</code></pre></main></body></html>"
+    monkeypatch.setattr(
+        http_fetcher, "fetch", lambda url, **kw: http_fetcher.FetchResult(url=url, status_code=200, headers={}, html=page)
+    )
+    out = tmp_path / "doc.md"
+    cfg = RunConfig(
+        page="https://x.org/doc", output=out, respect_robots=False, browser=False, llm_eval=False, sections="jsonl", chunk_tokens=50
+    )
+    execute(cfg)
+    data = out.read_bytes()
+    records = [json.loads(line) for line in (tmp_path / "doc.sections.jsonl").read_text().splitlines()]
+    sections = [r for r in records if r["type"] == "section"]
+    assert [s["path"] for s in sections] == [["Doc"], ["Doc", "Part é"]]
+    assert data[sections[1]["start"] :].startswith("Part é\n".encode("utf-8"))
+    assert data[: sections[0]["start"]].startswith(b"---\n") and sections[1]["end"] == len(data)
+    chunks = [r for r in records if r["type"] == "chunk"]
+    assert chunks and all(r["source"] == "doc.md" for r in records)
+    assert data[chunks[-1]["start"] : chunks[-1]["end"]].decode().endswith("```\na\n\nb\n```\n")
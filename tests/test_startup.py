@@ -0,0 +1,22 @@
+import subprocess
+import sys
+
+
+def _loaded_after(code):
+    probe = code + "; import sys; print(' '.join(sorted(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout
+    return set(out.split())
+
+
+def test_version_fast_path_skips_typer():
+    out = subprocess.run([sys.executable, "-m", "webtomd", "--version"], capture_output=True, text=True, check=True)
+    assert out.stdout.strip()
+    mods = _loaded_after("import sys; sys.argv = ['webtomd', '--version']; from webtomd.__main__ import main; main()")
+    assert "typer" not in mods and "webtomd.pipeline" not in mods
+
+
+def test_heavy_dependencies_are_lazy():
+    mods = _loaded_after("import webtomd.cli, webtomd.pipeline")
+    # typer itself imports the top-level rich package, but not its console
+    for name in ("rich.console", "rich.logging", "httpx", "markdownify", "langdetect", "playwright", "openai"):
+        assert name not in mods, name
@@ -0,0 +1,20 @@
+from webtomd.utils.strategy_memory import DEFAULT_ORDER, StrategyMemory
+
+
+def test_memory_prefers_winning_strategy_and_persists(tmp_path):
+    path = tmp_path / "strategies.json"
+    mem = StrategyMemory(path, explore_every=5)
+    url = "https://spa.example.com/post/1"
+    assert mem.order(url) == list(DEFAULT_ORDER)
+    for _ in range(10):
+        mem.record(url, "http", False, 0.5)
+        mem.record(url, "browser", True, 3.0)
+    mem.save()
+
+    reloaded = StrategyMemory(path, explore_every=5)
+    # The run counter is persisted too: runs 2-4 exploit, run 5 explores
+    orders = [reloaded.order("https://SPA.example.com/post/2") for _ in range(4)]
+    assert all(o[0] == "browser" for o in orders[:3])
+    assert orders[3] == list(DEFAULT_ORDER)
+    # Other domains are unaffected
+    assert reloaded.order("https://static.example.org/") == list(DEFAULT_ORDER)
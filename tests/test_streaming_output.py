@@ -0,0 +1,33 @@
+from webtomd.convert.html_to_markdown import iter_markdown, post_process_lines, to_markdown
+from webtomd.normalize.html_cleaner import to_clean_html
+from webtomd.utils.io import iter_lines, write_text_chunks
+
+
+def test_post_process_lines_collapses_blank_runs():
+    blocks = ["\n\n  first  \n\n\n\nsecond   \n", "", "third\n\n\n"]
+    assert list(post_process_lines(blocks)) == ["first", "", "second", "", "third"]
+
+
+def test_iter_markdown_matches_to_markdown():
+    src = """
+    <html><body><main>
+      Loose <em>inline</em> text
+      <h2>Heading</h2>
+      <p>Para one</p>
+      <ul><li>a</li><li>b</li></ul>
+      <pre><code>x = 1</code></pre>
+    </main></body></html>
+    """
+    root = to_clean_html(src)
+    lines = list(iter_markdown(root))
+    assert "\n".join(lines) + "\n" == to_markdown(root)
+    assert "Para one" in lines
+    assert "* a" in lines
+
+
+def test_write_text_chunks_counts_encoded_bytes(tmp_path):
+    out = tmp_path / "sub" / "doc.md"
+    res = write_text_chunks(out, ["é", "", "abc\n"] * 10, buffer_size=4)
+    data = out.read_bytes()
+    assert res.bytes_written == len(data) == 60
+    assert list(iter_lines(data.decode("utf-8")))[0] == "éabc"
@@ -0,0 +1,68 @@
+import threading
+import time
+
+from webtomd.batch import run_batch
+from webtomd.fetchers import http_fetcher
+from webtomd.pipeline import RunConfig
+from webtomd.utils.singleflight import SingleFlight
+from webtomd.utils.url import CanonicalRules, canonicalize_url
+
+
+def test_canonicalize_url_defaults():
+    url = "HTTPS://Example.COM:443/a/./b/../c%7e%2f?b=2&utm_source=x&a=1#section"
+    assert canonicalize_url(url) == "https://example.com/a/c~%2F?a=1&b=2"
+    assert canonicalize_url("http://example.com:8080") == "http://example.com:8080/"
+    assert canonicalize_url("https://example.com/app#/route") == "https://example.com/app#/route"
+    assert canonicalize_url("http://[::1]:80/x") == "http://[::1]/x"
+
+
+def test_canonicalize_url_rules():
+    rules = CanonicalRules(strip_fragment=False, sort_query=False, strip_www=True, strip_params=frozenset({"ref"}))
+    url = "https://www.example.com/p?z=1&ref=hn&a=2#top"
+    assert canonicalize_url(url, rules) == "https://example.com/p?z=1&a=2#top"
+
+
+def test_single_flight_runs_once_for_concurrent_callers():
+    flights = SingleFlight()
+    calls = []
+    gate = threading.Event()
+
+    def work():
+        calls.append(1)
+        gate.wait(1)
+        return "done"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("k", work))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True]
+    assert {r for r, _ in results} == {"done"}
+    # Forgotten after completion unless remember=True
+    assert flights.do("k", lambda: "again") == ("again", False)
+
+
+def test_batch_collapses_redirects(tmp_path, monkeypatch):
+    article = "<html><body><main><h1>Post</h1><p>" + "words " * 200 + "</p></main></body></html>"
+    redirects = {"https://example.com/old": "https://example.com/new", "https://example.com/new": "https://example.com/new"}
+    fetched = []
+
+    def fake_fetch(url, **kwargs):
+        fetched.append(url)
+        return http_fetcher.FetchResult(url=redirects[url], status_code=200, headers={}, html=article)
+
+    monkeypatch.setattr(http_fetcher, "fetch", fake_fetch)
+    base = RunConfig(page="", output=None, respect_robots=False, browser=False, llm_eval=False, js_detect=False)
+    urls = ["https://example.com/new", "https://EXAMPLE.com/new#comments", "https://example.com/old"]
+    first, same, redirected = run_batch(urls, base, tmp_path, concurrency=1, dedup=False)
+
+    assert first.output.is_file() and first.duplicate_kind is None
+    assert same.duplicate_kind == "url" and same.output == first.output
+    assert redirected.duplicate_kind == "redirect" and redirected.duplicate_of == first.url
+    assert fetched == ["https://example.com/new", "https://example.com/old"]
+    assert len(list(tmp_path.glob("*.md"))) == 1
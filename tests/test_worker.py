@@ -0,0 +1,121 @@
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from resp_stub import RespStub
+from webtomd.cli import app
+from webtomd.fetchers import http_fetcher
+from webtomd.jobs import DONE, FAILED, IN_FLIGHT, PENDING, Job, run_jobs
+from webtomd.pipeline import RunConfig, RunReport
+from webtomd.utils.resp import RespClient
+from webtomd.worker import RedisQueue, format_progress, open_queue, read_jobs
+
+
+TEXT = "Workers on many hosts share one queue and write every converted page to the same directory. " * 10
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def redis():
+    server = RespStub()
+    yield server
+    server.stop()
+
+
+def _base():
+    return RunConfig(page="", output=None, respect_robots=False, browser=False, llm_eval=False, js_detect=False)
+
+
+def _fake_fetch(url, **kwargs):
+    return http_fetcher.FetchResult(url=url, status_code=200, headers={}, html=f"<main><h1>Fetched</h1><p>{url} {TEXT}</p></main>")
+
+
+def test_resp_client_roundtrip(redis):
+    client = RespClient.from_url(redis.url)
+    assert client.execute("SET", "k", "välue", "NX", "PX", 1000) == "OK"
+    assert client.execute("SET", "k", "other", "NX") is None
+    assert client.pipeline([("GET", "k"), ("HSET", "h", "a", 1), ("HGETALL", "h")]) == ["välue", 1, ["a", "1"]]
+
+
+def test_redis_leases_heartbeat_and_retry(redis):
+    clock = Clock()
+    q1 = RedisQueue(RespClient.from_url(redis.url), clock=clock, backoff=5)
+    q2 = RedisQueue(RespClient.from_url(redis.url), clock=clock, backoff=5)
+    assert q1.add(["https://x.org/a", "https://x.org/b"]) == 2 and q1.add(["https://x.org/a"]) == 0
+
+    a, b = q1.claim(10, "w1", lease=30)
+    assert q2.claim(10, "w2") == []
+    assert q1.counts() == {PENDING: 0, IN_FLIGHT: 2, DONE: 0, FAILED: 0}
+
+    # w1 keeps a alive; b's lease is given up
+    clock.now += 20
+    q1.heartbeat([a], "w1", lease=30)
+    redis.store.cmd_del("webtomd:lease:https://x.org/b")
+    clock.now += 15
+    (b2,) = q2.claim(10, "w2")
+    assert b2.url == b.url and b2.attempts == 2
+
+    q1.complete([(a, RunReport(url=a.url)), (b, RunReport(url=b.url))], "w1")  # b is no longer w1's
+    q2.complete([(b2, RunReport(url=b.url, error="all strategies failed"))], "w2")
+    assert q1.counts() == {PENDING: 1, IN_FLIGHT: 0, DONE: 1, FAILED: 0}
+    assert q1.next_wakeup() == clock.now + 10
+    assert [r["url"] for r in q1.reports()] == ["https://x.org/a"]
+    stats = q1.worker_stats()
+    assert stats["w1"]["done"] == 1 and stats["w2"]["done"] == 0
+    assert "throughput" in format_progress(q1)
+
+
+def test_workers_share_redis_queue(tmp_path, redis, monkeypatch):
+    monkeypatch.setattr(http_fetcher, "fetch", _fake_fetch)
+    jobs = tmp_path / "jobs.jsonl"
+    lines = [{"url": f"https://x.org/{i}"} for i in range(6)]
+    lines.append({"url": "https://x.org/raw", "html": f"<article><h1>Raw</h1><p>{TEXT}</p></article>", "options": {"wrap": False}})
+    jobs.write_text("\n".join(json.dumps(l) for l in lines))
+
+    queue = open_queue(redis.url)
+    assert queue.put(read_jobs(jobs)) == 7
+    for worker in ("w1", "w2"):
+        q = open_queue(redis.url)
+        run_jobs(q, _base(), tmp_path / "out", concurrency=2, chunk=2, worker=worker)
+    assert queue.counts()[DONE] == 7
+    reports = {r["url"]: r for r in queue.reports()}
+    assert reports["https://x.org/raw"]["strategies_tried"] == ["html"]
+    raw = (tmp_path / "out").glob("x-org-raw-*.md")
+    assert "Raw" in next(raw).read_text()
+
+
+def test_sqlite_queue_heartbeat_and_payload(tmp_path):
+    clock = Clock()
+    q = open_queue(f"sqlite://{tmp_path / 'q.sqlite'}", clock=clock)
+    q.put([Job("https://x.org/a", html="<p>hi</p>", options={"wrap": False})])
+    (job,) = q.claim(1, "w1", lease=30)
+    assert job.html == "<p>hi</p>" and job.options == {"wrap": False}
+    clock.now += 20
+    q.heartbeat([job], "w1", lease=30)
+    clock.now += 20
+    assert q.claim(1, "w2") == []
+    with pytest.raises(ValueError):
+        read_jobs(_write(tmp_path / "bad.jsonl", '{"url": "https://x.org", "options": {"output": "/etc"}}'))
+
+
+def _write(path, text):
+    path.write_text(text)
+    return path
+
+
+def test_worker_command(tmp_path, redis, monkeypatch):
+    monkeypatch.setattr(http_fetcher, "fetch", _fake_fetch)
+    urls = _write(tmp_path / "urls.txt", "https://x.org/1\nhttps://x.org/2\n")
+    args = ["--ignore-robots", "--no-browser", "--no-llm", "--out-dir", str(tmp_path / "out"), "--plain-log"]
+    result = CliRunner().invoke(app, args + ["worker", "--queue", redis.url, "--enqueue", str(urls), "--exit-when-empty"])
+    assert result.exit_code == 0, result.output
+    result = CliRunner().invoke(app, ["worker", "--queue", redis.url, "--status"])
+    assert "done 2" in result.output
@@ -22,3 +22,21 @@ code block should remain as is and not be reflowed even if it is very long long
     # Table kept intact
     assert "| H1 | H2 |" in out
 
+
+def test_wrap_prose_with_pipe_lists_and_inline_code():
+    md = (
+        "Prose that mentions a | b should still be wrapped because it is not a table at all, only text.\n"
+        "\n"
+        "12. An ordered list item beyond one with `inline code that must stay whole` inside it.\n"
+    )
+    out = reflow_paragraphs(md, width=40)
+    lines = out.splitlines()
+    assert all(len(line) <= 40 for line in lines if "`" not in line)
+    assert lines[0].startswith("Prose that mentions a | b")
+    assert any(line.startswith("12. An ordered") for line in lines)
+    assert any("`inline code that must stay whole`" in line for line in lines)
+    # Continuation lines align with the list item text
+    item = lines.index(next(line for line in lines if line.startswith("12. ")))
+    assert lines[item + 1].startswith("    ") and not lines[item + 1].startswith("     ")
+    out2 = reflow_paragraphs(md, width=40, list_indent=2)
+    assert "\n  " in out2 and "\n    " not in out2
@@ -1,2 +1,12 @@
 from .version import __version__
 
+__all__ = ["Conversion", "Engine", "__version__"]
+
+
+def __getattr__(name: str):
+    # The engine pulls in lxml and the pipeline; keep `import webtomd` light
+    if name in ("Conversion", "Engine"):
+        from . import engine
+
+        return getattr(engine, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import sys
+
+
+def main() -> None:
+    # Answer --version without importing Typer or the pipeline
+    if sys.argv[1:] == ["--version"]:
+        from .version import __version__
+
+        print(__version__)
+        return
+    from .cli import entrypoint
+
+    entrypoint()
+
+
+if __name__ == "__main__":
+    main()
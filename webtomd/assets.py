@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from lxml import html
+
+from .utils.logging import get_logger
+from .utils.markdown import outside_fences
+
+
+# srcset candidates wider than this are only used when nothing narrower exists
+MAX_IMAGE_WIDTH = 2048
+MAX_ASSET_BYTES = 10 * 1024 * 1024
+
+# ![alt](target) or ![alt](target "title"); one level of parentheses in the target
+_IMAGE_RE = re.compile(r'(!\[[^\]]*\]\(\s*<?)((?:[^()\s<>]|\([^()\s]*\))+)(>?(?:\s+"[^"]*")?\s*\))')
+_SRCSET_RE = re.compile(r"\s*(\S+?)(?:\s+(\d+(?:\.\d+)?)([wx]))?\s*(?:,|$)")
+# Lazy-loading libraries keep the real source here and a placeholder in src
+_LAZY_SRC = ("data-src", "data-lazy-src", "data-original")
+_LAZY_SRCSET = ("data-srcset", "data-lazy-srcset")
+
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    url TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    content_type TEXT,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    checked_at REAL NOT NULL
+);
+"""
+
+
+def _srcset_candidates(srcset: str) -> List[Tuple[str, str, float]]:
+    out = []
+    for m in _SRCSET_RE.finditer(srcset):
+        if m.group(1):
+            out.append((m.group(1), m.group(3) or "x", float(m.group(2) or 1)))
+    return out
+
+
+def pick_source(img: html.HtmlElement, max_width: int = MAX_IMAGE_WIDTH) -> Optional[str]:
+    """Best source of an ``<img>``: the widest ``srcset`` candidate up to ``max_width``, else ``src``."""
+    srcset = img.get("srcset") or next((img.get(a) for a in _LAZY_SRCSET if img.get(a)), None)
+    candidates = _srcset_candidates(srcset) if srcset else []
+    widths = [c for c in candidates if c[1] == "w"]
+    if widths:
+        fitting = [c for c in widths if c[2] <= max_width]
+        return (max(fitting, key=lambda c: c[2]) if fitting else min(widths, key=lambda c: c[2]))[0]
+    src = img.get("src")
+    if not src or src.startswith("data:"):
+        src = next((img.get(a) for a in _LAZY_SRC if img.get(a)), src)
+    if candidates:
+        return max(candidates, key=lambda c: c[2])[0]
+    return src
+
+
+def resolve_images(root: html.HtmlElement, base_url: str, max_width: int = MAX_IMAGE_WIDTH) -> None:
+    """Point every ``<img src>`` at the chosen candidate, as an absolute URL."""
+    for img in root.iter("img"):
+        src = pick_source(img, max_width)
+        if not src:
+            continue
+        img.set("src", src if src.startswith("data:") else urljoin(base_url, src))
+        for attr in ("srcset", "sizes") + _LAZY_SRC + _LAZY_SRCSET:
+            img.attrib.pop(attr, None)
+
+
+def image_urls(markdown: str, base_url: str) -> List[str]:
+    """Absolute http(s) image targets in the Markdown, outside code blocks, in order."""
+    urls: List[str] = []
+
+    def collect(segment: str) -> str:
+        for m in _IMAGE_RE.finditer(segment):
+            url = urljoin(base_url, m.group(2))
+            if urlparse(url).scheme in ("http", "https") and url not in urls:
+                urls.append(url)
+        return segment
+
+    outside_fences(markdown, collect)
+    return urls
+
+
+def rewrite_images(markdown: str, base_url: str, local: Callable[[str], Optional[str]]) -> str:
+    """Replace image targets for which ``local(absolute_url)`` returns a path."""
+
+    def sub(m: "re.Match[str]") -> str:
+        path = local(urljoin(base_url, m.group(2)))
+        if path is None:
+            return m.group(0)
+        if re.search(r"[\s()<>]", path):
+            path = f"<{path}>"
+        return f"{m.group(1).rstrip('<')}{path}{m.group(3).lstrip('>')}"
+
+    return outside_fences(markdown, lambda segment: _IMAGE_RE.sub(sub, segment))
+
+
+class AssetError(Exception):
+    pass
+
+
+@dataclass
+class Asset:
+    url: str
+    status: str  # downloaded, stored (same content already present), cached, revalidated or failed
+    path: Optional[Path] = None
+    size: int = 0
+    error: Optional[str] = None
+
+
+def _extension(content_type: str, url: str) -> str:
+    ext = mimetypes.guess_extension(content_type) if content_type else None
+    if ext in (None, ".jpe"):
+        ext = os.path.splitext(urlparse(url).path)[1].lower() or ".jpg"
+        ext = ext if len(ext) <= 6 and ext[1:].isalnum() else ".bin"
+    return ext
+
+
+class AssetStore:
+    """Content-addressed image store shared by all pages of a run.
+
+    Files live at ``<directory>/<sha256[:2]>/<sha256><ext>``, so the same
+    image under several URLs is stored once. ``index.sqlite`` maps URLs to
+    files with their validators: URLs checked within ``max_age`` seconds
+    are not requested again, older ones are revalidated with
+    ``If-None-Match``/``If-Modified-Since``. Downloads share one HTTP
+    client and pool, with at most ``per_host`` requests per host.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int = MAX_ASSET_BYTES,
+        types: Tuple[str, ...] = ("image/",),
+        concurrency: int = 8,
+        per_host: int = 4,
+        max_age: float = 86400.0,
+        timeout: float = 30.0,
+        headers: Optional[Iterable[str]] = None,
+        cookies: Optional[Iterable[str]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.types = types
+        self.per_host = per_host
+        self.max_age = max_age
+        self.clock = clock
+        self._timeout, self._headers, self._cookies = timeout, headers, cookies
+        self._client = None
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="webtomd-asset")
+        self._concurrency = concurrency
+        self._hosts: Dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.dir / "index.sqlite", check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_INDEX_SCHEMA)
+
+    def __enter__(self) -> "AssetStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        if self._client is not None:
+            self._client.close()
+        self._db.close()
+
+    def _http(self):
+        with self._lock:
+            if self._client is None:
+                import httpx
+
+                from .fetchers.http_fetcher import build_cookies, build_headers
+
+                headers = build_headers(self._headers)
+                headers["Accept"] = "image/avif,image/webp,image/*,*/*;q=0.8"
+                limits = httpx.Limits(max_connections=self._concurrency, max_keepalive_connections=self._concurrency)
+                self._client = httpx.Client(
+                    http2=True,
+                    timeout=self._timeout,
+                    follow_redirects=True,
+                    headers=headers,
+                    cookies=build_cookies(self._cookies),
+                    limits=limits,
+                )
+            return self._client
+
+    def _host(self, url: str) -> threading.Semaphore:
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.Semaphore(self.per_host)
+            return self._hosts[host]
+
+    def _lookup(self, url: str) -> Optional[Tuple[str, int, Optional[str], Optional[str], float]]:
+        with self._lock:
+            return self._db.execute(
+                "SELECT path, size, etag, last_modified, checked_at FROM assets WHERE url = ?", (url,)
+            ).fetchone()
+
+    def _record(self, url: str, path: str, digest: str, ctype: str, size: int, etag: Optional[str], modified: Optional[str]) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, path, digest, ctype, size, etag, modified, self.clock()),
+            )
+
+    def _touch(self, url: str) -> None:
+        with self._lock:
+            self._db.execute("UPDATE assets SET checked_at = ? WHERE url = ?", (self.clock(), url))
+
+    def fetch(self, url: str) -> Asset:
+        try:
+            return self._fetch(url)
+        except Exception as exc:
+            return Asset(url, "failed", error=str(exc) or type(exc).__name__)
+
+    def _fetch(self, url: str) -> Asset:
+        headers: Dict[str, str] = {}
+        known = self._lookup(url)
+        if known is not None and (self.dir / known[0]).is_file():
+            path, size, etag, modified, checked_at = known
+            if self.clock() - checked_at < self.max_age:
+                return Asset(url, "cached", self.dir / path, size)
+            if etag:
+                headers["If-None-Match"] = etag
+            if modified:
+                headers["If-Modified-Since"] = modified
+        with self._host(url), self._http().stream("GET", url, headers=headers) as resp:
+            if resp.status_code == 304 and known is not None:
+                self._touch(url)
+                return Asset(url, "revalidated", self.dir / known[0], known[1])
+            resp.raise_for_status()
+            ctype = resp.headers.get("content-type", "").split(";")[0].strip().lower()
+            if not ctype.startswith(self.types):
+                raise AssetError(f"content type {ctype or 'missing'} not allowed")
+            if int(resp.headers.get("content-length") or 0) > self.max_bytes:
+                raise AssetError(f"larger than {self.max_bytes} bytes")
+            digest, size, tmp = self._spool(resp.iter_bytes())
+            validators = resp.headers.get("etag"), resp.headers.get("last-modified")
+        rel = f"{digest[:2]}/{digest}{_extension(ctype, url)}"
+        target = self.dir / rel
+        with self._lock:
+            status = "stored" if target.exists() else "downloaded"
+            if status == "downloaded":
+                target.parent.mkdir(exist_ok=True)
+                os.replace(tmp, target)
+        if status == "stored":
+            os.unlink(tmp)
+        self._record(url, rel, digest, ctype, size, *validators)
+        return Asset(url, status, target, size)
+
+    def _spool(self, chunks: Iterable[bytes]) -> Tuple[str, int, str]:
+        # Hash while writing to a temporary file in the store, then rename
+        sha = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(prefix=".part-", dir=self.dir)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise AssetError(f"larger than {self.max_bytes} bytes")
+                    sha.update(chunk)
+                    fh.write(chunk)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return sha.hexdigest(), size, tmp
+
+    def fetch_many(self, urls: Iterable[str]) -> Dict[str, Asset]:
+        futures = {url: self._pool.submit(self.fetch, url) for url in dict.fromkeys(urls)}
+        return {url: future.result() for url, future in futures.items()}
+
+
+def localize_images(markdown: str, base_url: str, output: Path, store: AssetStore) -> Tuple[str, Dict[str, int]]:
+    """Download the page's images into ``store`` and link them relative to ``output``.
+
+    Images that fail (type, size, HTTP errors) keep their remote URL.
+    Returns the new Markdown and per-status counts for the run report.
+    """
+    assets = store.fetch_many(image_urls(markdown, base_url))
+    counts: Dict[str, int] = {}
+    for asset in assets.values():
+        counts[asset.status] = counts.get(asset.status, 0) + 1
+        if asset.error:
+            get_logger().debug(f"Image not stored: {asset.url}: {asset.error}")
+    counts["bytes"] = sum(a.size for a in assets.values() if a.status in ("downloaded", "stored"))
+
+    def local(url: str) -> Optional[str]:
+        asset = assets.get(url)
+        if asset is None or asset.path is None:
+            return None
+        return Path(os.path.relpath(asset.path, output.parent)).as_posix()
+
+    return rewrite_images(markdown, base_url, local), counts
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from .pipeline import RunConfig, RunReport, execute
+from .utils.dedup import MAX_DISTANCE, Deduplicator
+from .utils.logging import get_logger
+from .utils.singleflight import SingleFlight
+from .utils.url import canonicalize_url, slugify
+
+
+MANIFEST_NAME = "manifest.jsonl"
+
+
+def read_url_list(path: Path) -> List[str]:
+    """One URL per line; blank lines and ``#`` comments are skipped."""
+    urls = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            urls.append(line)
+    return urls
+
+
+def batch_output_path(out_dir: Path, url: str) -> Path:
+    # Titles repeat across a site, so batch file names come from the URL
+    parsed = urlparse(url)
+    slug = slugify(f"{parsed.netloc}{parsed.path} {parsed.query}", max_len=100)
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=4).hexdigest()
+    return out_dir / f"{slug}-{digest}.md"
+
+
+class BatchRunner:
+    """Shared state for converting many URLs into one output directory.
+
+    URLs with the same canonical form (see ``base.url_rules``), or that
+    redirect to the same page, are fetched and converted once. With ``dedup``,
+    pages whose content matches an earlier page exactly or within
+    ``max_distance`` SimHash bits are symlinked to that page's output.
+    With ``base.profile`` set, pages must run one at a time and their profiles
+    are aggregated into ``batch.pstats`` and ``batch.profile.txt``.
+    """
+
+    def __init__(self, base: RunConfig, out_dir: Path, dedup: bool = True, max_distance: int = MAX_DISTANCE) -> None:
+        self.base = base
+        self.out_dir = out_dir
+        self.dedup = Deduplicator(max_distance=max_distance) if dedup else None
+        self.flights = SingleFlight(remember=True)
+        self.logger = get_logger()
+
+    def workers(self, concurrency: int) -> int:
+        if self.base.profile is None:
+            return max(1, concurrency)
+        # cProfile and tracemalloc are process-wide: one page at a time
+        if concurrency > 1:
+            self.logger.info("Profiling: running pages sequentially")
+        return 1
+
+    def new_report(self, url: str) -> RunReport:
+        report = RunReport(url=canonicalize_url(url, self.base.url_rules))
+        if self.base.profile is not None:
+            from .utils.profiling import PageProfiler
+
+            report.profiler = PageProfiler()
+        return report
+
+    def prefetch(self, urls: Iterable[str], keepalive: Optional[Callable[[], None]] = None, every: float = 60.0) -> None:
+        """With ``--use-firecrawl``, scrape ``urls`` in one Firecrawl batch job ahead of the pages.
+
+        A batch job can take minutes; ``keepalive`` is called every ``every``
+        seconds until it ends (the job queue renews its leases).
+        """
+        if not self.base.use_firecrawl or self.base.providers is None:
+            return
+        urls = list(urls)
+        if not urls:
+            return
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="webtomd-prefetch") as helper:
+            future = helper.submit(self.base.providers.firecrawl_batch, urls)
+            while keepalive is not None and not wait([future], timeout=every).done:
+                keepalive()
+        try:
+            cached = future.result()
+        except Exception as exc:  # pages fall back to single scrapes
+            self.logger.warning(f"Firecrawl batch scrape failed: {exc}")
+            return
+        self.logger.info(f"Firecrawl batch: {cached} of {len(urls)} pages scraped")
+
+    def convert(self, report: RunReport, html: Optional[str] = None, options: Optional[Dict[str, Any]] = None) -> None:
+        """Run one page; ``html`` skips the fetch and ``options`` override ``RunConfig`` fields."""
+        cfg = replace(
+            self.base,
+            **(options or {}),
+            html=html,
+            page=report.url,
+            output=batch_output_path(self.out_dir, report.url),
+            dedup=self.dedup,
+            flights=self.flights,
+            report=None,
+            profile=None,
+        )
+        try:
+            execute(cfg, report)
+        except SystemExit as exc:
+            report.error = report.error or f"exit status {exc.code}"
+        except Exception as exc:  # keep the batch going
+            self.logger.error(f"{report.url}: {exc}")
+            report.error = str(exc) or exc.__class__.__name__
+
+    def finish(self, reports: List[RunReport], manifest: bool = True) -> None:
+        """Write the aggregated profile and the manifest, and log totals."""
+        profilers = [r.profiler for r in reports if r.profiler and r.profiler.started]
+        if self.base.profile is not None and profilers:
+            from .utils.profiling import write_profile
+
+            _, summary = write_profile(self.base.profile, "batch", profilers)
+            for report in reports:
+                report.profile = str(summary)
+            self.logger.info(f"Profile: {summary}")
+        if manifest:
+            write_manifest(self.out_dir, reports)
+        done = sum(1 for r in reports if r.output and not r.duplicate_kind)
+        dups = sum(1 for r in reports if r.duplicate_kind)
+        failed = sum(1 for r in reports if r.error)
+        self.logger.info(f"Batch: {done} written, {dups} duplicates, {failed} failed")
+
+
+def run_batch(
+    urls: Iterable[str],
+    base: RunConfig,
+    out_dir: Path,
+    concurrency: int = 4,
+    dedup: bool = True,
+    max_distance: int = MAX_DISTANCE,
+) -> List[RunReport]:
+    """Convert many URLs into ``out_dir`` and write a JSONL manifest (see ``BatchRunner``)."""
+    runner = BatchRunner(base, out_dir, dedup=dedup, max_distance=max_distance)
+    reports = [runner.new_report(url) for url in urls]
+    runner.prefetch(r.url for r in reports)
+    with ThreadPoolExecutor(max_workers=runner.workers(concurrency)) as pool:
+        list(pool.map(runner.convert, reports))
+    runner.finish(reports)
+    return reports
+
+
+def write_manifest(out_dir: Path, reports: Iterable[RunReport], name: Optional[str] = None) -> Path:
+    path = out_dir / (name or MANIFEST_NAME)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as fh:
+        for report in reports:
+            fh.write(json.dumps(report.to_dict()) + "\n")
+    return path
@@ -6,17 +6,27 @@ from typing import Optional, List
 import typer
 
 from .version import __version__
-from .utils.logging import setup_logger
-from .pipeline import RunConfig, run
 
 
 app = typer.Typer(add_completion=False, help="Convert web pages to clean Markdown.")
 
 
-@app.command()
+@app.callback(invoke_without_command=True)
 def main(
-    page: str = typer.Option(..., "-p", "--page", help="Source URL to extract"),
+    ctx: typer.Context,
+    page: Optional[str] = typer.Option(None, "-p", "--page", help="Source URL to extract"),
     output: Optional[Path] = typer.Option(None, "-o", "--output", help="Output Markdown file path"),
+    urls: Optional[Path] = typer.Option(None, "--urls", help="File with one URL per line to convert as a batch"),
+    out_dir: Path = typer.Option(Path("out"), "--out-dir", help="Output directory for --urls and crawl"),
+    concurrency: int = typer.Option(4, "--concurrency", help="Parallel conversions for --urls and crawl"),
+    job_db: Optional[Path] = typer.Option(None, "--job-db", help="SQLite job store; --urls are queued in it and an interrupted run resumes when started again"),
+    max_attempts: int = typer.Option(3, "--max-attempts", help="Attempts per URL with --job-db before it is marked failed"),
+    retry_failed: bool = typer.Option(False, "--retry-failed", help="Requeue URLs marked failed in --job-db"),
+    dedup: bool = typer.Option(True, "--dedup/--no-dedup", help="Link duplicate pages in a batch to the first copy"),
+    strip_param: List[str] = typer.Option(None, "--strip-param", help="Extra query parameter to drop when canonicalizing URLs (repeatable)", show_default=False),
+    keep_fragment: bool = typer.Option(False, "--keep-fragment", help="Treat URLs differing only in #fragment as different pages"),
+    strip_www: bool = typer.Option(False, "--strip-www", help="Treat www.host and host as the same site"),
+    near_dup_distance: int = typer.Option(3, "--near-dup-distance", help="Max SimHash bit distance for near-duplicates (-1 disables)"),
     browser: Optional[bool] = typer.Option(None, help="Force browser fetch if true, disable if false; default auto"),
     use_jina: bool = typer.Option(False, "--use-jina", help="Use Jina Reader v1 directly"),
     use_firecrawl: bool = typer.Option(False, "--use-firecrawl", help="Use Firecrawl directly"),
@@ -26,11 +36,44 @@ def main(
     cookie: List[str] = typer.Option(None, "--cookie", help="Cookie NAME=VALUE", show_default=False),
     respect_robots: bool = typer.Option(True, "--respect-robots/--ignore-robots", help="Respect robots.txt"),
     keep_images: bool = typer.Option(False, "--keep-images/--no-images", help="Keep images in output"),
+    assets: Optional[Path] = typer.Option(None, "--assets", help="Download images into this content-addressed store and link them locally (implies --keep-images)"),
+    asset_max_bytes: int = typer.Option(10 * 1024 * 1024, "--asset-max-bytes", help="Skip images larger than this"),
+    asset_per_host: int = typer.Option(4, "--asset-per-host", help="Concurrent image downloads per host"),
+    drop_selector: List[str] = typer.Option(None, "--drop-selector", help="CSS selector or XPath of boilerplate to remove (repeatable)", show_default=False),
+    strip_boilerplate: bool = typer.Option(False, "--strip-boilerplate", help="Remove cookie banners, share bars and related-post blocks"),
+    extractor: str = typer.Option("semantic", "--extractor", help="Content root selection: semantic, score or auto"),
     wrap: bool = typer.Option(True, "--wrap/--no-wrap", help="Reflow paragraphs to 80 cols"),
+    wrap_width: int = typer.Option(80, "--wrap-width", help="Column width used when reflowing"),
+    list_indent: Optional[int] = typer.Option(None, "--list-indent", help="Continuation indent for wrapped list items (default: align with item text)"),
     front_matter: bool = typer.Option(True, "--front-matter/--no-front-matter", help="Add YAML front matter"),
     llm_eval: Optional[bool] = typer.Option(None, "--llm-eval/--no-llm", help="Enable/disable LLM evaluation"),
+    strategy_memory: Optional[Path] = typer.Option(None, "--strategy-memory", help="JSON file remembering which strategy works per domain"),
+    provider_cache: Optional[Path] = typer.Option(None, "--provider-cache", help="Cache Jina/Firecrawl Markdown in this directory across runs"),
+    provider_cache_ttl: float = typer.Option(7 * 86400, "--provider-cache-ttl", help="Seconds a cached provider response stays fresh"),
+    provider_concurrency: int = typer.Option(4, "--provider-concurrency", help="Requests in flight per provider"),
+    jina_rpm: Optional[float] = typer.Option(20, "--jina-rpm", help="Jina Reader requests per minute (20 is the keyless limit)"),
+    firecrawl_rpm: Optional[float] = typer.Option(10, "--firecrawl-rpm", help="Firecrawl requests per minute (raise it to match your plan)"),
+    max_provider_credits: Optional[float] = typer.Option(None, "--max-provider-credits", help="Stop paid provider calls after this many credits in the run"),
+    browser_prune: bool = typer.Option(False, "--browser-prune/--no-browser-prune", help="Prune the rendered page in the browser and transfer only the content subtree"),
+    js_detect: bool = typer.Option(True, "--js-detect/--no-js-detect", help="Go straight to the browser when the HTTP response needs JavaScript"),
+    hydration: bool = typer.Option(True, "--hydration/--no-hydration", help="Use __NEXT_DATA__/JSON-LD article content when the page is a JS shell"),
+    report: Optional[Path] = typer.Option(None, "--report", help="Write a JSON run report (strategies, JS detector verdict)"),
+    align_tables: bool = typer.Option(False, "--align-tables", help="Pad table columns to equal width"),
+    table_csv_threshold: Optional[int] = typer.Option(None, "--table-csv-threshold", help="Write tables with more rows to a CSV file next to the output and keep a preview"),
+    sections: Optional[str] = typer.Option(None, "--sections", help="Write a section index next to the output: json or jsonl"),
+    chunk_tokens: Optional[int] = typer.Option(None, "--chunk-tokens", help="Also split sections into chunks of at most this many approximate tokens (implies --sections json)"),
+    max_nodes: Optional[int] = typer.Option(None, "--max-nodes", help="Truncate the content tree after this many elements"),
+    max_text_bytes: Optional[int] = typer.Option(None, "--max-text-bytes", help="Truncate the content tree after this much text"),
+    max_table_rows: Optional[int] = typer.Option(None, "--max-table-rows", help="Rows kept per table"),
+    max_table_cells: Optional[int] = typer.Option(None, "--max-table-cells", help="Cells kept per table"),
+    page_deadline: Optional[float] = typer.Option(None, "--page-deadline", help="Wall-clock seconds per page; conversion stops and truncates when exceeded"),
+    parallel_threshold: int = typer.Option(4_000_000, "--parallel-threshold", help="Convert and wrap pages above this many characters of HTML/Markdown in worker processes (0 disables)"),
+    parallel_workers: Optional[int] = typer.Option(None, "--parallel-workers", help="Worker processes for --parallel-threshold (default: CPU count)"),
+    hedge_delay: Optional[float] = typer.Option(None, "--hedge-delay", help="Start the next strategy alongside a slow one after this many seconds; the first passing result wins"),
     min_coverage: float = typer.Option(0.6, "--min-coverage", help="Min coverage to pass heuristics"),
     log_level: str = typer.Option("INFO", "--log-level", help="Logging level"),
+    plain_log: bool = typer.Option(False, "--plain-log", help="Plain stderr logging without Rich"),
+    profile: Optional[Path] = typer.Option(None, "--profile", help="Directory for cProfile stats and per-stage memory peaks (aggregated for --urls)"),
     llm_model: Optional[str] = typer.Option(None, "--llm-model", help="LLM model (default via env)"),
     version: bool = typer.Option(False, "--version", help="Print version and exit"),
 ):
@@ -45,9 +88,34 @@ def main(
         typer.echo(__version__)
         raise typer.Exit(code=0)
 
-    setup_logger(log_level)
+    if ctx.invoked_subcommand is None and not page and not urls and not job_db:
+        raise typer.BadParameter("either --page, --urls or --job-db is required")
+    if sections is not None and sections not in ("json", "jsonl"):
+        raise typer.BadParameter("--sections must be json or jsonl")
+    if chunk_tokens is not None and sections is None:
+        sections = "json"
+
+    # The pipeline (and everything it imports) is only loaded for real work
+    from .normalize.html_cleaner import EXTRACTORS
+    from .pipeline import RunConfig, run
+    from .utils.budget import ResourceBudget
+    from .utils.logging import setup_logger
+    from .utils.parallel import ParallelOptions
+    from .utils.url import CanonicalRules
+
+    if extractor not in EXTRACTORS:
+        raise typer.BadParameter(f"--extractor must be one of: {', '.join(EXTRACTORS)}")
+
+    setup_logger(log_level, plain=plain_log)
+    budget = ResourceBudget(
+        max_nodes=max_nodes,
+        max_text_bytes=max_text_bytes,
+        max_table_rows=max_table_rows,
+        max_table_cells=max_table_cells,
+        deadline=page_deadline,
+    )
     cfg = RunConfig(
-        page=page,
+        page=page or "",
         output=output,
         use_jina=use_jina,
         use_firecrawl=use_firecrawl,
@@ -57,17 +125,187 @@ def main(
         headers=header,
         cookies=cookie,
         respect_robots=respect_robots,
-        keep_images=keep_images,
+        keep_images=keep_images or assets is not None,
+        drop_selectors=drop_selector,
+        strip_boilerplate=strip_boilerplate,
+        extractor=extractor,
         wrap=wrap,
+        wrap_width=wrap_width,
+        list_indent=list_indent,
         front_matter=front_matter,
         llm_eval=llm_eval,
         min_coverage=min_coverage,
+        strategy_memory=strategy_memory,
+        js_detect=js_detect,
+        browser_prune=browser_prune,
+        report=report,
+        hydration=hydration,
+        align_tables=align_tables,
+        table_csv_threshold=table_csv_threshold,
+        sections=sections,
+        chunk_tokens=chunk_tokens,
+        budget=budget if budget != ResourceBudget() else None,
+        profile=profile,
+        hedge_delay=hedge_delay,
+        # Profiles only see this process
+        parallel=ParallelOptions(parallel_threshold, parallel_workers) if parallel_threshold > 0 and not profile else None,
+        url_rules=CanonicalRules(
+            strip_fragment=not keep_fragment,
+            strip_www=strip_www,
+            strip_params=frozenset(strip_param or ()),
+        ),
         log_level=log_level,
         llm_model=llm_model,
     )
+    from .providers import ProviderCache, ProviderLimits, ProviderPool
+
+    cfg.providers = ProviderPool(
+        ProviderCache(provider_cache, ttl=provider_cache_ttl),
+        {
+            "jina": ProviderLimits(provider_concurrency, jina_rpm),
+            "firecrawl": ProviderLimits(provider_concurrency, firecrawl_rpm),
+        },
+        max_credits=max_provider_credits,
+    )
+    ctx.call_on_close(lambda: _close_providers(cfg.providers))
+    if assets is not None:
+        from .assets import AssetStore
+
+        cfg.assets = AssetStore(
+            assets, max_bytes=asset_max_bytes, per_host=asset_per_host, timeout=timeout, headers=header, cookies=cookie
+        )
+        ctx.call_on_close(cfg.assets.close)
+    if ctx.invoked_subcommand is not None:
+        # Subcommands share the conversion and batch options given before them
+        ctx.obj = {
+            "cfg": cfg,
+            "out_dir": out_dir,
+            "concurrency": concurrency,
+            "dedup": dedup,
+            "max_distance": near_dup_distance,
+            "max_attempts": max_attempts,
+        }
+        return
+    if job_db:
+        from .batch import read_url_list
+        from .jobs import FAILED, JobStore, run_jobs
+
+        with JobStore(job_db, max_attempts=max_attempts) as store:
+            if urls:
+                store.add(read_url_list(urls), cfg.url_rules)
+            if retry_failed:
+                store.retry_failed()
+            counts = run_jobs(
+                store,
+                cfg,
+                out_dir,
+                concurrency=concurrency,
+                dedup=dedup,
+                max_distance=near_dup_distance,
+            )
+        if counts[FAILED]:
+            raise typer.Exit(code=1)
+        return
+    if urls:
+        from .batch import read_url_list, run_batch
+
+        reports = run_batch(
+            read_url_list(urls),
+            cfg,
+            out_dir,
+            concurrency=concurrency,
+            dedup=dedup,
+            max_distance=near_dup_distance,
+        )
+        if any(r.error for r in reports):
+            raise typer.Exit(code=1)
+        return
     run(cfg)
 
 
+def _close_providers(pool) -> None:
+    from .utils.logging import get_logger
+
+    pool.close()
+    if pool.summary():
+        get_logger().info(f"Providers: {pool.summary()}")
+
+
+@app.command()
+def crawl(
+    ctx: typer.Context,
+    seeds: List[str] = typer.Argument(..., help="Start URLs; pages are kept to their origin and directory"),
+    sitemap: List[str] = typer.Option(None, "--sitemap", help="Sitemap or sitemap index URL (repeatable; default: <origin>/sitemap.xml)", show_default=False),
+    use_sitemaps: bool = typer.Option(True, "--sitemaps/--no-sitemaps", help="Seed the crawl from sitemaps"),
+    follow_links: bool = typer.Option(True, "--follow-links/--no-follow-links", help="Queue same-site links found in converted pages"),
+    max_depth: int = typer.Option(2, "--max-depth", help="Link hops from a seed or sitemap entry"),
+    prefix: Optional[str] = typer.Option(None, "--prefix", help="Path prefix to stay under (default: the seed's directory)"),
+    max_pages: Optional[int] = typer.Option(None, "--max-pages", help="Stop after converting this many pages"),
+    seen_capacity: Optional[int] = typer.Option(None, "--seen-capacity", help="Track seen URLs in a Bloom filter sized for N URLs instead of an exact set"),
+    rewrite_links: bool = typer.Option(True, "--rewrite-links/--no-rewrite-links", help="Point links between converted pages at the local .md files"),
+):
+    """Convert a site from its sitemaps and internal links into --out-dir."""
+    from .crawl import crawl as run_crawl
+
+    opts = ctx.obj
+    reports = run_crawl(
+        seeds,
+        opts["cfg"],
+        opts["out_dir"],
+        concurrency=opts["concurrency"],
+        sitemaps=sitemap,
+        use_sitemaps=use_sitemaps,
+        follow_links=follow_links,
+        max_depth=max_depth,
+        prefix=prefix,
+        max_pages=max_pages,
+        seen_capacity=seen_capacity,
+        rewrite=rewrite_links,
+        dedup=opts["dedup"],
+        max_distance=opts["max_distance"],
+    )
+    if not reports or all(r.error for r in reports):
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def worker(
+    ctx: typer.Context,
+    queue: str = typer.Option(..., "--queue", help="Shared queue: redis://host:port/db, or sqlite:///path (or a path) for one host"),
+    prefix: str = typer.Option("webtomd", "--prefix", help="Key prefix for Redis queues"),
+    worker_id: Optional[str] = typer.Option(None, "--id", help="Worker name (default: host-pid)"),
+    enqueue: Optional[Path] = typer.Option(None, "--enqueue", help="Queue URLs (one per line) or .jsonl jobs ({\"url\", \"html\", \"options\"}) first"),
+    lease: float = typer.Option(60.0, "--lease", help="Seconds a claimed job stays reserved without a heartbeat"),
+    poll: float = typer.Option(5.0, "--poll", help="Seconds between checks for new work when the queue is empty"),
+    exit_when_empty: bool = typer.Option(False, "--exit-when-empty", help="Stop once the queue is drained instead of polling"),
+    status: bool = typer.Option(False, "--status", help="Print queue progress and per-worker throughput, then exit"),
+):
+    """Convert jobs from a queue shared by many processes and hosts; outputs go to --out-dir."""
+    from .jobs import run_jobs
+    from .worker import default_worker_id, format_progress, open_queue, read_jobs
+
+    opts = ctx.obj
+    cfg = opts["cfg"]
+    with open_queue(queue, prefix=prefix, max_attempts=opts["max_attempts"]) as q:
+        if status:
+            typer.echo(format_progress(q))
+            return
+        if enqueue:
+            added = q.put(read_jobs(enqueue, cfg.url_rules))
+            typer.echo(f"Queued {added} new jobs", err=True)
+        run_jobs(
+            q,
+            cfg,
+            opts["out_dir"],
+            concurrency=opts["concurrency"],
+            dedup=opts["dedup"],
+            max_distance=opts["max_distance"],
+            worker=worker_id or default_worker_id(),
+            lease=lease,
+            poll=None if exit_when_empty else poll,
+        )
+
+
 def entrypoint():
     app()
 
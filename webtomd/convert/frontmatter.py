@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 
 def _yaml_escape(value: str) -> str:
-    if any(ch in value for ch in [":", "-", "#", "\n", "\r"]):
-        return "|\n  " + "\n  ".join(value.splitlines())
-    return f"'{value.replace("'", "''")}'"
+    # Single quotes already protect ":", "-" and "#"; only multi-line values need a block
+    if "\n" in value or "\r" in value:
+        return "|-\n  " + "\n  ".join(value.splitlines())
+    return "'" + value.replace("'", "''") + "'"
 
 
 def compose_front_matter(meta: Dict[str, str]) -> str:
@@ -23,3 +24,12 @@ def compose_front_matter(meta: Dict[str, str]) -> str:
     lines.append("---\n")
     return "\n".join(lines)
 
+
+def split_front_matter(document: str) -> Tuple[str, str]:
+    """Split a written document into its front matter (through the closing ``---``) and the Markdown."""
+    if not document.startswith("---\n"):
+        return "", document
+    end = document.find("\n---\n")
+    if end < 0:
+        return "", document
+    return document[: end + 5], document[end + 5 :]
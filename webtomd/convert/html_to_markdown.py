@@ -1,72 +1,31 @@
 from __future__ import annotations
 
-from typing import Optional
+from dataclasses import replace
+from html import escape
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from lxml import html, etree
 from markdownify import MarkdownConverter
 
+from ..normalize.html_cleaner import BLOCK_KEEP
+from ..utils.io import iter_lines
+from .tables import TableOptions, TableSidecars, render_table
 
-class WebToMdConverter(MarkdownConverter):
-    def _el_text(self, el) -> str:
-        # Works for both BeautifulSoup Tag and lxml elements
-        get_text = getattr(el, "get_text", None)
-        if callable(get_text):
-            # Join with spaces and strip extra whitespace
-            text = " ".join(list(el.stripped_strings))
-        else:
-            # Fallbacks for other element types
-            text = getattr(el, "text", "") or ""
-        return " ".join(text.split())
+if TYPE_CHECKING:  # pragma: no cover
+    from ..utils.budget import BudgetMeter
+    from ..utils.parallel import ParallelOptions
 
-    def convert_table(self, el, text, parent_tags):  # pipe tables
-        # Build header from thead if present; otherwise fall back to first row
-        rows = []
-        header = []
-
-        thead = el.find("thead")
-        if thead is not None:
-            tr = thead.find("tr")
-            if tr is not None:
-                header = [self._el_text(td) for td in tr.find_all(["th", "td"]) or []]
-
-        # Gather all body rows (all <tr> not under <thead>)
-        trs = []
-        for tr in el.find_all("tr"):
-            # Skip header rows
-            if tr.find_parent("thead") is not None:
-                continue
-            trs.append(tr)
-
-        # If header missing, use the first row as header
-        if not header and trs:
-            first = trs.pop(0)
-            header = [self._el_text(td) for td in first.find_all(["th", "td"]) or []]
-
-        # Extract body cell values
-        for tr in trs:
-            cells = tr.find_all("td")
-            if not cells:
-                cells = tr.find_all("th")
-            if not cells:
-                continue
-            rows.append([self._el_text(td) for td in cells])
+Block = Union[str, List[str]]
 
-        if not header:
-            # Fallback to default behavior if we can't infer a header
-            return super().convert_table(el, text, parent_tags)
-
-        n = len(header)
-        sep = ["---"] * n
 
-        def line(cells):
-            return "| " + " | ".join(cells) + " |"
-
-        parts = ["", line(header), line(sep)]
-        for r in rows:
-            if len(r) < n:
-                r = r + [""] * (n - len(r))
-            parts.append(line(r[:n]))
-        parts.append("")
-        return "\n".join(parts)
+class WebToMdConverter(MarkdownConverter):
+    def convert_table(self, el, text, parent_tags):  # pipe tables
+        # Tables nested in other blocks arrive as BeautifulSoup tags; re-parse
+        # them for the lxml renderer used on the fast path
+        table = html.fragment_fromstring(str(el))
+        lines = render_table(table, self.options.get("tables"))
+        if lines is None:
+            return super().convert_table(el, text, parent_tags)
+        return "\n" + "\n".join(lines) + "\n"
 
     def convert_pre(self, el, text, parent_tags):  # code blocks
         # Try to detect language from a nested <code class="language-...">
@@ -95,24 +54,208 @@ class WebToMdConverter(MarkdownConverter):
         return "\n---\n\n"
 
 
-def _converter() -> WebToMdConverter:
-    return WebToMdConverter(bullets="*", escape_asterisks=False, strip="\n")
+def _converter(tables: Optional[TableOptions] = None) -> WebToMdConverter:
+    return WebToMdConverter(bullets="*", escape_asterisks=False, strip="\n", tables=tables)
+
+
+# Roots whose children are converted block by block; anything else is
+# converted as a single fragment.
+SPLIT_CONTAINERS = {"html", "body", "main", "article", "section", "div", "header", "footer"}
+
+
+def iter_fragments(root: html.HtmlElement) -> Iterator[Union[str, html.HtmlElement]]:
+    """Serialize the top-level blocks of ``root`` one at a time.
+
+    Consecutive inline children and loose text are grouped into one ``<div>`` so
+    that they stay on the same Markdown line. Tables are yielded as elements
+    for the dedicated table renderer.
+    """
+    if root.tag == "table":
+        yield root
+        return
+    if root.tag not in SPLIT_CONTAINERS or not len(root):
+        yield etree.tostring(root, encoding="unicode", with_tail=False)
+        return
+    inline: List[str] = []
+    if root.text and root.text.strip():
+        inline.append(escape(root.text))
+    for child in root:
+        if isinstance(child.tag, str) and child.tag in BLOCK_KEEP:
+            if inline:
+                yield "<div>" + "".join(inline) + "</div>"
+                inline = []
+            yield child if child.tag == "table" else etree.tostring(child, encoding="unicode", with_tail=False)
+            if child.tail and child.tail.strip():
+                inline.append(escape(child.tail))
+        else:
+            inline.append(etree.tostring(child, encoding="unicode", with_tail=True))
+    if inline:
+        yield "<div>" + "".join(inline) + "</div>"
+
+
+def iter_markdown_blocks(
+    root: html.HtmlElement,
+    conv: Optional[WebToMdConverter] = None,
+    meter: Optional["BudgetMeter"] = None,
+    tables: Optional[TableOptions] = None,
+    parallel: Optional["ParallelOptions"] = None,
+) -> Iterator[Block]:
+    """Convert ``root`` block by block; rendered tables are yielded as lists of lines.
+
+    With ``parallel``, once the blocks converted so far add up to its
+    threshold, the rest of the page is converted in worker processes. Blocks
+    convert independently, so the output is the same either way.
+    """
+    conv = conv or _converter(tables)
+    fragments = iter_fragments(root)
+    seen = 0
+    for i, fragment in enumerate(fragments):
+        if meter is not None and meter.expired():
+            meter.truncate("deadline", "convert", blocks=i)
+            return
+        if parallel is not None:
+            seen += len(fragment) if isinstance(fragment, str) else len(etree.tostring(fragment))
+        if not isinstance(fragment, str):
+            lines = render_table(fragment, tables)
+            if lines is not None:
+                yield lines
+                fragment = None
+            else:
+                fragment = etree.tostring(fragment, encoding="unicode", with_tail=False)
+        if fragment is not None:
+            md = conv.convert(fragment)
+            if md:
+                yield md
+        if parallel is not None and parallel.applies(seen):
+            yield from _convert_in_workers(fragments, i + 1, parallel, meter, tables)
+            return
+
+
+# Sidecar names made in workers; renumbered in document order by the parent
+_WORKER_STEM = "\0sidecar"
+
+
+def convert_fragments(fragments: List[Tuple[bool, str]], tables: Optional[TableOptions] = None) -> List[Tuple[Block, Dict[str, List[List[str]]]]]:
+    """Markdown blocks for serialized ``(is_table, markup)`` fragments; runs in worker processes.
+
+    Each block comes with the CSV sidecar tables it created, by their
+    provisional names.
+    """
+    conv = _converter(tables)
+    sidecars = tables.sidecars if tables is not None else None
+    out: List[Tuple[Block, Dict[str, List[List[str]]]]] = []
+    for is_table, markup in fragments:
+        before = len(sidecars.tables) if sidecars is not None else 0
+        block: Optional[Block] = None
+        if is_table:
+            block = render_table(html.fragment_fromstring(markup), tables)
+        if block is None:
+            block = conv.convert(markup)
+        if block:
+            out.append((block, dict(sidecars.tables[before:]) if sidecars is not None else {}))
+    return out
+
+
+def _convert_in_workers(
+    fragments: Iterator[Union[str, html.HtmlElement]],
+    first: int,
+    parallel: "ParallelOptions",
+    meter: Optional["BudgetMeter"],
+    tables: Optional[TableOptions],
+) -> Iterator[Block]:
+    from ..utils.parallel import PARTS_PER_WORKER, partition, process_pool
+
+    rest = [
+        (False, f) if isinstance(f, str) else (True, etree.tostring(f, encoding="unicode", with_tail=False)) for f in fragments
+    ]
+    workers = parallel.worker_count()
+    ranges = partition([len(markup) for _, markup in rest], workers * PARTS_PER_WORKER)
+    sidecars = tables.sidecars if tables is not None else None
+    # Each task gets its own empty sidecar list
+    task_tables = replace(tables, sidecars=TableSidecars(_WORKER_STEM)) if tables is not None and sidecars is not None else tables
+    pool = process_pool(workers)
+    futures = [pool.submit(convert_fragments, rest[a:b], task_tables) for a, b in ranges]
+    try:
+        for (a, _), future in zip(ranges, futures):
+            if meter is not None and meter.expired():
+                meter.truncate("deadline", "convert", blocks=first + a)
+                return
+            for block, made in future.result():
+                # Workers only make sidecars when they were given a list of their own
+                if sidecars is not None:
+                    for provisional, rows in made.items():
+                        # Same names as a serial run: sidecars are numbered in document order
+                        name = sidecars.add(rows)
+                        if isinstance(block, str):
+                            block = block.replace(f"]({provisional})", f"]({name})")
+                        else:
+                            block = [line.replace(f"]({provisional})", f"]({name})") for line in block]
+                yield block
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def post_process_lines(blocks: Iterable[Union[str, List[str]]]) -> Iterator[str]:
+    """Streaming post-processing over Markdown blocks.
+
+    Strips trailing spaces, collapses runs of blank lines into one and trims
+    leading/trailing blank lines; blocks are separated by a blank line. A block
+    may also be given as a list of lines.
+    """
+    started = False
+    pending_blank = False
+    for block in blocks:
+        for line in block.splitlines() if isinstance(block, str) else block:
+            line = line.rstrip()
+            if not line:
+                pending_blank = started
+                continue
+            if not started:
+                line = line.lstrip()
+                started = True
+            elif pending_blank:
+                yield ""
+            pending_blank = False
+            yield line
+        pending_blank = started
+
+
+def iter_markdown(
+    root: html.HtmlElement,
+    meter: Optional["BudgetMeter"] = None,
+    tables: Optional[TableOptions] = None,
+    conv: Optional[WebToMdConverter] = None,
+    parallel: Optional["ParallelOptions"] = None,
+) -> Iterator[str]:
+    """Yield the Markdown for ``root`` line by line, without newlines."""
+    return post_process_lines(iter_markdown_blocks(root, conv, meter=meter, tables=tables, parallel=parallel))
+
+
+def to_markdown(
+    root: html.HtmlElement,
+    meter: Optional["BudgetMeter"] = None,
+    tables: Optional[TableOptions] = None,
+    conv: Optional[WebToMdConverter] = None,
+    parallel: Optional["ParallelOptions"] = None,
+) -> str:
+    """``conv`` may be shared between threads as long as its table options carry no sidecars."""
+    return "\n".join(iter_markdown(root, meter, tables, conv, parallel)) + "\n"
 
 
-def to_markdown(root: html.HtmlElement) -> str:
-    # Clone the element into a standalone HTML string
-    html_str = etree.tostring(root, encoding="unicode")
-    conv = _converter()
-    md = conv.convert(html_str)
-    # Post-process spacing
-    md = _post_process(md)
-    return md
+def markdown_title(md: str) -> Optional[str]:
+    """First level-one heading (ATX ``# Title`` or setext ``Title\\n===``)."""
+    prev = ""
+    for line in iter_lines(md):
+        s = line.strip()
+        if s.startswith("# "):
+            return s[2:].strip() or None
+        if prev and s and not s.strip("="):
+            return prev
+        prev = s
+    return None
 
 
 def _post_process(md: str) -> str:
-    # Remove trailing spaces; collapse >=3 newlines to 2; ensure spacing around headings
-    lines = [line.rstrip() for line in md.splitlines()]
-    md2 = "\n".join(lines)
-    while "\n\n\n" in md2:
-        md2 = md2.replace("\n\n\n", "\n\n")
-    return md2.strip() + "\n"
+    # Remove trailing spaces; collapse >=3 newlines to 2; strip the document
+    return "\n".join(post_process_lines([md])) + "\n"
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .wrap import BLANK, FENCE, HEADING, LIST, QUOTE, RULE, TABLE, UNDERLINE, classify_line
+
+
+_BLOCK_TYPES = {FENCE: "code", TABLE: "table", HEADING: "heading", QUOTE: "quote", LIST: "list", RULE: "rule"}
+# Blocks that are only ever split between lines when a chunk overflows
+_SPLITTABLE = {"paragraph", "list", "quote"}
+
+
+def approx_tokens(chars: int) -> int:
+    # About four characters per token for English text with common tokenizers
+    return (chars + 3) // 4
+
+
+@dataclass
+class _Line:
+    text: str
+    start: int  # byte offset
+    end: int  # byte offset after the newline
+    char_start: int
+    char_end: int
+
+
+@dataclass
+class Section:
+    heading: Optional[str]  # None for text before the first heading
+    level: int  # 0 for text before the first heading
+    path: List[str]  # headings from the top level down to this one
+    start: int  # byte offsets in the written file
+    end: int
+    chars: int = 0
+    tokens: int = 0
+    blocks: Dict[str, int] = field(default_factory=dict)  # block type -> count
+
+
+@dataclass
+class Chunk:
+    path: List[str]
+    start: int
+    end: int
+    chars: int
+    tokens: int
+    blocks: List[str]  # block types in order; "paragraph+" marks part of a split block
+
+
+class SectionIndex:
+    """Headings, sections and optional chunks of a Markdown document, built while it is written.
+
+    ``feed`` passes the output chunks through unchanged and classifies the
+    lines as they go by, so offsets are byte offsets into the file exactly
+    as written (``offset`` is where the Markdown starts, after any front
+    matter). With ``chunk_tokens``, each section is also split into chunks of
+    at most that many approximate tokens at block boundaries; code blocks and
+    tables are never split, even when they alone exceed the limit.
+    """
+
+    def __init__(self, chunk_tokens: Optional[int] = None, offset: int = 0) -> None:
+        self.chunk_tokens = chunk_tokens
+        self.offset = offset
+        self.sections: List[Section] = []
+        self.chunks: List[Chunk] = []
+        self.size = offset
+        self._pos = offset
+        self._chars = 0
+        self._block: List[_Line] = []
+        self._fence: Optional[str] = None
+        self._path: List[Tuple[int, str]] = []
+        self._section_chars = 0
+        self._chunk: List[Tuple[str, List[_Line]]] = []
+
+    def feed(self, chunks: Iterable[str]) -> Iterator[str]:
+        partial = ""
+        for chunk in chunks:
+            yield chunk
+            lines = (partial + chunk).split("\n")
+            partial = lines.pop()
+            for line in lines:
+                self._line(line, newline=True)
+        if partial:
+            self._line(partial, newline=False)
+        self._end_block()
+        self._close_section(self._pos, self._chars)
+
+    def _line(self, text: str, newline: bool) -> None:
+        size = len(text.encode("utf-8")) + newline
+        line = _Line(text, self._pos, self._pos + size, self._chars, self._chars + len(text) + newline)
+        self._pos, self._chars = line.end, line.char_end
+        self.size = self._pos
+        if self._fence is not None:
+            self._block.append(line)
+            if text.lstrip().startswith(self._fence):
+                self._fence = None
+                self._end_block()
+            return
+        kind = classify_line(text)
+        if kind == BLANK:
+            self._end_block()
+            return
+        if kind == FENCE:
+            self._end_block()
+            self._fence = text.lstrip()[:3]
+        self._block.append(line)
+
+    def _end_block(self) -> None:
+        if not self._block:
+            return
+        lines, self._block = self._block, []
+        self._fence = None
+        kind = _BLOCK_TYPES.get(classify_line(lines[0].text), "paragraph")
+        if kind == "heading":
+            s = lines[0].text.lstrip()
+            level = len(s) - len(s.lstrip("#"))
+            self._heading(lines[0], level, s[level:].strip().rstrip("#").strip())
+            self._add_block("heading", lines[:1])
+            lines, kind = lines[1:], "paragraph"
+        elif len(lines) > 1 and classify_line(lines[1].text) in (UNDERLINE, RULE):
+            # Setext heading; whatever follows the underline is a paragraph
+            self._heading(lines[0], 1 if lines[1].text.lstrip().startswith("=") else 2, lines[0].text.strip())
+            self._add_block("heading", lines[:2])
+            lines, kind = lines[2:], "paragraph"
+        if lines:
+            self._add_block(kind, lines)
+
+    def _heading(self, line: _Line, level: int, title: str) -> None:
+        self._close_section(line.start, line.char_start)
+        while self._path and self._path[-1][0] >= level:
+            self._path.pop()
+        self._path.append((level, title))
+        self.sections.append(Section(title, level, [t for _, t in self._path], line.start, line.start))
+        self._section_chars = line.char_start
+
+    def _add_block(self, kind: str, lines: List[_Line]) -> None:
+        if not self.sections:
+            self.sections.append(Section(None, 0, [], lines[0].start, lines[0].start))
+            self._section_chars = lines[0].char_start
+        section = self.sections[-1]
+        section.blocks[kind] = section.blocks.get(kind, 0) + 1
+        if self.chunk_tokens is None:
+            return
+        # Sizes run from the chunk's first line, so blank lines between blocks count
+        if kind not in _SPLITTABLE or approx_tokens(lines[-1].char_end - lines[0].char_start) <= self.chunk_tokens:
+            if self._chunk and self._tokens_to(lines[-1]) > self.chunk_tokens:
+                self._flush_chunk()
+            self._chunk.append((kind, lines))
+            return
+        # Fill the current chunk and then new ones line by line; a single
+        # overlong line stays whole
+        part: List[_Line] = []
+        for line in lines:
+            if (self._chunk or part) and self._tokens_to(line, part) > self.chunk_tokens:
+                if part:
+                    self._chunk.append((kind + "+", part))
+                    part = []
+                self._flush_chunk()
+            part.append(line)
+        self._chunk.append((kind + "+", part))
+
+    def _tokens_to(self, line: _Line, part: Optional[List[_Line]] = None) -> int:
+        first = self._chunk[0][1][0] if self._chunk else part[0] if part else line
+        return approx_tokens(line.char_end - first.char_start)
+
+    def _flush_chunk(self) -> None:
+        if not self._chunk:
+            return
+        first, last = self._chunk[0][1][0], self._chunk[-1][1][-1]
+        chars = last.char_end - first.char_start
+        path = self.sections[-1].path if self.sections else []
+        blocks = [kind for kind, _ in self._chunk]
+        self.chunks.append(Chunk(list(path), first.start, last.end, chars, approx_tokens(chars), blocks))
+        self._chunk = []
+
+    def _close_section(self, end: int, char_end: int) -> None:
+        self._flush_chunk()
+        if self.sections:
+            section = self.sections[-1]
+            section.end = end
+            section.chars = char_end - self._section_chars
+            section.tokens = approx_tokens(section.chars)
+
+    def to_dict(self, source: Optional[str] = None) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"source": source, "bytes": self.size, "body_start": self.offset}
+        data["sections"] = [asdict(s) for s in self.sections]
+        if self.chunk_tokens is not None:
+            data["chunk_tokens"] = self.chunk_tokens
+            data["chunks"] = [asdict(c) for c in self.chunks]
+        return data
+
+    def records(self, source: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        for s in self.sections:
+            yield {"type": "section", "source": source, **asdict(s)}
+        for c in self.chunks:
+            yield {"type": "chunk", "source": source, **asdict(c)}
+
+    def write(self, output: Path, fmt: str = "json") -> Path:
+        """Write the index next to ``output`` as ``<stem>.sections.json`` or ``.sections.jsonl``."""
+        path = output.with_name(f"{output.stem}.sections.{fmt}")
+        if fmt == "jsonl":
+            text = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in self.records(output.name))
+        else:
+            text = json.dumps(self.to_dict(output.name), ensure_ascii=False, indent=2) + "\n"
+        path.write_text(text, encoding="utf-8")
+        return path
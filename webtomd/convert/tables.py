@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from lxml import html
+
+
+# Spans beyond these are treated as markup errors
+MAX_COLSPAN = 1000
+MAX_ROWSPAN = 65534
+
+_SECTIONS = {"thead", "tbody", "tfoot"}
+_CELLS = ("td", "th")
+
+
+@dataclass
+class TableOptions:
+    align: bool = False  # pad columns to equal width
+    csv_threshold: Optional[int] = None  # body rows above which a CSV sidecar is written
+    preview_rows: int = 5  # rows kept inline when a sidecar is used
+    sidecars: Optional["TableSidecars"] = None
+
+
+@dataclass
+class TableSidecars:
+    """CSV files for oversized tables, written next to the output once it is saved."""
+
+    stem: str
+    tables: List[Tuple[str, List[List[str]]]] = field(default_factory=list)
+
+    def add(self, rows: List[List[str]]) -> str:
+        name = f"{self.stem}.table-{len(self.tables) + 1}.csv"
+        self.tables.append((name, rows))
+        return name
+
+    def text(self) -> str:
+        """Cell text of all sidecar tables, for coverage checks."""
+        return " ".join(" ".join(r) for _, rows in self.tables for r in rows)
+
+    def write(self, directory: Path) -> List[Path]:
+        paths = []
+        for name, rows in self.tables:
+            path = directory / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("w", encoding="utf-8", newline="") as fh:
+                csv.writer(fh).writerows(rows)
+            paths.append(path)
+        return paths
+
+
+def _iter_rows(table: html.HtmlElement) -> Iterator[Tuple[bool, html.HtmlElement]]:
+    # Direct rows only (children or section children), so rows of nested
+    # tables never leak into this one. Yields (is_header_section, tr).
+    for child in table:
+        tag = child.tag
+        if tag == "tr":
+            yield False, child
+        elif tag in _SECTIONS:
+            for tr in child:
+                if tr.tag == "tr":
+                    yield tag == "thead", tr
+
+
+def cell_text(cell: html.HtmlElement) -> str:
+    return " ".join(" ".join(cell.itertext()).split())
+
+
+def _span(cell: html.HtmlElement, attr: str, limit: int) -> int:
+    try:
+        n = int(cell.get(attr, 1))
+    except ValueError:
+        return 1
+    if n <= 0 and attr == "rowspan":
+        return limit  # rowspan=0: to the end of the table
+    return max(1, min(n, limit))
+
+
+def table_grid(table: html.HtmlElement) -> Tuple[List[List[str]], int]:
+    """Lay out the table as a grid in one pass over its rows.
+
+    ``colspan`` cells occupy their extra columns with empty strings; ``rowspan``
+    cells repeat their text in the rows below. Returns ``(rows, header_rows)``
+    where ``header_rows`` counts leading rows that came from ``<thead>``.
+    """
+    rows: List[List[str]] = []
+    header_rows = 0
+    pending: Dict[int, Tuple[int, str]] = {}  # column -> (rows left, text)
+    in_header = True
+    for is_head, tr in _iter_rows(table):
+        row: List[str] = []
+        col = 0
+
+        def fill_pending() -> None:
+            nonlocal col
+            while col in pending:
+                left, text = pending[col]
+                row.append(text)
+                if left <= 1:
+                    del pending[col]
+                else:
+                    pending[col] = (left - 1, text)
+                col += 1
+
+        for cell in tr:
+            if cell.tag not in _CELLS:
+                continue
+            fill_pending()
+            text = cell_text(cell)
+            colspan = _span(cell, "colspan", MAX_COLSPAN)
+            rowspan = _span(cell, "rowspan", MAX_ROWSPAN)
+            for k in range(colspan):
+                row.append(text if k == 0 else "")
+                if rowspan > 1:
+                    pending[col] = (rowspan - 1, text if k == 0 else "")
+                col += 1
+        # Spans continuing to the right of this row's last cell
+        while pending and col <= max(pending):
+            if col in pending:
+                fill_pending()
+            else:
+                row.append("")
+                col += 1
+        if not row:
+            continue
+        rows.append(row)
+        if in_header and is_head:
+            header_rows += 1
+        else:
+            in_header = False
+    return rows, header_rows
+
+
+def _line(cells: List[str], widths: Optional[List[int]]) -> str:
+    if widths:
+        cells = [c.ljust(w) for c, w in zip(cells, widths)]
+    return "| " + " | ".join(cells) + " |"
+
+
+def render_table(table: html.HtmlElement, options: Optional[TableOptions] = None) -> Optional[List[str]]:
+    """Render ``table`` as pipe-table lines, or None when it has no rows.
+
+    The ``<thead>`` rows (merged column-wise when there are several), or else
+    the first row, form the header; the column count is the widest row.
+    Tables with more than ``options.csv_threshold`` body rows are written to a
+    CSV sidecar and only previewed inline.
+    """
+    options = options or TableOptions()
+    rows, header_rows = table_grid(table)
+    if not rows:
+        return None
+    n = max(len(r) for r in rows)
+    for r in rows:
+        if len(r) < n:
+            r.extend([""] * (n - len(r)))
+    if header_rows > 1:
+        header = [" ".join(dict.fromkeys(c for c in col if c)) for col in zip(*rows[:header_rows])]
+        rows = [header] + rows[header_rows:]
+    header, body = rows[0], rows[1:]
+
+    footer: Optional[str] = None
+    if options.csv_threshold is not None and options.sidecars is not None and len(body) > options.csv_threshold:
+        name = options.sidecars.add(rows)
+        footer = f"[Full table: {len(body)} rows × {n} columns]({name})"
+        body = body[: options.preview_rows]
+
+    header = [c.replace("|", "\\|") for c in header]
+    body = [[c.replace("|", "\\|") for c in r] for r in body]
+    widths: Optional[List[int]] = None
+    if options.align:
+        widths = [max(3, len(header[i]), *(len(r[i]) for r in body)) for i in range(n)]
+    sep = ["-" * w for w in widths] if widths else ["---"] * n
+    lines = [_line(header, widths), _line(sep, None)]
+    lines.extend(_line(r, widths) for r in body)
+    if footer:
+        lines.extend(["", footer])
+    return lines
@@ -1,53 +1,232 @@
 from __future__ import annotations
 
-import textwrap
+import re
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple
 
+if TYPE_CHECKING:  # pragma: no cover
+    from ..utils.parallel import ParallelOptions
 
-def reflow_paragraphs(md: str, width: int = 80) -> str:
-    lines = md.splitlines()
-    out = []
-    in_code = False
-    in_table = False
-    buf = []
 
-    def flush_buf():
-        nonlocal buf
-        if not buf:
-            return
-        para = " ".join([l.strip() for l in buf])
-        wrapped = textwrap.fill(para, width=width)
-        out.extend(wrapped.splitlines())
-        buf = []
+# Line kinds produced by classify_line
+BLANK = 0
+TEXT = 1
+FENCE = 2
+TABLE = 3
+HEADING = 4
+QUOTE = 5
+LIST = 6
+RULE = 7
+UNDERLINE = 8
+
+_ordered_re = re.compile(r"\d{1,9}[.)] ")
+# Inline code spans and links are never split across lines
+_protected_re = re.compile(r"`[^`]*`|!?\[[^\]]*\]\([^)]*\)")
+
+
+def classify_line(line: str) -> int:
+    s = line.lstrip()
+    if not s:
+        return BLANK
+    c = s[0]
+    if c == "#":
+        return HEADING
+    if c == ">":
+        return QUOTE
+    if c == "|":
+        return TABLE
+    if c == "`" or c == "~":
+        return FENCE if s.startswith(("```", "~~~")) else TEXT
+    if c in "-*_+":
+        if c != "+" and len(s) >= 3 and not s.replace(c, "").replace(" ", ""):
+            return RULE
+        if c != "_" and s[1:2] == " ":
+            return LIST
+        return TEXT
+    if c == "=" and not s.rstrip().replace("=", ""):
+        return UNDERLINE
+    if c.isdigit() and _ordered_re.match(s):
+        return LIST
+    return TEXT
+
+
+def list_marker(line: str) -> str:
+    """Return the leading indent plus list marker (including its space)."""
+    s = line.lstrip()
+    indent = line[: len(line) - len(s)]
+    if s[0].isdigit():
+        m = _ordered_re.match(s)
+        return indent + (m.group(0) if m else "")
+    return indent + s[:2]
+
+
+def _span_end(starts: List[int], spans: List[Tuple[int, int]], pos: int) -> int:
+    # End of the protected span strictly containing pos, or -1
+    i = bisect_right(starts, pos) - 1
+    if i >= 0 and spans[i][0] < pos < spans[i][1]:
+        return spans[i][1]
+    return -1
+
+
+def wrap_text(text: str, width: int = 80, first_prefix: str = "", rest_prefix: str = "") -> List[str]:
+    """Greedy word wrap that never breaks words, inline code or links.
+
+    Break points are located with ``str.rfind`` per output line rather than by
+    measuring every word, which keeps long paragraphs cheap.
+    """
+    if "`" in text:
+        text = text.strip()  # keep spacing inside code spans
+    else:
+        text = " ".join(text.split())
+    spans: List[Tuple[int, int]] = []
+    if "`" in text or "](" in text:
+        spans = [m.span() for m in _protected_re.finditer(text)]
+    starts = [s for s, _ in spans]
+
+    lines: List[str] = []
+    n = len(text)
+    avail = max(1, width - len(first_prefix))
+    rest_avail = max(1, width - len(rest_prefix))
+    prefix = first_prefix
+    start = 0
+    while n - start > avail:
+        limit = start + avail
+        brk = text.rfind(" ", start, limit + 1)
+        while brk > start and spans:
+            end = _span_end(starts, spans, brk)
+            if end < 0:
+                break
+            brk = text.rfind(" ", start, spans[bisect_right(starts, brk) - 1][0])
+        if brk <= start:
+            # Overlong word (or span): break right after it
+            brk = text.find(" ", limit)
+            while brk >= 0 and spans:
+                end = _span_end(starts, spans, brk)
+                if end < 0:
+                    break
+                brk = text.find(" ", end)
+            if brk < 0:
+                break
+        if spans:
+            lines.append(prefix + text[start:brk].rstrip())
+            start = brk + 1
+            while start < n and text[start] == " ":
+                start += 1
+        else:
+            lines.append(prefix + text[start:brk])
+            start = brk + 1
+        prefix = rest_prefix
+        avail = rest_avail
+    if start < n:
+        lines.append(prefix + text[start:])
+    return lines
+
+
+def reflow_lines(lines: Iterable[str], width: int = 80, list_indent: Optional[int] = None) -> Iterator[str]:
+    """Reflow paragraphs and list items in a stream of Markdown lines.
+
+    Code fences, tables, headings (ATX and setext), blockquotes and rules pass
+    through untouched. Continuation lines of list items are indented to align
+    with the item text, or by ``list_indent`` spaces when given.
+    """
+    buf: List[str] = []
+    first_prefix = rest_prefix = ""
+    fence: Optional[str] = None
+
+    def flush() -> Iterator[str]:
+        para = " ".join(buf)
+        if len(para) + len(first_prefix) <= width:
+            yield first_prefix + para
+        else:
+            yield from wrap_text(para, width, first_prefix, rest_prefix)
+        buf.clear()
 
     for line in lines:
-        if line.strip().startswith("```"):
-            flush_buf()
-            in_code = not in_code
-            out.append(line)
+        if fence is not None:
+            yield line
+            if line.lstrip().startswith(fence):
+                fence = None
             continue
-        if in_code:
-            out.append(line)
+        kind = classify_line(line)
+        if kind == TEXT:
+            if not buf:
+                first_prefix = rest_prefix = ""
+            buf.append(line.strip())
             continue
-        if "|" in line:
-            # crude table detection: keep as-is
-            flush_buf()
-            out.append(line)
-            in_table = True if line.strip() else in_table
+        if buf:
+            if kind == UNDERLINE or kind == RULE:
+                # Setext heading: keep its text on one line
+                yield first_prefix + " ".join(buf)
+                buf.clear()
+            else:
+                yield from flush()
+        if kind == LIST:
+            marker = list_marker(line)
+            indent = line[: len(line) - len(line.lstrip())]
+            first_prefix = marker
+            rest_prefix = indent + " " * (len(marker) - len(indent) if list_indent is None else list_indent)
+            item = line[len(marker):].strip()
+            if item:
+                buf.append(item)
+            else:
+                yield line
             continue
-        if in_table and not line.strip():
-            in_table = False
-            out.append(line)
-            continue
-        if not line.strip():
-            flush_buf()
-            out.append("")
-            continue
-        if line.lstrip().startswith(("#", ">", "- ", "* ", "1. ")):
-            flush_buf()
-            out.append(line)
+        if kind == FENCE:
+            s = line.lstrip()
+            fence = s[:3]
+        yield "" if kind == BLANK else line
+    if buf:
+        yield from flush()
+
+
+def independent_runs(lines: Iterable[str]) -> Iterator[List[str]]:
+    """Group lines into runs that each end with a blank line outside code fences.
+
+    ``reflow_lines`` carries no state past such a line, so runs reflow
+    independently and their results concatenate to the whole.
+    """
+    run: List[str] = []
+    fence: Optional[str] = None
+    for line in lines:
+        run.append(line)
+        if fence is not None:
+            if line.lstrip().startswith(fence):
+                fence = None
             continue
-        buf.append(line)
-    flush_buf()
+        kind = classify_line(line)
+        if kind == FENCE:
+            fence = line.lstrip()[:3]
+        elif kind == BLANK:
+            yield run
+            run = []
+    if run:
+        yield run
+
+
+def _reflow_run(lines: List[str], width: int, list_indent: Optional[int]) -> List[str]:
+    return list(reflow_lines(lines, width, list_indent))
+
+
+def reflow_lines_parallel(
+    lines: Iterable[str], parallel: "ParallelOptions", width: int = 80, list_indent: Optional[int] = None
+) -> Iterator[str]:
+    """``reflow_lines`` over partitions of ``lines`` in worker processes; same output."""
+    from ..utils.parallel import PARTS_PER_WORKER, partition, process_pool
+
+    runs = list(independent_runs(lines))
+    workers = parallel.worker_count()
+    ranges = partition([sum(map(len, run)) for run in runs], workers * PARTS_PER_WORKER)
+    pool = process_pool(workers)
+    futures = [pool.submit(_reflow_run, [line for run in runs[a:b] for line in run], width, list_indent) for a, b in ranges]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def reflow_paragraphs(md: str, width: int = 80, list_indent: Optional[int] = None) -> str:
+    out = list(reflow_lines(md.splitlines(), width=width, list_indent=list_indent))
     out.append("")
     return "\n".join(out)
-
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import os
+import re
+import zlib
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urldefrag, urljoin, urlparse
+
+from lxml import etree
+
+from .batch import BatchRunner
+from .convert.frontmatter import split_front_matter
+from .convert.sections import SectionIndex
+from .pipeline import RunConfig, RunReport
+from .utils.bloom import BloomFilter, ExactSet
+from .utils.dedup import MAX_DISTANCE
+from .utils.logging import get_logger
+from .utils.markdown import outside_fences
+from .utils.url import CanonicalRules, canonicalize_url
+
+
+# The sitemap protocol caps files at 50 MB uncompressed; leave some slack
+MAX_SITEMAP_BYTES = 64 * 1024 * 1024
+MAX_SITEMAPS = 1000
+
+# [text](target) or [text](target "title"), not images; one level of
+# parentheses inside the target (Wikipedia-style URLs)
+_LINK_RE = re.compile(r'(?<!!)(\[[^\]]*\]\(\s*<?)((?:[^()\s<>]|\([^()\s]*\))+)(>?(?:\s+"[^"]*")?\s*\))')
+
+
+def _decoded(chunks: Iterable[bytes], limit: int = MAX_SITEMAP_BYTES) -> Iterator[bytes]:
+    # .xml.gz files arrive as raw gzip (not Content-Encoding); sniff the magic bytes
+    inflate = None
+    total = 0
+    for chunk in chunks:
+        if inflate is None and total == 0 and chunk[:2] == b"\x1f\x8b":
+            inflate = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        data = inflate.decompress(chunk, limit - total + 1) if inflate is not None else chunk
+        total += len(data)
+        if total > limit:
+            raise ValueError(f"sitemap larger than {limit} bytes")
+        yield data
+
+
+def parse_sitemap(chunks: Iterable[bytes]) -> Iterator[Tuple[str, str]]:
+    """Stream ``(kind, loc)`` pairs from a sitemap or sitemap index.
+
+    ``kind`` is ``"url"`` for pages and ``"sitemap"`` for nested sitemaps.
+    Gzipped input is inflated on the fly and parsed elements are freed, so
+    memory stays flat for 50k-entry files.
+    """
+    parser = etree.XMLPullParser(events=("end",), resolve_entities=False, no_network=True)
+    for data in _decoded(chunks):
+        parser.feed(data)
+        yield from _sitemap_events(parser)
+    parser.close()
+    yield from _sitemap_events(parser)
+
+
+def _sitemap_events(parser: etree.XMLPullParser) -> Iterator[Tuple[str, str]]:
+    for _, el in parser.read_events():
+        if not isinstance(el.tag, str):
+            continue
+        name = etree.QName(el).localname
+        if name not in ("url", "sitemap"):
+            continue
+        for child in el:
+            if isinstance(child.tag, str) and etree.QName(child).localname == "loc" and child.text:
+                yield name, child.text.strip()
+                break
+        el.clear()
+        parent = el.getparent()
+        if parent is not None:
+            while el.getprevious() is not None:
+                del parent[0]
+
+
+Fetch = Callable[[str], Iterable[bytes]]
+
+
+def iter_sitemap_urls(sitemaps: Iterable[str], fetch: Fetch, max_sitemaps: int = MAX_SITEMAPS) -> Iterator[str]:
+    """Page URLs from ``sitemaps``, following sitemap indexes breadth-first."""
+    logger = get_logger()
+    queue: Deque[str] = deque(sitemaps)
+    seen = set(queue)
+    fetched = 0
+    while queue and fetched < max_sitemaps:
+        url = queue.popleft()
+        fetched += 1
+        try:
+            for kind, loc in parse_sitemap(fetch(url)):
+                if kind == "url":
+                    yield loc
+                elif loc not in seen and urlparse(loc).scheme in ("http", "https"):
+                    seen.add(loc)
+                    queue.append(loc)
+        except Exception as exc:
+            logger.warning(f"Sitemap {url}: {exc}")
+
+
+@dataclass
+class CrawlScope:
+    origin: str  # scheme://host[:port], canonical
+    prefix: str = "/"
+
+    def __contains__(self, url: str) -> bool:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}" == self.origin and (parsed.path or "/").startswith(self.prefix)
+
+
+class Frontier:
+    """FIFO of ``(url, depth)`` with a seen-set so each canonical URL is queued once."""
+
+    def __init__(self, scopes: List[CrawlScope], seen: Union[BloomFilter, ExactSet], rules: Optional[CanonicalRules] = None) -> None:
+        self.scopes = scopes
+        self.seen = seen
+        self.rules = rules
+        self._queue: Deque[Tuple[str, int]] = deque()
+
+    def push(self, url: str, depth: int) -> bool:
+        if urlparse(url).scheme not in ("http", "https"):
+            return False
+        url = canonicalize_url(url, self.rules)
+        if not any(url in scope for scope in self.scopes) or not self.seen.add(url):
+            return False
+        self._queue.append((url, depth))
+        return True
+
+    def pop(self) -> Tuple[str, int]:
+        return self._queue.popleft()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+
+def page_links(markdown: str, base_url: str) -> List[str]:
+    """Absolute targets of the Markdown links outside code blocks."""
+    links: List[str] = []
+
+    def collect(segment: str) -> str:
+        links.extend(urljoin(base_url, m.group(2)) for m in _LINK_RE.finditer(segment))
+        return segment
+
+    outside_fences(markdown, collect)
+    return links
+
+
+def rewrite_links(markdown: str, base_url: str, local: Callable[[str], Optional[str]]) -> str:
+    """Replace link targets for which ``local(absolute_url)`` returns a path."""
+
+    def sub(m: "re.Match[str]") -> str:
+        url, fragment = urldefrag(urljoin(base_url, m.group(2)))
+        path = local(url)
+        if path is None:
+            return m.group(0)
+        return f"{m.group(1)}{path}{'#' + fragment if fragment else ''}{m.group(3)}"
+
+    return outside_fences(markdown, lambda segment: _LINK_RE.sub(sub, segment))
+
+
+def _rewrite_outputs(reports: List[RunReport], base: RunConfig) -> int:
+    targets: Dict[str, Path] = {}
+    for r in reports:
+        if r.output is not None:
+            targets[r.url] = r.output
+            # Links may name the redirect target rather than the URL that was queued
+            if r.final_url:
+                targets.setdefault(canonicalize_url(r.final_url, base.url_rules), r.output)
+    changed = 0
+    for report in reports:
+        out = report.output
+        if out is None or out.is_symlink() or not out.is_file():
+            continue
+
+        def local(url: str, out: Path = out) -> Optional[str]:
+            target = targets.get(canonicalize_url(url, base.url_rules))
+            if target is None:
+                return None
+            return Path(os.path.relpath(target, out.parent)).as_posix()
+
+        text = out.read_text(encoding="utf-8")
+        fm, md = split_front_matter(text) if base.front_matter else ("", text)
+        new = rewrite_links(md, report.final_url or report.url, local)
+        if new == md:
+            continue
+        # The section index holds byte offsets, so it is rebuilt for the new text
+        index = SectionIndex(base.chunk_tokens, offset=len(fm.encode("utf-8"))) if base.sections else None
+        text = fm + ("".join(index.feed([new])) if index is not None else new)
+        out.write_text(text, encoding="utf-8")
+        report.bytes_written = len(text.encode("utf-8"))
+        if index is not None:
+            index.write(out, base.sections)
+        changed += 1
+    return changed
+
+
+def _http_fetch(base: RunConfig) -> Fetch:
+    from .fetchers import http_fetcher
+
+    return lambda url: http_fetcher.stream(url, timeout=base.timeout, headers=base.headers, cookies=base.cookies)
+
+
+def crawl(
+    seeds: Iterable[str],
+    base: RunConfig,
+    out_dir: Path,
+    concurrency: int = 4,
+    sitemaps: Optional[Iterable[str]] = None,
+    use_sitemaps: bool = True,
+    follow_links: bool = True,
+    max_depth: int = 2,
+    prefix: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    seen_capacity: Optional[int] = None,
+    rewrite: bool = True,
+    dedup: bool = True,
+    max_distance: int = MAX_DISTANCE,
+    fetch: Optional[Fetch] = None,
+) -> List[RunReport]:
+    """Convert a site into ``out_dir``: sitemap URLs and seeds first, then linked pages.
+
+    Only URLs on a seed's origin under ``prefix`` (default: the seed's
+    directory) are converted. Seeds and sitemap entries have depth 0; links
+    found in converted pages are followed up to ``max_depth``. The seen-set
+    is exact unless ``seen_capacity`` is given, which switches to a Bloom
+    filter sized for that many URLs. With ``rewrite``, links between
+    converted pages are rewritten to relative ``.md`` paths afterwards.
+    """
+    logger = get_logger()
+    rules = base.url_rules
+    seeds = [canonicalize_url(s, rules) for s in seeds]
+    scopes = []
+    for seed in seeds:
+        parsed = urlparse(seed)
+        scope_prefix = prefix if prefix is not None else parsed.path[: parsed.path.rfind("/") + 1] or "/"
+        scopes.append(CrawlScope(f"{parsed.scheme}://{parsed.netloc}", scope_prefix))
+    seen = BloomFilter(seen_capacity) if seen_capacity else ExactSet()
+    frontier = Frontier(scopes, seen, rules)
+    for seed in seeds:
+        frontier.push(seed, 0)
+
+    if use_sitemaps:
+        roots = list(sitemaps) if sitemaps else list(dict.fromkeys(f"{s.origin}/sitemap.xml" for s in scopes))
+        found = sum(frontier.push(url, 0) for url in iter_sitemap_urls(roots, fetch or _http_fetch(base)))
+        logger.info(f"Sitemaps: {found} URLs in scope")
+
+    runner = BatchRunner(base, out_dir, dedup=dedup, max_distance=max_distance)
+    workers = runner.workers(concurrency)
+    reports: List[RunReport] = []
+    pending: Dict[Future, Tuple[RunReport, int]] = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or (frontier and (max_pages is None or len(reports) < max_pages)):
+            # Keep the pool busy without draining the frontier into futures
+            while frontier and len(pending) < 2 * workers and (max_pages is None or len(reports) < max_pages):
+                url, depth = frontier.pop()
+                report = runner.new_report(url)
+                reports.append(report)
+                pending[pool.submit(runner.convert, report)] = (report, depth)
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                report, depth = pending.pop(future)
+                if not follow_links or depth >= max_depth or report.output is None or report.duplicate_kind:
+                    continue
+                try:
+                    text = report.output.read_text(encoding="utf-8")
+                except OSError:
+                    continue
+                for link in page_links(text, report.final_url or report.url):
+                    frontier.push(link, depth + 1)
+
+    if rewrite:
+        logger.info(f"Rewrote links in {_rewrite_outputs(reports, base)} files")
+    runner.finish(reports)
+    return reports
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .convert.frontmatter import compose_front_matter
+from .convert.sections import SectionIndex
+from .convert.tables import TableOptions
+from .normalize.html_cleaner import EXTRACTORS, compile_rules
+from .pipeline import RunConfig, RunReport, byte_body, clean_page, output_chunks, selectors_to_drop
+from .utils.budget import ResourceBudget
+from .utils.encoding import sniff_encoding
+from .utils.metadata import PageMetadata
+
+
+Page = Union[str, bytes]
+# A page, or a page and the URL it was served from (for metadata and images)
+PageInput = Union[Page, Tuple[Page, Optional[str]]]
+
+
+@dataclass
+class Conversion:
+    markdown: str  # the document as the CLI writes it: front matter, then Markdown
+    metadata: PageMetadata
+    hydration: Optional[str] = None  # set when the content came from embedded JSON
+    truncations: List[Dict[str, Any]] = field(default_factory=list)
+    sections: Optional[SectionIndex] = None  # offsets are into ``markdown`` encoded as UTF-8
+
+
+class Engine:
+    """HTML to Markdown conversion with its options fixed up front, for library use.
+
+    The cleaner rules and the Markdown converter are built once, in the
+    constructor, instead of on every page. An engine keeps no per-page
+    state, so one instance can be shared by any number of threads. It never
+    fetches: pass HTML you already have, as ``str`` or as bytes (the charset
+    is sniffed from BOM and ``<meta>``).
+    """
+
+    def __init__(
+        self,
+        keep_images: bool = False,
+        drop_selectors: Sequence[str] = (),
+        strip_boilerplate: bool = False,
+        extractor: str = "semantic",
+        hydration: bool = True,
+        wrap: bool = True,
+        wrap_width: int = 80,
+        list_indent: Optional[int] = None,
+        front_matter: bool = True,
+        align_tables: bool = False,
+        budget: Optional[ResourceBudget] = None,
+        sections: bool = False,
+        chunk_tokens: Optional[int] = None,
+    ) -> None:
+        if extractor not in EXTRACTORS:
+            raise ValueError(f"unknown extractor: {extractor}")
+        from .convert.html_to_markdown import _converter
+
+        self._cfg = RunConfig(
+            page="",
+            output=None,
+            keep_images=keep_images,
+            drop_selectors=tuple(drop_selectors),
+            strip_boilerplate=strip_boilerplate,
+            extractor=extractor,
+            hydration=hydration,
+            wrap=wrap,
+            wrap_width=wrap_width,
+            list_indent=list_indent,
+            front_matter=front_matter,
+            sections="json" if sections or chunk_tokens is not None else None,
+            chunk_tokens=chunk_tokens,
+        )
+        self.budget = budget
+        compile_rules(keep_images, selectors_to_drop(self._cfg))  # cached; compiles the selectors now
+        # Table options without sidecars hold no per-page state
+        self._tables = TableOptions(align=align_tables)
+        self._conv = _converter(self._tables)
+
+    def convert_html(self, page: Page, base_url: Optional[str] = None) -> Conversion:
+        """Convert one page; ``base_url`` fills ``url`` in the metadata and resolves kept images."""
+        from .convert.html_to_markdown import to_markdown
+
+        url = base_url or ""
+        report = RunReport(url=url)
+        if self.budget is not None:
+            report.meter = self.budget.start(truncations=report.truncations)
+        encoding = None
+        if isinstance(page, bytes):
+            page, encoding = byte_body(page, sniff_encoding(page))
+        cleaned, meta = clean_page(self._cfg, page, url, report, encoding)
+        md = to_markdown(cleaned, report.meter, self._tables, self._conv)
+        if not meta.url:
+            meta.url = base_url
+        fm = compose_front_matter(meta.to_dict()) if self._cfg.front_matter else ""
+        index = SectionIndex(self._cfg.chunk_tokens, offset=len(fm.encode("utf-8"))) if self._cfg.sections else None
+        document = "".join(output_chunks(self._cfg, fm, md, index))
+        return Conversion(document, meta, report.hydration, report.truncations, index)
+
+    def convert_many(self, pages: Iterable[PageInput], workers: int = 1) -> Iterator[Conversion]:
+        """Convert ``pages`` lazily, in input order; ``workers`` > 1 converts that many at once on threads.
+
+        An exception from a page is raised when its result is reached.
+        """
+        items = (p if isinstance(p, tuple) else (p, None) for p in pages)
+        if workers <= 1:
+            for page, url in items:
+                yield self.convert_html(page, url)
+            return
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="webtomd-engine") as pool:
+            # A bounded window keeps large inputs from being read all at once
+            pending: Deque["Future[Conversion]"] = deque()
+            for page, url in items:
+                pending.append(pool.submit(self.convert_html, page, url))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import re
+import threading
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from lxml import html
-from langdetect import detect as detect_lang
+
+if TYPE_CHECKING:
+    from langdetect.detector_factory import DetectorFactory
 
 
 @dataclass
@@ -83,6 +86,33 @@ def _fuzzy_similar(a: str, b: str) -> bool:
     return inter >= max(1, min(len(at), len(bt)) // 2)
 
 
+_lang_factory: Optional["DetectorFactory"] = None
+_lang_lock = threading.Lock()
+
+
+def detect_lang(text: str) -> str:
+    """Language of ``text``, from a detector factory of our own.
+
+    langdetect samples randomly, so the factory is seeded to keep verdicts
+    stable across runs; it is private so the seed never leaks into the host
+    program's langdetect. Profiles load once, under a lock, so concurrent
+    batch pages never see a half-loaded set.
+    """
+    global _lang_factory
+    with _lang_lock:
+        if _lang_factory is None:
+            # Imported on the first language check
+            from langdetect.detector_factory import PROFILES_DIRECTORY, DetectorFactory
+
+            factory = DetectorFactory()
+            factory.load_profile(PROFILES_DIRECTORY)
+            factory.set_seed(0)
+            _lang_factory = factory
+    detector = _lang_factory.create()
+    detector.append(text)
+    return detector.detect()
+
+
 def evaluate(md: str, cleaned_root: Optional[html.HtmlElement], min_coverage: float = 0.6) -> HeuristicReport:
     if cleaned_root is None:
         # External provider — run lighter checks
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, NamedTuple, Union
+
+
+# Decisions
+STATIC = "static"
+BROWSER = "browser"
+INLINE_STATE = "inline_state"
+
+_script_style_re = re.compile(r"<(script|style|template|noscript)\b[^>]*>.*?</\1\s*>", re.I | re.S)
+_tag_re = re.compile(r"<[^>]*>")
+_script_re = re.compile(r"<script\b([^>]*)>(.*?)</script\s*>", re.I | re.S)
+_noscript_re = re.compile(r"<noscript\b[^>]*>(.*?)</noscript\s*>", re.I | re.S)
+_enable_js_re = re.compile(
+    r"(enable|turn on|activate)\s+javascript|javascript\s+(is\s+)?(required|disabled|needed)|requires\s+javascript",
+    re.I,
+)
+_empty_mount_re = re.compile(
+    r"<div\b[^>]*\bid\s*=\s*[\"'](root|app|__next|__nuxt|svelte|main-app)[\"'][^>]*>\s*</div>",
+    re.I,
+)
+_mount_re = re.compile(r"\bid\s*=\s*[\"'](__next|__nuxt|root|app)[\"']|\bdata-reactroot\b|\bng-app\b|\bng-version\b", re.I)
+_state_markers = (
+    "__NEXT_DATA__",
+    "__NUXT_DATA__",
+    "window.__NUXT__",
+    "__INITIAL_STATE__",
+    "__APOLLO_STATE__",
+    "__PRELOADED_STATE__",
+)
+_jsonld_body_re = re.compile(r"\"articleBody\"\s*:\s*\"", re.I)
+
+
+class _Syntax(NamedTuple):
+    script_style: Any
+    tag: Any
+    script: Any
+    noscript: Any
+    enable_js: Any
+    empty_mount: Any
+    mount: Any
+    jsonld_body: Any
+    markers: Any
+    whitespace: Any
+    ld_json: Any
+
+
+def _to_bytes(value: Any) -> Any:
+    if isinstance(value, re.Pattern):
+        return re.compile(value.pattern.encode("ascii"), value.flags & ~re.UNICODE)
+    if isinstance(value, tuple):
+        return tuple(_to_bytes(v) for v in value)
+    return value.encode("ascii")
+
+
+_STR = _Syntax(
+    _script_style_re,
+    _tag_re,
+    _script_re,
+    _noscript_re,
+    _enable_js_re,
+    _empty_mount_re,
+    _mount_re,
+    _jsonld_body_re,
+    _state_markers,
+    (" ", "\n", "\t", "\r"),
+    "ld+json",
+)
+# The same scans over undecoded (ASCII-compatible) response bytes
+_BYTES = _Syntax(*(_to_bytes(v) for v in _STR))
+
+# Visible text below this many characters is considered "near-empty"
+MIN_TEXT_CHARS = 400
+LARGE_STATE_BYTES = 4096
+
+
+@dataclass
+class JsVerdict:
+    decision: str
+    confidence: float
+    text_chars: int
+    text_ratio: float
+    state_bytes: int
+    signals: List[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def needs_browser(self) -> bool:
+        return self.decision == BROWSER
+
+    @property
+    def has_inline_state(self) -> bool:
+        return self.decision == INLINE_STATE
+
+    def to_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+def detect_js_requirement(html_text: Union[str, bytes]) -> JsVerdict:
+    """Classify a raw HTTP response before any parsing.
+
+    Looks at the visible text-to-markup ratio, empty SPA mount points,
+    ``<noscript>`` "enable JavaScript" notices and large inline state blobs.
+    Only regular expressions over the raw text are used, so the cost is a few
+    linear scans of the document. ``bytes`` (in an ASCII-compatible encoding)
+    are scanned as is; sizes are then counted in bytes.
+    """
+    started = time.perf_counter()
+    syn = _BYTES if isinstance(html_text, bytes) else _STR
+    total = max(1, len(html_text))
+    signals: List[str] = []
+    score = 0.0
+
+    stripped = syn.script_style.sub(syn.whitespace[0], html_text)
+    text = syn.tag.sub(syn.whitespace[0], stripped)
+    text_chars = len(text) - sum(text.count(c) for c in syn.whitespace)
+    text_ratio = text_chars / total
+    near_empty = text_chars < MIN_TEXT_CHARS
+    if near_empty:
+        signals.append("near_empty_text")
+        score += 0.4
+    elif text_ratio < 0.02:
+        signals.append("low_text_ratio")
+        score += 0.2
+
+    if syn.empty_mount.search(html_text):
+        signals.append("empty_spa_root")
+        score += 0.4
+    elif syn.mount.search(html_text):
+        signals.append("spa_root")
+        score += 0.1
+
+    for m in syn.noscript.finditer(html_text):
+        if syn.enable_js.search(m.group(1)):
+            signals.append("noscript_enable_js")
+            score += 0.3
+            break
+
+    state_bytes = 0
+    has_state = False
+    for m in syn.script.finditer(html_text):
+        attrs, body = m.group(1), m.group(2)
+        head = attrs + body[:64]
+        if any(marker in head for marker in syn.markers):
+            state_bytes += len(body)
+            has_state = True
+        elif syn.ld_json in attrs and syn.jsonld_body.search(body):
+            state_bytes += len(body)
+            has_state = True
+    if has_state:
+        signals.append("inline_state")
+        if state_bytes >= LARGE_STATE_BYTES:
+            signals.append("large_inline_state")
+
+    confidence = min(1.0, score)
+    if has_state and (near_empty or score >= 0.4) and state_bytes >= LARGE_STATE_BYTES // 4:
+        decision = INLINE_STATE
+        confidence = max(confidence, 0.6)
+    elif score >= 0.5:
+        decision = BROWSER
+    else:
+        decision = STATIC
+        confidence = 1.0 - confidence
+
+    return JsVerdict(
+        decision=decision,
+        confidence=round(confidence, 3),
+        text_chars=text_chars,
+        text_ratio=round(text_ratio, 4),
+        state_bytes=state_bytes,
+        signals=signals,
+        elapsed_ms=round((time.perf_counter() - started) * 1000.0, 3),
+    )
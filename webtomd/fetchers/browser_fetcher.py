@@ -1,18 +1,32 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Dict, Optional
 
 
 @dataclass
 class BrowserFetchResult:
     url: str
     html: str
+    pruned: bool = False  # html is the in-page reduced document, not page.content()
 
 
-def fetch_with_browser(url: str, timeout: float = 60.0, wait_selector: Optional[str] = None) -> BrowserFetchResult:
+def browser_available() -> bool:
+    """Whether Playwright is installed, without importing it."""
+    from importlib.util import find_spec
+
+    return find_spec("playwright") is not None
+
+
+def fetch_with_browser(
+    url: str, timeout: float = 60.0, wait_selector: Optional[str] = None, prune: Optional[Dict[str, Any]] = None
+) -> BrowserFetchResult:
     """Fetch final DOM HTML using Playwright if available.
 
+    With ``prune`` (see ``normalize.browser_prune.prune_options``) the page
+    is reduced in the browser and only the content subtree and head
+    metadata cross the Playwright pipe.
+
     Note: Requires optional dependency `playwright`. This function attempts to
     import it lazily and raises a helpful error if missing.
     """
@@ -47,9 +61,14 @@ def fetch_with_browser(url: str, timeout: float = 60.0, wait_selector: Optional[
                 page.wait_for_load_state("networkidle", timeout=timeout * 1000)
             except Exception:
                 pass
-        content = page.content()
+        if prune is not None:
+            from ..normalize.browser_prune import PRUNE_SCRIPT
+
+            content = page.evaluate(PRUNE_SCRIPT, prune)
+        else:
+            content = page.content()
         final_url = page.url
         context.close()
         browser.close()
-    return BrowserFetchResult(url=final_url, html=content)
+    return BrowserFetchResult(url=final_url, html=content, pruned=prune is not None)
 
@@ -2,37 +2,47 @@ from __future__ import annotations
 
 import httpx
 import os
-from typing import Optional
+from typing import Any, Dict, Optional
+
+
+FIRECRAWL_API = "https://api.firecrawl.dev"
+SCRAPE_OPTIONS: Dict[str, Any] = {"formats": ["markdown"], "onlyMainContent": True}
 
 
 class FirecrawlError(RuntimeError):
     pass
 
 
-def fetch_markdown(url: str, timeout: float = 60.0) -> str:
+def api_headers() -> Dict[str, str]:
     api_key = os.getenv("FIRECRAWL_API_KEY")
     if not api_key:
         raise FirecrawlError("FIRECRAWL_API_KEY not set")
-    endpoint = "https://api.firecrawl.dev/v2/scrape"
-    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-    body = {
-        "url": url,
-        "formats": ["markdown"],
-        "onlyMainContent": True,
-    }
+    return {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+
+
+def api_base() -> str:
+    return os.getenv("FIRECRAWL_API_URL", FIRECRAWL_API).rstrip("/")
+
+
+def markdown_from_response(data: Any) -> Optional[str]:
+    # Expected structure: { "data": { "markdown": "..." } } or similar per docs
+    if isinstance(data, dict):
+        # Try common fields
+        return (
+            data.get("markdown")
+            or (data.get("data") or {}).get("markdown")
+            or (data.get("content") or {}).get("markdown")
+        )
+    return None
+
+
+def fetch_markdown(url: str, timeout: float = 60.0) -> str:
+    headers = api_headers()
+    body = {"url": url, **SCRAPE_OPTIONS}
     with httpx.Client(timeout=timeout, follow_redirects=True) as client:
-        resp = client.post(endpoint, headers=headers, json=body)
+        resp = client.post(f"{api_base()}/v2/scrape", headers=headers, json=body)
         resp.raise_for_status()
-        data = resp.json()
-        # Expected structure: { "data": { "markdown": "..." } } or similar per docs
-        if isinstance(data, dict):
-            # Try common fields
-            md = (
-                data.get("markdown")
-                or (data.get("data") or {}).get("markdown")
-                or (data.get("content") or {}).get("markdown")
-            )
-            if md:
-                return md
+        md = markdown_from_response(resp.json())
+        if md:
+            return md
         raise FirecrawlError("Unexpected Firecrawl response structure")
-
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import httpx
 from dataclasses import dataclass
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterable, Iterator, Optional
+
+from ..utils.encoding import Decoding, sniff_encoding
 
 
 DEFAULT_HEADERS: Dict[str, str] = {
@@ -23,7 +25,16 @@ class FetchResult:
     url: str
     status_code: int
     headers: Dict[str, str]
-    html: str
+    html: Optional[str] = None  # set for text given as str; see ``text()``
+    content: Optional[bytes] = None  # raw body, parsed without decoding
+    decoding: Optional[Decoding] = None  # how ``content`` is to be read
+
+    def text(self) -> str:
+        """The body as ``str``, decoded on first use for byte responses."""
+        if self.html is None:
+            encoding = self.decoding.encoding if self.decoding is not None else "utf-8"
+            self.html = (self.content or b"").decode(encoding, "replace")
+        return self.html
 
 
 def build_headers(extra_headers: Optional[Iterable[str]] = None) -> Dict[str, str]:
@@ -55,8 +66,15 @@ def fetch(url: str, timeout: float = 40.0, headers: Optional[Iterable[str]] = No
             with httpx.Client(http2=True, timeout=timeout, follow_redirects=True, headers=hdrs, cookies=jar) as client:
                 resp = client.get(url)
                 resp.raise_for_status()
-                content = resp.text
-                return FetchResult(url=str(resp.url), status_code=resp.status_code, headers=dict(resp.headers), html=content)
+                # Keep the bytes: lxml decodes them itself, once
+                content = resp.content
+                return FetchResult(
+                    url=str(resp.url),
+                    status_code=resp.status_code,
+                    headers=dict(resp.headers),
+                    content=content,
+                    decoding=sniff_encoding(content, resp.headers.get("content-type")),
+                )
         except Exception as e:
             last_exc = e
             if attempt >= retries:
@@ -66,3 +84,11 @@ def fetch(url: str, timeout: float = 40.0, headers: Optional[Iterable[str]] = No
     assert last_exc
     raise last_exc
 
+
+def stream(url: str, timeout: float = 40.0, headers: Optional[Iterable[str]] = None, cookies: Optional[Iterable[str]] = None, chunk_size: int = 65536) -> Iterator[bytes]:
+    """Yield the response body in chunks (Content-Encoding is decoded, ``.gz`` files are not)."""
+    with httpx.Client(http2=True, timeout=timeout, follow_redirects=True, headers=build_headers(headers), cookies=build_cookies(cookies)) as client:
+        with client.stream("GET", url) as resp:
+            resp.raise_for_status()
+            yield from resp.iter_bytes(chunk_size)
+
@@ -1,21 +1,32 @@
 from __future__ import annotations
 
 import httpx
-from typing import Optional
+import os
+from typing import Dict, Optional
 
 
-def build_jina_url(url: str) -> str:
+JINA_READER = "https://r.jina.ai"
+
+
+def build_jina_url(url: str, base: Optional[str] = None) -> str:
+    base = (base or os.getenv("JINA_READER_URL") or JINA_READER).rstrip("/")
     if url.startswith("https://"):
-        return f"https://r.jina.ai/https://{url[len('https://') :]}"
+        return f"{base}/https://{url[len('https://') :]}"
     if url.startswith("http://"):
-        return f"https://r.jina.ai/http://{url[len('http://') :]}"
+        return f"{base}/http://{url[len('http://') :]}"
     # Default to http
-    return f"https://r.jina.ai/http://{url}"
+    return f"{base}/http://{url}"
+
+
+def api_headers() -> Dict[str, str]:
+    # Optional: a key raises Jina's rate limits
+    api_key = os.getenv("JINA_API_KEY")
+    return {"Authorization": f"Bearer {api_key}"} if api_key else {}
 
 
 def fetch_markdown(url: str, timeout: float = 60.0) -> str:
     target = build_jina_url(url)
-    with httpx.Client(timeout=timeout, follow_redirects=True) as client:
+    with httpx.Client(timeout=timeout, follow_redirects=True, headers=api_headers()) as client:
         resp = client.get(target)
         resp.raise_for_status()
         return resp.text
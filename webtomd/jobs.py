@@ -0,0 +1,463 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .batch import MANIFEST_NAME, BatchRunner
+from .pipeline import RunConfig, RunReport
+from .utils.dedup import MAX_DISTANCE
+from .utils.logging import get_logger
+from .utils.url import CanonicalRules, canonicalize_url
+
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+
+# Errors that retrying cannot fix
+PERMANENT_ERRORS = {"robots.txt disallows fetching"}
+
+# RunConfig fields a job may override
+JOB_OPTIONS = frozenset(
+    {
+        "use_jina",
+        "use_firecrawl",
+        "browser",
+        "timeout",
+        "retries",
+        "headers",
+        "cookies",
+        "respect_robots",
+        "keep_images",
+        "wrap",
+        "wrap_width",
+        "list_indent",
+        "front_matter",
+        "llm_eval",
+        "llm_model",
+        "min_coverage",
+        "drop_selectors",
+        "strip_boilerplate",
+        "extractor",
+        "js_detect",
+        "js_min_confidence",
+        "hydration",
+        "align_tables",
+        "table_csv_threshold",
+    }
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    url TEXT PRIMARY KEY,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_at REAL NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    error TEXT,
+    strategy TEXT,
+    output TEXT,
+    report TEXT,
+    payload TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, next_at);
+CREATE TABLE IF NOT EXISTS workers (
+    worker TEXT PRIMARY KEY,
+    done INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    started REAL,
+    last_seen REAL
+);
+"""
+
+
+@dataclass
+class Job:
+    url: str
+    attempts: int = 0  # including the current one once claimed
+    html: Optional[str] = None  # convert this instead of fetching ``url``
+    options: Dict[str, Any] = field(default_factory=dict)  # RunConfig overrides
+
+    def payload(self) -> Optional[str]:
+        if self.html is None and not self.options:
+            return None
+        return json.dumps({"html": self.html, "options": self.options})
+
+    @classmethod
+    def from_payload(cls, url: str, attempts: int, payload: Optional[str]) -> "Job":
+        data = json.loads(payload) if payload else {}
+        return cls(url, attempts, data.get("html"), data.get("options") or {})
+
+
+def check_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    unknown = set(options) - JOB_OPTIONS
+    if unknown:
+        raise ValueError(f"unsupported job options: {', '.join(sorted(unknown))}")
+    return options
+
+
+class JobQueue(ABC):
+    """Retry policy and manifest writing shared by the queue backends.
+
+    A backend implements the abstract methods below; one that misses any
+    fails when it is constructed.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff: float = 30.0,
+        max_backoff: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+
+    def add(self, urls: Iterable[str], rules: Optional[CanonicalRules] = None) -> int:
+        """Queue URLs (canonicalized); already known URLs are left alone. Returns the number added."""
+        return self.put(Job(canonicalize_url(u, rules)) for u in urls)
+
+    @abstractmethod
+    def put(self, jobs: Iterable[Job]) -> int:
+        """Queue jobs whose URL is not known yet; returns the number added."""
+
+    @abstractmethod
+    def claim(self, limit: int, worker: str = "local", lease: float = 600.0) -> List[Job]:
+        """Take up to ``limit`` due jobs (or jobs whose lease expired) for ``worker``."""
+
+    @abstractmethod
+    def heartbeat(self, jobs: Iterable[Job], worker: str, lease: float) -> None:
+        """Extend the leases ``worker`` still holds."""
+
+    @abstractmethod
+    def release(self, jobs: Iterable[Job], worker: str = "local") -> None:
+        """Return unfinished jobs to the queue without counting the attempt."""
+
+    @abstractmethod
+    def release_worker(self, worker: str) -> int:
+        """Requeue everything ``worker`` still holds; returns the number requeued."""
+
+    @abstractmethod
+    def complete(self, results: Iterable[Tuple[Job, RunReport]], worker: str = "local") -> None:
+        """Record finished jobs; results for jobs ``worker`` no longer holds are dropped."""
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per state."""
+
+    @abstractmethod
+    def next_wakeup(self) -> Optional[float]:
+        """Earliest time a pending retry or an expired lease becomes claimable."""
+
+    @abstractmethod
+    def reports(self, states: Iterable[str] = (DONE, FAILED)) -> Iterator[Dict]:
+        """Stored run reports of the jobs in ``states``."""
+
+    @abstractmethod
+    def worker_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-worker done and failed counts with first and last seen times."""
+
+    def retry_delay(self, attempts: int) -> float:
+        return min(self.max_backoff, self.backoff * 2 ** max(0, attempts - 1))
+
+    def outcome(self, job: Job, report: RunReport, now: float) -> Tuple[str, float]:
+        """State and next eligible time for a finished attempt."""
+        if report.error is None:
+            return DONE, 0.0
+        if job.attempts >= self.max_attempts or report.error in PERMANENT_ERRORS:
+            return FAILED, 0.0
+        return PENDING, now + self.retry_delay(job.attempts)
+
+    def write_manifest(self, out_dir: Path, name: Optional[str] = None) -> Path:
+        path = out_dir / (name or MANIFEST_NAME)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as fh:
+            for report in self.reports():
+                fh.write(json.dumps(report) + "\n")
+        return path
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "JobQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class JobStore(JobQueue):
+    """Durable per-URL state for long batch runs, in SQLite (WAL mode).
+
+    Jobs move pending -> in_flight -> done, or back to pending with an
+    exponential backoff after a failure, until ``max_attempts`` is reached
+    and they are marked failed. An in-flight job whose lease has expired
+    (its worker died) can be claimed again. Several processes on one host
+    can share a store.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_attempts: int = 3,
+        backoff: float = 30.0,
+        max_backoff: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        super().__init__(max_attempts, backoff, max_backoff, clock)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        # Autocommit; writes use explicit BEGIN IMMEDIATE transactions
+        self.db = sqlite3.connect(str(path), isolation_level=None, timeout=30.0)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(jobs)")}
+        if "payload" not in columns:  # stores created before raw-HTML jobs
+            self.db.execute("ALTER TABLE jobs ADD COLUMN payload TEXT")
+
+    def close(self) -> None:
+        self.db.close()
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.db
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def put(self, jobs: Iterable[Job]) -> int:
+        with self._tx() as db:
+            before = db.total_changes
+            db.executemany(
+                "INSERT OR IGNORE INTO jobs (url, payload) VALUES (?, ?)",
+                ((job.url, job.payload()) for job in jobs),
+            )
+            return db.total_changes - before
+
+    def claim(self, limit: int, worker: str = "local", lease: float = 600.0) -> List[Job]:
+        now = self.clock()
+        with self._tx() as db:
+            rows = db.execute(
+                "SELECT url, attempts, payload FROM jobs"
+                " WHERE (state = ? AND next_at <= ?) OR (state = ? AND lease_until < ?)"
+                " ORDER BY rowid LIMIT ?",
+                (PENDING, now, IN_FLIGHT, now, limit),
+            ).fetchall()
+            db.executemany(
+                "UPDATE jobs SET state = ?, attempts = attempts + 1, worker = ?, lease_until = ? WHERE url = ?",
+                ((IN_FLIGHT, worker, now + lease, url) for url, _, _ in rows),
+            )
+            if rows:
+                db.execute(
+                    "INSERT INTO workers (worker, started, last_seen) VALUES (?, ?, ?)"
+                    " ON CONFLICT (worker) DO UPDATE SET last_seen = excluded.last_seen",
+                    (worker, now, now),
+                )
+        return [Job.from_payload(url, attempts + 1, payload) for url, attempts, payload in rows]
+
+    def heartbeat(self, jobs: Iterable[Job], worker: str, lease: float) -> None:
+        """Extend the leases ``worker`` still holds."""
+        now = self.clock()
+        with self._tx() as db:
+            db.executemany(
+                "UPDATE jobs SET lease_until = ? WHERE url = ? AND state = ? AND worker = ?",
+                ((now + lease, job.url, IN_FLIGHT, worker) for job in jobs),
+            )
+            db.execute("UPDATE workers SET last_seen = ? WHERE worker = ?", (now, worker))
+
+    def release(self, jobs: Iterable[Job], worker: str = "local") -> None:
+        """Return unfinished jobs to the queue without counting the attempt."""
+        with self._tx() as db:
+            db.executemany(
+                "UPDATE jobs SET state = ?, attempts = attempts - 1, worker = NULL, lease_until = NULL"
+                " WHERE url = ? AND state = ? AND worker = ?",
+                ((PENDING, job.url, IN_FLIGHT, worker) for job in jobs),
+            )
+
+    def release_worker(self, worker: str) -> int:
+        """Requeue everything a (crashed) worker still holds, e.g. when a batch restarts."""
+        with self._tx() as db:
+            cur = db.execute(
+                "UPDATE jobs SET state = ?, attempts = attempts - 1, worker = NULL, lease_until = NULL"
+                " WHERE state = ? AND worker = ?",
+                (PENDING, IN_FLIGHT, worker),
+            )
+            return cur.rowcount
+
+    def complete(self, results: Iterable[Tuple[Job, RunReport]], worker: str = "local") -> None:
+        """Record finished jobs in one transaction; failures are rescheduled or marked failed.
+
+        Results for jobs this worker no longer holds (lease expired and
+        reclaimed) are dropped.
+        """
+        now = self.clock()
+        updates = []
+        done = failed = 0
+        for job, report in results:
+            state, next_at = self.outcome(job, report, now)
+            done += state == DONE
+            failed += state == FAILED
+            output = str(report.output) if report.output else None
+            updates.append(
+                (state, next_at, report.error, report.strategy, output, json.dumps(report.to_dict()), job.url, IN_FLIGHT, worker)
+            )
+        with self._tx() as db:
+            db.executemany(
+                "UPDATE jobs SET state = ?, next_at = ?, worker = NULL, lease_until = NULL, error = ?, strategy = ?,"
+                " output = ?, report = ? WHERE url = ? AND state = ? AND worker = ?",
+                updates,
+            )
+            db.execute(
+                "UPDATE workers SET done = done + ?, failed = failed + ?, last_seen = ? WHERE worker = ?",
+                (done, failed, now, worker),
+            )
+
+    def retry_failed(self) -> int:
+        """Give failed jobs a fresh set of attempts."""
+        with self._tx() as db:
+            cur = db.execute("UPDATE jobs SET state = ?, attempts = 0, next_at = 0 WHERE state = ?", (PENDING, FAILED))
+            return cur.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        counts = {PENDING: 0, IN_FLIGHT: 0, DONE: 0, FAILED: 0}
+        counts.update(self.db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+        return counts
+
+    def next_wakeup(self) -> Optional[float]:
+        """Earliest time a pending retry or an expired lease becomes claimable."""
+        row = self.db.execute(
+            "SELECT MIN(CASE WHEN state = ? THEN next_at ELSE lease_until END) FROM jobs WHERE state IN (?, ?)",
+            (PENDING, PENDING, IN_FLIGHT),
+        ).fetchone()
+        return row[0]
+
+    def reports(self, states: Iterable[str] = (DONE, FAILED)) -> Iterator[Dict]:
+        states = tuple(states)
+        marks = ", ".join("?" * len(states))
+        for (report,) in self.db.execute(
+            f"SELECT report FROM jobs WHERE report IS NOT NULL AND state IN ({marks}) ORDER BY rowid", states
+        ):
+            yield json.loads(report)
+
+    def worker_stats(self) -> Dict[str, Dict[str, float]]:
+        rows = self.db.execute("SELECT worker, done, failed, started, last_seen FROM workers ORDER BY started")
+        return {w: {"done": d, "failed": f, "started": s, "last_seen": l} for w, d, f, s, l in rows}
+
+
+def _seed_dedup(runner: BatchRunner, queue: JobQueue) -> None:
+    # The dedup index lives in memory; rebuild it from outputs of earlier runs
+    if runner.dedup is None:
+        return
+    for report in queue.reports((DONE,)):
+        out = report.get("output")
+        if out and not report.get("duplicate_kind"):
+            try:
+                runner.dedup.check(out, Path(out).read_text(encoding="utf-8"))
+            except OSError:
+                continue
+
+
+def run_jobs(
+    store: JobQueue,
+    base: RunConfig,
+    out_dir: Path,
+    concurrency: int = 4,
+    dedup: bool = True,
+    max_distance: int = MAX_DISTANCE,
+    chunk: int = 32,
+    commit_every: int = 32,
+    worker: str = "local",
+    wait_for_retries: bool = True,
+    lease: float = 600.0,
+    poll: Optional[float] = None,
+) -> Dict[str, int]:
+    """Convert queued jobs until none are left; safe to interrupt and rerun.
+
+    Jobs are claimed ``chunk`` at a time and results committed every
+    ``commit_every`` pages. Jobs still held by ``worker`` from an earlier
+    run that died are requeued first, and leases are renewed every
+    ``lease / 3`` seconds while pages convert. Failed pages are retried
+    after their backoff while other work continues; with
+    ``wait_for_retries`` the run also sleeps until the last retries are due.
+    With ``poll`` the run never ends and checks for new work that often.
+    Returns the state counts.
+    """
+    logger = get_logger()
+    runner = BatchRunner(base, out_dir, dedup=dedup, max_distance=max_distance)
+    requeued = store.release_worker(worker)
+    if requeued:
+        logger.info(f"Requeued {requeued} jobs from an interrupted run")
+    _seed_dedup(runner, store)
+    workers = runner.workers(concurrency)
+    pending: Dict[Future, Tuple[Job, RunReport]] = {}
+    finished: List[Tuple[Job, RunReport]] = []
+    reports: List[RunReport] = []
+    renew_every = lease / 3
+    renewed = store.clock()
+    claimed: List[Job] = []
+
+    def keepalive() -> None:
+        # A Firecrawl batch prefetch can outlast the lease of every job held
+        held = claimed + [job for job, _ in pending.values()] + [job for job, _ in finished]
+        store.heartbeat(held, worker, lease)
+
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            if len(pending) < workers:
+                claimed = store.claim(chunk, worker, lease)
+                runner.prefetch((job.url for job in claimed if job.html is None), keepalive, renew_every)
+                for job in claimed:
+                    report = runner.new_report(job.url)
+                    reports.append(report)
+                    future = pool.submit(runner.convert, report, job.html, job.options)
+                    pending[future] = (job, report)
+            if not pending:
+                if finished:
+                    store.complete(finished, worker)
+                    finished.clear()
+                    continue
+                if poll is not None:
+                    time.sleep(poll)
+                    continue
+                wakeup = store.next_wakeup()
+                if wakeup is None or not wait_for_retries:
+                    break
+                time.sleep(max(0.0, min(wakeup - store.clock(), 60.0)))
+                continue
+            done, _ = wait(pending, timeout=renew_every, return_when=FIRST_COMPLETED)
+            finished.extend(pending.pop(f) for f in done)
+            if len(finished) >= commit_every:
+                store.complete(finished, worker)
+                finished.clear()
+            # Results waiting for a commit still need their leases
+            if (pending or finished) and store.clock() - renewed >= renew_every:
+                store.heartbeat([job for job, _ in pending.values()] + [job for job, _ in finished], worker, lease)
+                renewed = store.clock()
+    finally:
+        # Keep what finished; hand back what did not
+        pool.shutdown(wait=False, cancel_futures=True)
+        if finished:
+            store.complete(finished, worker)
+        if pending:
+            store.release([job for job, _ in pending.values()], worker)
+        runner.finish(reports, manifest=False)
+    store.write_manifest(out_dir)
+    counts = store.counts()
+    logger.info(f"Jobs: {counts[DONE]} done, {counts[FAILED]} failed, {counts[PENDING]} pending")
+    return counts
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Sequence
+
+from .html_cleaner import compile_rules
+
+# Runs in the page (Playwright ``page.evaluate``) and returns a small HTML
+# document instead of the whole rendered DOM:
+#
+# - <head>: <title>, <meta content> and JSON-LD scripts, which is all
+#   ``extract_metadata`` reads;
+# - <body>: a pruned copy of the content root picked like
+#   ``pick_content_root`` (or <body> for the scoring extractors, which only
+#   exist in Python), with the same drop tags and selectors as ``prune``.
+#
+# The first <h1> of the page counts for the title even outside the content
+# root; it is carried in a <template>, which the cleaner discards.
+PRUNE_SCRIPT = r"""
+(opts) => {
+  const doc = document;
+  const body = doc.body || doc.documentElement;
+  const pickContentRoot = () => {
+    // Priority: main > article, body article, main, body
+    let article = null, main = null, seenBody = null;
+    for (const el of doc.querySelectorAll("main, article, body")) {
+      const tag = el.localName;
+      if (tag === "article") {
+        const parent = el.parentElement;
+        if (parent && parent.localName === "main") return el;
+        if (article === null && seenBody !== null) article = el;
+      } else if (tag === "main") {
+        if (main === null) main = el;
+      } else if (seenBody === null) {
+        seenBody = el;
+      }
+    }
+    return article || main || seenBody || doc.documentElement;
+  };
+  const root = opts.semantic ? pickContentRoot() : body;
+
+  const head = [];
+  for (const el of doc.querySelectorAll("title, meta[content], script[type='application/ld+json' i]")) {
+    if (el.localName === "title") {
+      head.push("<title>" + el.textContent.replace(/&/g, "&amp;").replace(/</g, "&lt;") + "</title>");
+    } else {
+      head.push(el.outerHTML);
+    }
+  }
+  const h1 = doc.querySelector("h1");
+  const carried = h1 && !root.contains(h1) ? "<template><h1>" + h1.innerHTML + "</h1></template>" : "";
+
+  // Prune a copy so the page's own observers never see the mutations
+  const copy = root.cloneNode(true);
+  const drop = (el) => { if (el !== copy && el.parentNode) el.parentNode.removeChild(el); };
+  for (const sel of opts.css) for (const el of copy.querySelectorAll(sel)) drop(el);
+  for (const expr of opts.xpath) {
+    const found = doc.evaluate(expr, copy, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (let i = 0; i < found.snapshotLength; i++) {
+      const el = found.snapshotItem(i);
+      if (el.nodeType === 1 && !["html", "body"].includes(el.localName)) drop(el);
+    }
+  }
+  if (opts.drop.length) for (const el of copy.querySelectorAll(opts.drop.join(","))) drop(el);
+  const walker = doc.createTreeWalker(copy, NodeFilter.SHOW_COMMENT | NodeFilter.SHOW_ELEMENT);
+  const comments = [];
+  for (let node = walker.currentNode; node; node = walker.nextNode()) {
+    if (node.nodeType === 8) { comments.push(node); continue; }
+    // Inline styles and handlers are often most of the bytes; nothing downstream reads them
+    for (const name of node.getAttributeNames()) {
+      if (name === "style" || name.startsWith("on")) node.removeAttribute(name);
+    }
+  }
+  for (const c of comments) c.remove();
+
+  let content = copy.outerHTML;
+  if (copy.localName === "body") content = copy.innerHTML;
+  else if (copy.localName === "html") content = copy.querySelector("body") ? copy.querySelector("body").innerHTML : "";
+  return "<!DOCTYPE html><html><head>" + head.join("") + "</head><body>" + carried + content + "</body></html>";
+}
+"""
+
+
+def prune_options(keep_images: bool = False, drop_selectors: Sequence[str] = (), extractor: str = "semantic") -> Dict[str, Any]:
+    """Arguments for ``PRUNE_SCRIPT``, from the same rules the Python cleaner uses."""
+    rules = compile_rules(keep_images)  # selectors go to the browser as they are
+    xpath = [s for s in drop_selectors if s.startswith(("/", "./", "("))]
+    return {
+        "drop": list(rules.drop_tags),
+        "css": [s for s in drop_selectors if s not in xpath],
+        "xpath": xpath,
+        "semantic": extractor == "semantic",
+    }
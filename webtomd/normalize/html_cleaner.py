@@ -1,8 +1,17 @@
 from __future__ import annotations
 
-from typing import Iterable, Optional, Set
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, Optional, Sequence, Set, Tuple, Union
 from lxml import html, etree
 
+from ..utils.budget import CHECK_EVERY
+from ..utils.encoding import lxml_encoding
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ..utils.budget import BudgetMeter
+    from .hydration import HydratedContent
+
 
 BLOCK_KEEP: Set[str] = {
     "article",
@@ -55,6 +64,31 @@ DISCARD: Set[str] = {
 }
 
 
+def _name_part(attr: str, word: str) -> str:
+    # ``word`` as a whole dash/underscore-separated part of a class or id:
+    # "share" matches "share-bar" and "post_share" but not "shared-layout"
+    parts = f"concat(' ', normalize-space(translate(@{attr}, '-_', '  ')), ' ')"
+    return f"./descendant-or-self::*[contains({parts}, ' {word} ')]"
+
+
+# Common boilerplate blocks that survive tag-based pruning because they are
+# built from plain divs/sections. Enabled with ``strip_boilerplate``. XPath,
+# so they need neither ``cssselect`` nor a browser with CSS support.
+BOILERPLATE_SELECTORS: Tuple[str, ...] = (
+    _name_part("id", "cookie"),
+    *(_name_part("class", word) for word in ("cookie", "consent", "share", "social", "related", "newsletter", "promo")),
+    # Hidden decorations, never a block that holds the text itself
+    "./descendant-or-self::*[@aria-hidden='true'][not(.//p or .//h1 or .//h2 or .//h3 or .//li or .//table)]",
+)
+
+# Actions in the precomputed tag table
+KEEP = 0
+UNWRAP = 1
+DROP = 2
+
+_NEVER_UNWRAP = {"html", "body"}
+
+
 def _sanitize_text(text: Optional[str]) -> Optional[str]:
     if text is None:
         return None
@@ -64,22 +98,62 @@ def _sanitize_text(text: Optional[str]) -> Optional[str]:
     return "".join(ch for ch in text if ch.isprintable() or ch in ['\t', '\n', '\r'])
 
 
-def parse_html(html_text: str) -> html.HtmlElement:
+def parse_html(html_text: Union[str, bytes], encoding: Optional[str] = None) -> html.HtmlElement:
+    """Parse markup; ``bytes`` are decoded by libxml2 with ``encoding`` (no Python-side copy)."""
+    if isinstance(html_text, bytes) and encoding is not None:
+        try:
+            return html.fromstring(html_text, parser=html.HTMLParser(encoding=lxml_encoding(encoding)))
+        except LookupError:
+            # A codec Python has and libxml2's iconv doesn't
+            return html.fromstring(html_text.decode(encoding, "replace"))
     return html.fromstring(html_text)
 
 
 def pick_content_root(doc: html.HtmlElement) -> html.HtmlElement:
-    nodes = doc.xpath("//main/article")
-    if nodes:
-        return nodes[0]
-    nodes = doc.xpath("//body//article")
-    if nodes:
-        return nodes[0]
-    nodes = doc.xpath("//main")
-    if nodes:
-        return nodes[0]
-    body = doc.find(".//body")
-    return body if body is not None else doc
+    # Priority: main > article, any other article, main, body -- resolved in
+    # one walk. Fragments have no <body>, so articles don't wait for one.
+    article = None
+    main = None
+    body = None
+    for el in doc.iter("main", "article", "body"):
+        tag = el.tag
+        if tag == "article":
+            parent = el.getparent()
+            if parent is not None and parent.tag == "main":
+                return el
+            if article is None:
+                article = el
+        elif tag == "main":
+            if main is None:
+                main = el
+        elif body is None:
+            body = el
+    for node in (article, main, body):
+        if node is not None:
+            return node
+    return doc
+
+
+EXTRACTORS = ("semantic", "score", "auto")
+
+
+def select_content_root(doc: html.HtmlElement, extractor: str = "semantic") -> html.HtmlElement:
+    """Pick the content root with the given strategy.
+
+    ``semantic`` uses ``main``/``article`` markup, ``score`` the Readability-like
+    scorer, and ``auto`` the scorer only when no semantic container exists.
+    """
+    if extractor == "semantic":
+        return pick_content_root(doc)
+    if extractor not in EXTRACTORS:
+        raise ValueError(f"Unknown extractor: {extractor}")
+    from .readability_fallback import pick_best_candidate
+
+    if extractor == "auto":
+        root = pick_content_root(doc)
+        if root.tag in {"main", "article"}:
+            return root
+    return pick_best_candidate(doc)
 
 
 def remove_comments_and_head(doc: html.HtmlElement) -> None:
@@ -93,23 +167,200 @@ def remove_comments_and_head(doc: html.HtmlElement) -> None:
             p.remove(c)
 
 
-def prune(root: html.HtmlElement, keep_images: bool = False) -> None:
-    disallowed = set(DISCARD)
+@dataclass(frozen=True)
+class CleanerRules:
+    """Tag table and boilerplate selectors compiled for one cleaner configuration."""
+
+    actions: Dict[str, int]
+    drop_tags: Tuple[str, ...]
+    drop_xpath: Optional[etree.XPath]
+
+    def action(self, tag: str) -> int:
+        act = self.actions.get(tag)
+        if act is None:
+            act = self.actions.get(tag.lower(), UNWRAP)
+        return act
+
+
+def _selector_to_xpath(selector: str) -> str:
+    # XPath expressions are accepted verbatim; everything else is CSS
+    if selector.startswith(("/", "./", "(")):
+        return selector
+    try:
+        from cssselect import GenericTranslator  # type: ignore
+    except Exception as e:
+        raise RuntimeError(
+            "CSS selectors require the optional 'cssselect' package. Install extra 'css' "
+            "(uv add --extra css) or pass XPath expressions instead."
+        ) from e
+    return GenericTranslator().css_to_xpath(selector, prefix="descendant-or-self::")
+
+
+@lru_cache(maxsize=64)
+def compile_rules(keep_images: bool = False, drop_selectors: Tuple[str, ...] = ()) -> CleanerRules:
+    actions: Dict[str, int] = {}
+    for tag in BLOCK_KEEP | INLINE_KEEP | MEDIA_KEEP:
+        actions[tag] = KEEP
+    for tag in DISCARD:
+        actions[tag] = DROP
     if not keep_images:
-        disallowed = disallowed.union(MEDIA_KEEP)
-    for el in list(root.iter()):
-        tag = el.tag.lower() if isinstance(el.tag, str) else ""
-        if tag in disallowed:
-            parent = el.getparent()
-            if parent is not None:
-                parent.remove(el)
-        elif tag not in BLOCK_KEEP and tag not in INLINE_KEEP and tag not in MEDIA_KEEP:
-            # unwrap unknown/neutral elements
-            parent = el.getparent()
-            if parent is not None and tag not in {"html", "body"}:
-                el.text = _sanitize_text(el.text)
-                el.tail = _sanitize_text(el.tail)
-                el.drop_tag()
+        for tag in MEDIA_KEEP:
+            actions[tag] = DROP
+    drop_tags = tuple(sorted(t for t, a in actions.items() if a == DROP))
+    drop_xpath = None
+    if drop_selectors:
+        expr = " | ".join(_selector_to_xpath(sel) for sel in drop_selectors)
+        drop_xpath = etree.XPath(expr)
+    return CleanerRules(actions=actions, drop_tags=drop_tags, drop_xpath=drop_xpath)
+
+
+def _remove(el: html.HtmlElement) -> None:
+    parent = el.getparent()
+    if parent is None:
+        return
+    if el.tail and el.tail.strip():
+        # The text after an inline element belongs to its parent
+        prev = el.getprevious()
+        if prev is not None:
+            prev.tail = (prev.tail or "") + el.tail
+        else:
+            parent.text = (parent.text or "") + el.tail
+    parent.remove(el)
+
+
+def _unwrap(el: html.HtmlElement) -> None:
+    # Same result as lxml's drop_tag(), which calls parent.index() and is
+    # therefore quadratic on wide parents
+    parent = el.getparent()
+    prev = el.getprevious()
+    children = list(el)
+    text, tail = el.text, el.tail
+    if children and tail:
+        children[-1].tail = (children[-1].tail or "") + tail
+        tail = None
+    extra = (text or "") + (tail or "")
+    if extra:
+        if prev is None:
+            parent.text = (parent.text or "") + extra
+        else:
+            prev.tail = (prev.tail or "") + extra
+    el.tail = None
+    for child in reversed(children):
+        el.addnext(child)
+    parent.remove(el)
+
+
+def _cut_after(root: html.HtmlElement, el: html.HtmlElement) -> None:
+    """Remove ``el`` and everything following it in document order, within ``root``."""
+    if el is root:
+        return
+    cur = el
+    while cur is not root:
+        parent = cur.getparent()
+        if parent is None:
+            break
+        if cur.getnext() is not None:
+            del parent[parent.index(cur) + 1 :]
+        cur = parent
+    _remove(el)
+
+
+def _text_bytes(text: str) -> int:
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+def truncate_to_budget(root: html.HtmlElement, meter: "BudgetMeter") -> None:
+    """Cut the tree where it exceeds the node or text budget (or the deadline passes)."""
+    budget = meter.budget
+    max_nodes, max_text = budget.max_nodes, budget.max_text_bytes
+    if max_nodes is None and max_text is None and meter.deadline_at is None:
+        return
+    nodes = 0
+    text = 0
+    for el in root.iter():
+        nodes += 1
+        if el.text:
+            text += _text_bytes(el.text)
+        if el.tail and el is not root:
+            text += _text_bytes(el.tail)
+        if max_nodes is not None and nodes > max_nodes:
+            limit = "max_nodes"
+        elif max_text is not None and text > max_text:
+            limit = "max_text_bytes"
+        elif nodes % CHECK_EVERY == 0 and meter.expired():
+            limit = "deadline"
+        else:
+            continue
+        _cut_after(root, el)
+        meter.truncate(limit, "clean", nodes=nodes - 1)
+        break
+
+
+def _own_rows(table: html.HtmlElement) -> Iterator[html.HtmlElement]:
+    # Rows of this table only, not of tables nested in its cells
+    for child in table:
+        if child.tag == "tr":
+            yield child
+        elif child.tag in ("thead", "tbody", "tfoot"):
+            yield from (tr for tr in child if tr.tag == "tr")
+
+
+def limit_tables(root: html.HtmlElement, meter: "BudgetMeter") -> None:
+    """Drop trailing rows (or cells of a single oversized row) beyond the table budget."""
+    max_rows, max_cells = meter.budget.max_table_rows, meter.budget.max_table_cells
+    if max_rows is None and max_cells is None:
+        return
+    for table in list(root.iter("table")):
+        trs = list(_own_rows(table))
+        cells = 0
+        for i, tr in enumerate(trs):
+            row_cells = [c for c in tr if c.tag in ("td", "th")]
+            if max_rows is not None and i >= max_rows:
+                limit = "max_table_rows"
+            elif max_cells is not None and cells + len(row_cells) > max_cells:
+                limit = "max_table_cells"
+                if i == 0:
+                    for cell in row_cells[max_cells:]:
+                        _remove(cell)
+                    i = 1
+            else:
+                cells += len(row_cells)
+                continue
+            for extra in trs[i:]:
+                _remove(extra)
+            meter.truncate(limit, "clean", rows_kept=i, rows_total=len(trs))
+            break
+
+
+def prune(
+    root: html.HtmlElement,
+    keep_images: bool = False,
+    rules: Optional[CleanerRules] = None,
+    meter: Optional["BudgetMeter"] = None,
+) -> None:
+    rules = rules or compile_rules(keep_images)
+    if rules.drop_xpath is not None:
+        for el in rules.drop_xpath(root):
+            if el is not root and isinstance(el.tag, str) and el.tag not in _NEVER_UNWRAP:
+                _remove(el)
+    # Drop whole subtrees first so their descendants are never visited
+    for el in list(root.iter(*rules.drop_tags)):
+        _remove(el)
+    if meter is not None:
+        truncate_to_budget(root, meter)
+    for i, el in enumerate(list(root.iter(etree.Element))):
+        if meter is not None and i % CHECK_EVERY == CHECK_EVERY - 1 and meter.expired():
+            _cut_after(root, el)
+            meter.truncate("deadline", "clean", nodes=i)
+            break
+        tag = el.tag
+        if el is root or rules.action(tag) != UNWRAP or tag in _NEVER_UNWRAP:
+            continue
+        # unwrap unknown/neutral elements
+        if el.getparent() is not None:
+            el.text = _sanitize_text(el.text)
+            el.tail = _sanitize_text(el.tail)
+            _unwrap(el)
 
 
 def normalize_lists_tables(root: html.HtmlElement) -> None:
@@ -155,8 +406,7 @@ def wrap_stray_text(root: html.HtmlElement) -> None:
                 p = html.Element("p")
                 p.text = _sanitize_text(child.tail)
                 child.tail = None
-                idx = parent.index(child)
-                parent.insert(idx + 1, p)
+                child.addnext(p)
 
 
 def collapse_whitespace(root: html.HtmlElement) -> None:
@@ -179,11 +429,48 @@ def normalize_headings(root: html.HtmlElement) -> None:
             h.tag = "h2"
 
 
-def to_clean_html(html_text: str, keep_images: bool = False) -> html.HtmlElement:
-    doc = parse_html(html_text)
+# A pruned root with less visible text than this is an unrendered JS shell
+SHELL_TEXT_CHARS = 400
+
+
+def text_chars(text: str) -> int:
+    """Visible characters in ``text``; whitespace is not counted."""
+    return len(text) - sum(text.count(c) for c in " \n\t\r")
+
+
+def _text_chars(root: html.HtmlElement) -> int:
+    return sum(text_chars(t) for t in root.itertext())
+
+
+def to_clean_html(
+    html_text: Union[str, html.HtmlElement],
+    keep_images: bool = False,
+    drop_selectors: Sequence[str] = (),
+    extractor: str = "semantic",
+    hydrated: Optional["HydratedContent"] = None,
+    meter: Optional["BudgetMeter"] = None,
+) -> html.HtmlElement:
+    """Normalize a page (markup or an already parsed document) into a content tree.
+
+    When the pruned DOM root is a shell and ``hydrated`` content (see
+    ``normalize.hydration``) holds clearly more text, the synthetic tree built
+    from it is used; server-rendered articles always keep their DOM.
+    With a budget ``meter``, oversized trees and tables are truncated and the
+    cuts are recorded on the meter.
+    """
+    rules = compile_rules(keep_images, tuple(drop_selectors))
+    doc = html_text if isinstance(html_text, html.HtmlElement) else parse_html(html_text)
     remove_comments_and_head(doc)
-    root = pick_content_root(doc)
-    prune(root, keep_images=keep_images)
+    root = select_content_root(doc, extractor)
+    prune(root, keep_images=keep_images, rules=rules, meter=meter)
+    dom_chars = _text_chars(root) if hydrated is not None else 0
+    if hydrated is not None and dom_chars < SHELL_TEXT_CHARS and hydrated.text_chars > 1.2 * dom_chars:
+        from .hydration import build_content_tree
+
+        root = build_content_tree(hydrated)
+        prune(root, keep_images=keep_images, rules=rules, meter=meter)
+    if meter is not None:
+        limit_tables(root, meter)
     normalize_lists_tables(root)
     wrap_stray_text(root)
     collapse_whitespace(root)
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from html import escape
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from lxml import html
+
+from .html_cleaner import text_chars
+from ..utils.json_ld import TITLE_KEYS, article_metadata, first_text, iter_json_ld_articles, parse_json_ld, walk
+
+
+STATE_SCRIPT_IDS = {"__NEXT_DATA__", "__NUXT_DATA__"}
+
+# Keys that commonly hold the body of a post in CMS payloads
+BODY_KEYS = {"html", "body", "bodyHtml", "content", "contentHtml", "articleBody", "text", "richText", "description"}
+
+MIN_BODY_CHARS = 200
+
+_tag_hint_re = re.compile(r"<(p|h[1-6]|ul|ol|li|pre|blockquote|table|div|br)\b", re.I)
+_strip_tags_re = re.compile(r"<[^>]+>")
+
+
+@dataclass
+class HydratedContent:
+    source: str
+    html: str
+    text_chars: int
+    title: Optional[str] = None
+    metadata: Dict[str, str] = field(default_factory=dict)
+
+
+def _iter_state_blobs(doc: html.HtmlElement) -> Iterator[Tuple[str, Any]]:
+    for el in doc.iter("script"):
+        sid = el.get("id")
+        if sid not in STATE_SCRIPT_IDS:
+            continue
+        source = "next_data" if sid == "__NEXT_DATA__" else "nuxt_data"
+        try:
+            data = json.loads(el.text or "")
+        except ValueError:
+            continue
+        if source == "nuxt_data":
+            try:
+                data = _unflatten_devalue(data)
+            except RecursionError:
+                continue
+        yield source, data
+
+
+# devalue wrappers Nuxt 3 puts around reactive state; they hold one value
+_DEVALUE_WRAPPERS = {"Reactive", "ShallowReactive", "Ref", "ShallowRef"}
+
+
+def _unflatten_devalue(values: Any) -> Any:
+    """Rebuild the state Nuxt 3 serializes into ``__NUXT_DATA__`` with devalue.
+
+    The payload is one flat array and ``values[0]`` is the root. Inside
+    objects and arrays every value is an index into that array; an array
+    that starts with a type name (``Reactive``, ``Date``, ``Set``...)
+    stands for that type. Negative indices (undefined, NaN...) and
+    references back into an object being built come back as ``None``.
+    """
+    if not isinstance(values, list) or not values:
+        return None
+    done: Dict[int, Any] = {}
+    building: Set[int] = set()
+
+    def hydrate(index: Any) -> Any:
+        if not isinstance(index, int) or isinstance(index, bool) or not 0 <= index < len(values) or index in building:
+            return None
+        if index in done:
+            return done[index]
+        value = values[index]
+        building.add(index)
+        if isinstance(value, dict):
+            value = {k: hydrate(v) for k, v in value.items()}
+        elif isinstance(value, list) and value and isinstance(value[0], str):
+            kind, args = value[0], value[1:]
+            if kind in _DEVALUE_WRAPPERS:
+                value = hydrate(args[0]) if args else None
+            elif kind == "Date":
+                value = args[0] if args else None
+            elif kind == "Set":
+                value = [hydrate(v) for v in args]
+            elif kind in ("Map", "null"):  # key, value pairs; "null" is a prototype-less object
+                value = {str(hydrate(k) if kind == "Map" else k): hydrate(v) for k, v in zip(args[::2], args[1::2])}
+            else:  # RegExp, BigInt, custom reducers
+                value = None
+        elif isinstance(value, list):
+            value = [hydrate(v) for v in value]
+        building.discard(index)
+        done[index] = value
+        return value
+
+    return hydrate(0)
+
+
+def _text_to_html(text: str) -> str:
+    paras = [p.strip() for p in re.split(r"\n\s*\n|\r?\n", text) if p.strip()]
+    return "".join(f"<p>{escape(p)}</p>" for p in paras)
+
+
+def _rich_text_to_html(value: Any) -> Optional[str]:
+    """Render Contentful rich-text documents and Portable Text arrays."""
+    if isinstance(value, dict) and value.get("nodeType") == "document":
+        return "".join(_contentful_node(n) for n in value.get("content") or [])
+    if isinstance(value, list) and value and all(isinstance(b, dict) and b.get("_type") == "block" for b in value):
+        out = []
+        for block in value:
+            text = escape("".join(str(c.get("text", "")) for c in block.get("children") or [] if isinstance(c, dict)))
+            style = block.get("style") or "normal"
+            tag = style if re.fullmatch(r"h[1-6]|blockquote", style) else ("li" if block.get("listItem") else "p")
+            out.append(f"<{tag}>{text}</{tag}>")
+        return "".join(out)
+    return None
+
+
+def _contentful_node(node: Any) -> str:
+    if not isinstance(node, dict):
+        return ""
+    ntype = node.get("nodeType", "")
+    if ntype == "text":
+        return escape(str(node.get("value", "")))
+    inner = "".join(_contentful_node(n) for n in node.get("content") or [])
+    tags = {
+        "paragraph": "p",
+        "blockquote": "blockquote",
+        "unordered-list": "ul",
+        "ordered-list": "ol",
+        "list-item": "li",
+        "hr": "hr",
+    }
+    if ntype.startswith("heading-"):
+        tag = "h" + ntype.rsplit("-", 1)[-1]
+    elif ntype == "hyperlink":
+        href = escape(str((node.get("data") or {}).get("uri", "")))
+        return f'<a href="{href}">{inner}</a>'
+    else:
+        tag = tags.get(ntype, "")
+    return f"<{tag}>{inner}</{tag}>" if tag else inner
+
+
+def _body_candidate(key: Optional[str], value: Any) -> Optional[Tuple[str, int]]:
+    # Counted like the cleaner counts the DOM it competes with
+    rich = _rich_text_to_html(value)
+    if rich:
+        return rich, text_chars(_strip_tags_re.sub("", rich))
+    if not isinstance(value, str) or key not in BODY_KEYS or len(value) < MIN_BODY_CHARS:
+        return None
+    if _tag_hint_re.search(value):
+        return value, text_chars(_strip_tags_re.sub("", value))
+    return _text_to_html(value), text_chars(value)
+
+
+def _from_json_ld(data: Any) -> Optional[HydratedContent]:
+    for value in iter_json_ld_articles(data):
+        body = value.get("articleBody") or value.get("text")
+        if not isinstance(body, str) or len(body) < MIN_BODY_CHARS:
+            continue
+        cand = _body_candidate("articleBody", body)
+        if cand is None:
+            continue
+        return HydratedContent(
+            source="json_ld",
+            html=cand[0],
+            text_chars=cand[1],
+            title=first_text(value, TITLE_KEYS),
+            metadata=article_metadata(value),
+        )
+    return None
+
+
+def _from_state(source: str, data: Any) -> Optional[HydratedContent]:
+    best: Optional[Tuple[str, int, Optional[dict]]] = None
+    for parent, key, value in walk(data):
+        cand = _body_candidate(key, value)
+        if cand and (best is None or cand[1] > best[1]):
+            best = (cand[0], cand[1], parent)
+    if best is None:
+        return None
+    owner = best[2] or {}
+    return HydratedContent(
+        source=source,
+        html=best[0],
+        text_chars=best[1],
+        title=first_text(owner, TITLE_KEYS),
+        metadata=article_metadata(owner),
+    )
+
+
+def extract_hydrated_content(doc: html.HtmlElement, json_ld: Optional[List[Any]] = None) -> Optional[HydratedContent]:
+    """Pull article content out of hydration blobs and JSON-LD.
+
+    Must run before the cleaner removes ``<script>`` elements; ``json_ld``
+    is the page's parsed JSON-LD (``utils.json_ld.parse_json_ld``), read
+    from ``doc`` when not given. Returns the largest body found, preferring
+    JSON-LD ``articleBody`` only when no framework state holds more text.
+    """
+    if json_ld is None:
+        json_ld = parse_json_ld(doc)
+    found: List[HydratedContent] = []
+    for data in json_ld:
+        hc = _from_json_ld(data)
+        if hc is not None:
+            found.append(hc)
+    for source, data in _iter_state_blobs(doc):
+        hc = _from_state(source, data)
+        if hc is not None:
+            found.append(hc)
+    if not found:
+        return None
+    best = max(found, key=lambda h: h.text_chars)
+    # Fill gaps (author, dates) from the other sources
+    for other in found:
+        for k, v in other.metadata.items():
+            best.metadata.setdefault(k, v)
+        if not best.title and other.title:
+            best.title = other.title
+    return best
+
+
+def build_content_tree(content: HydratedContent) -> html.HtmlElement:
+    """Wrap hydrated HTML in a synthetic ``<article>`` for the cleaner and converter."""
+    head = f"<h1>{escape(content.title)}</h1>" if content.title else ""
+    doc = html.fromstring(f"<html><body><article>{head}{content.html}</article></body></html>")
+    article = doc.find(".//article")
+    return article if article is not None else doc
@@ -1,19 +1,134 @@
 from __future__ import annotations
 
-from lxml import html
+import re
+from typing import Dict, List, Optional
+
+from lxml import etree, html
+
+
+# Subtrees that never hold article text
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "canvas", "iframe", "nav", "aside", "form", "head"}
+
+# Containers that may be picked as the content root
+CANDIDATE_TAGS = {"div", "article", "section", "main", "body", "td"}
+
+# Blocks that count as paragraphs and feed their score to ancestors
+PARAGRAPH_TAGS = {"p", "pre", "td", "blockquote", "li", "dd"}
+
+TAG_WEIGHTS: Dict[str, float] = {
+    "article": 10.0,
+    "main": 10.0,
+    "section": 3.0,
+    "div": 5.0,
+    "pre": 3.0,
+    "td": 3.0,
+    "blockquote": 3.0,
+    "body": -5.0,
+    "ol": -3.0,
+    "ul": -3.0,
+    "dl": -3.0,
+    "header": -5.0,
+    "footer": -5.0,
+}
+
+_positive_re = re.compile(r"article|body|content|entry|main|page|post|text|blog|story", re.I)
+_negative_re = re.compile(
+    r"comment|footer|footnote|masthead|meta|sidebar|sponsor|share|social|related|promo|banner|nav|menu|widget|cookie",
+    re.I,
+)
+
+MIN_PARAGRAPH_LEN = 25
+
+
+def _text_len(text: Optional[str]) -> int:
+    if not text:
+        return 0
+    return len(" ".join(text.split()))
+
+
+def class_weight(el: html.HtmlElement) -> float:
+    weight = 0.0
+    for attr in ("class", "id"):
+        value = el.get(attr)
+        if not value:
+            continue
+        if _negative_re.search(value):
+            weight -= 25.0
+        if _positive_re.search(value):
+            weight += 25.0
+    return weight
+
+
+class _Frame:
+    __slots__ = ("el", "text_len", "link_len", "commas", "score")
+
+    def __init__(self, el: html.HtmlElement, text: Optional[str]) -> None:
+        self.el = el
+        self.text_len = _text_len(text)
+        self.link_len = 0
+        self.commas = text.count(",") if text else 0
+        self.score = 0.0
+
+
+def score_candidates(doc: html.HtmlElement) -> Dict[html.HtmlElement, float]:
+    """Score container elements in a single post-order walk.
+
+    Text length, link text and comma counts are accumulated bottom-up, so every
+    text node is read once. Paragraph-like blocks add their score to their parent
+    and half of it to their grandparent, as in Readability; candidates are then
+    weighted by tag, class/id hints and link density.
+    """
+    scores: Dict[html.HtmlElement, float] = {}
+    stack: List[_Frame] = []
+    walker = etree.iterwalk(doc, events=("start", "end"))
+    for event, el in walker:
+        tag = el.tag if isinstance(el.tag, str) else None
+        if event == "start":
+            if tag is None or tag in SKIP_TAGS:
+                walker.skip_subtree()
+            stack.append(_Frame(el, el.text if tag and tag not in SKIP_TAGS else None))
+            continue
+
+        frame = stack.pop()
+        parent = stack[-1] if stack else None
+        if tag is None or tag in SKIP_TAGS:
+            frame.text_len = frame.link_len = frame.commas = 0
+            frame.score = 0.0
+        if tag == "a":
+            frame.link_len = frame.text_len
+
+        if tag in PARAGRAPH_TAGS and frame.text_len >= MIN_PARAGRAPH_LEN:
+            content = 1.0 + frame.commas + min(frame.text_len / 100.0, 3.0)
+            if parent is not None:
+                parent.score += content
+                if len(stack) > 1:
+                    stack[-2].score += content / 2.0
+
+        if tag in CANDIDATE_TAGS and frame.text_len:
+            link_density = frame.link_len / frame.text_len
+            total = frame.score + TAG_WEIGHTS.get(tag, 0.0) + class_weight(el)
+            scores[el] = total * (1.0 - link_density)
+
+        if parent is not None:
+            tail = el.tail
+            parent.text_len += frame.text_len + _text_len(tail)
+            parent.link_len += frame.link_len
+            parent.commas += frame.commas + (tail.count(",") if tail else 0)
+    return scores
 
 
 def pick_best_candidate(doc: html.HtmlElement) -> html.HtmlElement:
-    """Very light Readability-like heuristic: choose the element with max text length among main/article/section/body divs.
-    Conservative to avoid over-pruning.
+    """Readability-like extraction: choose the highest scoring container.
+
+    Falls back to ``<body>`` (or the document) when nothing scores positively.
     """
-    candidates = doc.xpath("//main | //article | //section | //body | /html/body/div")
     best = None
-    best_len = 0
-    for el in candidates:
-        text = " ".join(el.text_content().split())
-        L = len(text)
-        if L > best_len:
+    best_score = 0.0
+    for el, score in score_candidates(doc).items():
+        if score > best_score:
             best = el
-            best_len = L
-    return best or (doc.find(".//body") or doc)
+            best_score = score
+    if best is not None:
+        return best
+    body = doc.find(".//body")
+    return body if body is not None else doc
@@ -1,26 +1,50 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from dataclasses import asdict, dataclass, field, replace
 from pathlib import Path
-from typing import Dict, Iterable, Optional
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from lxml import html
 
+from .assets import resolve_images
 from .utils.logging import get_logger
-from .utils.url import slugify, normalize_url
-from .utils.io import write_text_file
-from .utils.metadata import extract_metadata
-from .utils.robots import is_allowed
-from .fetchers import http_fetcher
-from .fetchers.browser_fetcher import fetch_with_browser
-from .fetchers.jina_reader import fetch_markdown as jina_fetch
-from .fetchers.firecrawl_fetcher import fetch_markdown as firecrawl_fetch
-from .normalize.html_cleaner import to_clean_html
-from .convert.html_to_markdown import to_markdown
-from .convert.wrap import reflow_paragraphs
+from .utils.singleflight import Call, SingleFlight
+from .utils.url import CanonicalRules, canonicalize_url, slugify
+from .utils.budget import BudgetMeter, ResourceBudget
+from .utils.dedup import Deduplicator
+from .utils.io import iter_lines, link_duplicate, write_text_chunks
+from .utils.json_ld import parse_json_ld
+from .utils.metadata import PageMetadata, extract_metadata
+from .utils.parallel import ParallelOptions
+from .utils.strategy_memory import DEFAULT_ORDER, StrategyMemory, open_strategy_memory
+from .normalize.html_cleaner import BOILERPLATE_SELECTORS, parse_html, to_clean_html
+from .normalize.browser_prune import prune_options
+from .normalize.hydration import extract_hydrated_content
+from .convert.sections import SectionIndex
+from .convert.tables import TableOptions, TableSidecars
+from .convert.wrap import reflow_lines, reflow_lines_parallel
 from .convert.frontmatter import compose_front_matter
-from .evaluate.heuristics import evaluate as eval_heur, HeuristicReport
-from .evaluate.llm_eval import evaluate_with_openai
+from .evaluate.js_detect import detect_js_requirement
+
+if TYPE_CHECKING:
+    from .providers import ProviderPool
+    from .assets import AssetStore
+    from .fetchers.http_fetcher import FetchResult
+    from .utils.encoding import Decoding
+    from .utils.profiling import PageProfiler
+
+# Fetchers (httpx, Playwright), markdownify, langdetect and the OpenAI client
+# are imported where they are first used, so short runs and --version start
+# quickly and provider-only runs never load the HTML converter.
+
+# Shortest timeout a fetch gets when the page deadline is about to pass
+MIN_FETCH_TIMEOUT = 0.5
 
 
 @dataclass
@@ -37,11 +61,68 @@ class RunConfig:
     respect_robots: bool = True
     keep_images: bool = False
     wrap: bool = True
+    wrap_width: int = 80
+    list_indent: Optional[int] = None
     front_matter: bool = True
     llm_eval: Optional[bool] = None  # None=auto if OPENAI_API_KEY
     min_coverage: float = 0.6
     log_level: str = "INFO"
     llm_model: Optional[str] = None
+    drop_selectors: Optional[Iterable[str]] = None
+    strip_boilerplate: bool = False
+    extractor: str = "semantic"  # semantic | score | auto
+    strategy_memory: Optional[Path] = None  # JSON file with per-domain strategy outcomes
+    explore_every: int = 20
+    js_detect: bool = True  # classify raw HTML and skip straight to the browser for JS-only pages
+    js_min_confidence: float = 0.6
+    report: Optional[Path] = None  # write the run report as JSON
+    hydration: bool = True  # use __NEXT_DATA__/JSON-LD content when the DOM is a shell
+    dedup: Optional[Deduplicator] = None  # shared across a batch; duplicates are linked, not rewritten
+    url_rules: Optional[CanonicalRules] = None  # None = DEFAULT_RULES
+    flights: Optional[SingleFlight] = None  # coalesces concurrent runs for the same canonical URL
+    budget: Optional[ResourceBudget] = None  # node/text/table/deadline limits per page
+    align_tables: bool = False  # pad pipe-table columns to equal width
+    table_csv_threshold: Optional[int] = None  # larger tables go to a CSV sidecar
+    profile: Optional[Path] = None  # directory for cProfile stats and per-stage memory peaks
+    html: Optional[str] = None  # convert this HTML (fetched elsewhere) instead of fetching ``page``
+    hedge_delay: Optional[float] = None  # start the next strategy if none has succeeded after this many seconds
+    assets: Optional["AssetStore"] = None  # download images and link them locally (needs keep_images)
+    browser_prune: bool = False  # prune in the page and transfer only the content subtree
+    providers: Optional["ProviderPool"] = None  # cached, rate-limited Jina/Firecrawl calls shared by a run
+    sections: Optional[str] = None  # json | jsonl: write a section index next to the output
+    chunk_tokens: Optional[int] = None  # also split sections into chunks of at most this many tokens
+    parallel: Optional[ParallelOptions] = None  # convert and wrap very large pages in worker processes
+
+
+@dataclass
+class RunReport:
+    url: str
+    final_url: Optional[str] = None  # where the page was fetched from, after redirects; base for its relative links
+    strategies_tried: List[str] = field(default_factory=list)
+    strategy: Optional[str] = None
+    output: Optional[Path] = None
+    bytes_written: int = 0
+    js: Optional[Dict[str, Any]] = None
+    encoding: Optional[Dict[str, Any]] = None  # how the HTTP body was decoded, and any mojibake seen
+    hydration: Optional[str] = None
+    assets: Optional[Dict[str, int]] = None  # images per outcome (downloaded, cached, failed, ...) and bytes
+    duplicate_of: Optional[str] = None
+    duplicate_kind: Optional[str] = None  # url | exact | near
+    error: Optional[str] = None
+    truncations: List[Dict[str, Any]] = field(default_factory=list)
+    profile: Optional[str] = None  # path of the profile summary
+    elapsed: float = 0.0
+    meter: Optional[BudgetMeter] = field(default=None, repr=False, compare=False)
+    profiler: Optional["PageProfiler"] = field(default=None, repr=False, compare=False)
+    cancelled: Optional[threading.Event] = field(default=None, repr=False, compare=False)  # set when a hedged strategy lost
+    # HTTP body set aside for the browser, converted if the browser fails: (body, url, encoding)
+    deferred: Optional[Tuple[Union[str, bytes], str, Optional[str]]] = field(default=None, repr=False, compare=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(replace(self, meter=None, profiler=None, cancelled=None, deferred=None))
+        del data["meter"], data["profiler"], data["cancelled"], data["deferred"]
+        data["output"] = str(self.output) if self.output else None
+        return data
 
 
 def _maybe_llm_enabled(cfg: RunConfig) -> bool:
@@ -52,6 +133,14 @@ def _maybe_llm_enabled(cfg: RunConfig) -> bool:
     return bool(os.getenv("OPENAI_API_KEY"))
 
 
+def selectors_to_drop(cfg: RunConfig) -> Tuple[str, ...]:
+    """The ``--drop-selector`` rules, led by the boilerplate set when it is enabled."""
+    selectors = tuple(cfg.drop_selectors or ())
+    if cfg.strip_boilerplate:
+        selectors = BOILERPLATE_SELECTORS + selectors
+    return selectors
+
+
 def _finalize_output_path(cfg: RunConfig, meta_title: Optional[str]) -> Path:
     if cfg.output:
         return cfg.output
@@ -59,115 +148,568 @@ def _finalize_output_path(cfg: RunConfig, meta_title: Optional[str]) -> Path:
     return Path(slug)
 
 
-def _http_pipeline(cfg: RunConfig, logger) -> Optional[str]:
-    logger.debug("Fetching via HTTP")
-    res = http_fetcher.fetch(cfg.page, timeout=cfg.timeout, headers=cfg.headers, cookies=cfg.cookies, retries=cfg.retries)
-    cleaned = to_clean_html(res.html, keep_images=cfg.keep_images)
-    md = to_markdown(cleaned)
-    report = eval_heur(md, cleaned, cfg.min_coverage)
-    logger.debug(f"Heuristics coverage={report.coverage:.2f} title={report.title_ok}")
+class _Coalesced(Exception):
+    """Raised by a strategy when its redirect target is already being converted."""
+
+    def __init__(self, call: Call) -> None:
+        super().__init__(call.key)
+        self.call = call
+
+
+def _claim_final_url(cfg: RunConfig, report: RunReport, final_url: str) -> None:
+    if cfg.flights is None or not final_url:
+        return
+    final = canonicalize_url(final_url, cfg.url_rules)
+    if final == report.url:
+        return
+    other = cfg.flights.alias(final, report.url)
+    if other is not None:
+        raise _Coalesced(other)
+
+
+def _stage(report: RunReport, name: str) -> ContextManager[None]:
+    # Times a pipeline stage and its allocation peak when profiling
+    return report.profiler.stage(name) if report.profiler is not None else nullcontext()
+
+
+def _fetch_timeout(report: RunReport, timeout: float) -> float:
+    # A fetch may not outlive the page deadline
+    left = report.meter.remaining() if report.meter is not None else None
+    return timeout if left is None else max(MIN_FETCH_TIMEOUT, min(timeout, left))
+
+
+def _cancelled(report: RunReport) -> bool:
+    return report.cancelled is not None and report.cancelled.is_set()
+
+
+def _follow(report: RunReport, leader: RunReport, kind: str) -> None:
+    report.duplicate_of = leader.duplicate_of or leader.url
+    report.duplicate_kind = kind
+    report.output = leader.output
+    report.strategy = leader.strategy
+
+
+@dataclass
+class PageResult:
+    markdown: str
+    metadata: PageMetadata
+    sidecars: Optional[TableSidecars] = None
+
+
+def clean_page(
+    cfg: RunConfig, html_text: Union[str, bytes], url: str, report: RunReport, encoding: Optional[str] = None
+) -> Tuple[html.HtmlElement, PageMetadata]:
+    """Parse a page and return its cleaned content tree and metadata.
+
+    Hydrated content and budget cuts are recorded on ``report``.
+    """
+    doc = parse_html(html_text, encoding)
+    # Metadata comes from <head>, which the cleaner removes
+    json_ld = parse_json_ld(doc)
+    meta = extract_metadata(doc, url, json_ld)
+    hydrated = extract_hydrated_content(doc, json_ld) if cfg.hydration else None
+    cleaned = to_clean_html(
+        doc,
+        keep_images=cfg.keep_images,
+        drop_selectors=selectors_to_drop(cfg),
+        extractor=cfg.extractor,
+        hydrated=hydrated,
+        meter=report.meter,
+    )
+    if cfg.keep_images:
+        resolve_images(cleaned, url)
+    if hydrated is not None:
+        if cleaned.getroottree().getroot() is not doc:
+            report.hydration = hydrated.source
+            meta.title = hydrated.title or meta.title
+        meta.fill_missing(hydrated.metadata)
+    return cleaned, meta
+
+
+def _evaluate_html(
+    cfg: RunConfig, logger, cleaned: html.HtmlElement, md: str, meta: PageMetadata, extra_text: str = ""
+) -> bool:
+    from .evaluate.heuristics import evaluate as eval_heur
+
+    # extra_text: content moved out of the Markdown (CSV sidecars), counted for coverage
+    heur = eval_heur(md + "\n" + extra_text if extra_text else md, cleaned, cfg.min_coverage)
+    logger.debug(f"Heuristics coverage={heur.coverage:.2f} title={heur.title_ok}")
     if _maybe_llm_enabled(cfg):
-        meta = extract_metadata(cleaned.getroottree().getroot(), res.url)
-        verdict = evaluate_with_openai(res.url, meta.title, cleaned.text_content(), md, model=cfg.llm_model)
+        from .evaluate.llm_eval import evaluate_with_openai
+
+        verdict = evaluate_with_openai(meta.url or cfg.page, meta.title, cleaned.text_content(), md, model=cfg.llm_model)
         if verdict:
             logger.debug(f"LLM verdict={verdict.verdict} score={verdict.score}")
             if not verdict.passed():
+                return False
+    return heur.passed(cfg.min_coverage)
+
+
+def _convert(
+    cfg: RunConfig, logger, html_text: Union[str, bytes], url: str, report: RunReport, encoding: Optional[str] = None
+) -> Optional[PageResult]:
+    from .convert.html_to_markdown import to_markdown
+
+    if _cancelled(report):
+        return None
+    with _stage(report, "clean"):
+        cleaned, meta = clean_page(cfg, html_text, url, report, encoding)
+    sidecars = None
+    if cfg.table_csv_threshold is not None:
+        # Sidecar names follow the output file, which is known once metadata is
+        sidecars = TableSidecars(_finalize_output_path(cfg, meta.title).stem)
+    tables = TableOptions(align=cfg.align_tables, csv_threshold=cfg.table_csv_threshold, sidecars=sidecars)
+    with _stage(report, "convert"):
+        md = to_markdown(cleaned, report.meter, tables, parallel=cfg.parallel)
+    extra = sidecars.text() if sidecars is not None and sidecars.tables else ""
+    if _cancelled(report):
+        return None
+    with _stage(report, "evaluate"):
+        passed = _evaluate_html(cfg, logger, cleaned, md, meta, extra)
+    if not passed:
+        return None
+    return PageResult(md, meta, sidecars if extra else None)
+
+
+def _http_pipeline(cfg: RunConfig, logger, report: RunReport) -> Optional[PageResult]:
+    from .fetchers import http_fetcher
+
+    logger.debug("Fetching via HTTP")
+    with _stage(report, "fetch"):
+        res = http_fetcher.fetch(cfg.page, timeout=_fetch_timeout(report, cfg.timeout), headers=cfg.headers, cookies=cfg.cookies, retries=cfg.retries)
+    _claim_final_url(cfg, report, res.url)
+    body, encoding = _http_body(res)
+    if res.decoding is not None:
+        report.encoding = res.decoding.to_dict()
+        if res.decoding.mojibake:
+            logger.warning(f"Encoding: {res.decoding.mojibake} (reading as {res.decoding.encoding})")
+    if cfg.js_detect:
+        with _stage(report, "js_detect"):
+            verdict = detect_js_requirement(body)
+        report.js = verdict.to_dict()
+        logger.debug(f"JS detector: {verdict.decision} confidence={verdict.confidence} signals={verdict.signals}")
+        wants_browser = verdict.needs_browser or (verdict.has_inline_state and not cfg.hydration)
+        if wants_browser and verdict.confidence >= cfg.js_min_confidence and cfg.browser is not False:
+            from .fetchers.browser_fetcher import browser_available
+
+            if cfg.browser or browser_available():
+                logger.debug("Page needs JavaScript; deferring HTTP conversion to the browser")
+                report.deferred = (body, res.url, encoding)
                 return None
-    return md if report.passed(cfg.min_coverage) else None
+            logger.debug("Page needs JavaScript but Playwright is not installed; converting the HTTP response")
+    return _convert(cfg, logger, body, res.url, report, encoding)
+
+
+def _deferred_http(cfg: RunConfig, logger, report: RunReport) -> Optional[PageResult]:
+    """Convert the HTTP body set aside for the browser, once the browser has failed.
+
+    Whatever the static HTML holds is better than handing the page to a
+    paid provider.
+    """
+    if report.deferred is None:
+        return None
+    body, url, encoding = report.deferred
+    report.deferred = None
+    logger.debug("Browser failed; converting the HTTP response")
+    return _convert(cfg, logger, body, url, report, encoding)
+
+
+def _http_body(res: "FetchResult") -> Tuple[Union[str, bytes], Optional[str]]:
+    if res.html is None and res.content is not None and res.decoding is not None:
+        return byte_body(res.content, res.decoding)
+    return res.text(), None
+
 
+def byte_body(content: bytes, decoding: "Decoding") -> Tuple[Union[str, bytes], Optional[str]]:
+    """Body and encoding to hand to ``clean_page`` for undecoded response bytes."""
+    # Bytes go straight to lxml unless the encoding isn't ASCII-compatible
+    # (UTF-16), which the byte-level JS detector can't scan
+    if "<a".encode(decoding.encoding) == b"<a":
+        return content, decoding.encoding
+    return content.decode(decoding.encoding, "replace"), None
 
-def _browser_pipeline(cfg: RunConfig, logger) -> Optional[str]:
+
+def _browser_pipeline(cfg: RunConfig, logger, report: RunReport) -> Optional[PageResult]:
+    from .fetchers.browser_fetcher import fetch_with_browser
+
+    prune = prune_options(cfg.keep_images, selectors_to_drop(cfg), cfg.extractor) if cfg.browser_prune else None
     try:
-        bres = fetch_with_browser(cfg.page, timeout=max(cfg.timeout, 60.0))
+        with _stage(report, "fetch"):
+            bres = fetch_with_browser(cfg.page, timeout=_fetch_timeout(report, max(cfg.timeout, 60.0)), prune=prune)
     except Exception as e:
         logger.debug(f"Browser fetch error: {e}")
         return None
-    cleaned = to_clean_html(bres.html, keep_images=cfg.keep_images)
-    md = to_markdown(cleaned)
-    report = eval_heur(md, cleaned, cfg.min_coverage)
-    if _maybe_llm_enabled(cfg):
-        meta = extract_metadata(cleaned.getroottree().getroot(), bres.url)
-        verdict = evaluate_with_openai(bres.url, meta.title, cleaned.text_content(), md, model=cfg.llm_model)
-        if verdict and not verdict.passed():
-            return None
-    return md if report.passed(cfg.min_coverage) else None
+    _claim_final_url(cfg, report, bres.url)
+    logger.debug(f"Browser DOM: {len(bres.html)} chars{' (pruned in page)' if bres.pruned else ''}")
+    return _convert(cfg, logger, bres.html, bres.url, report)
+
+
+def _provider_result(cfg: RunConfig, md: str, report: RunReport) -> Optional[PageResult]:
+    from .convert.html_to_markdown import markdown_title
+    from .evaluate.heuristics import evaluate as eval_heur
+
+    with _stage(report, "evaluate"):
+        heur = eval_heur(md, None, cfg.min_coverage)
+    if not heur.passed(cfg.min_coverage):
+        return None
+    meta = PageMetadata(
+        title=markdown_title(md),
+        url=canonicalize_url(cfg.page, cfg.url_rules),
+        retrieved_at=datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        generator="webtomd",
+    )
+    return PageResult(md, meta)
 
 
-def _jina_pipeline(cfg: RunConfig, logger) -> Optional[str]:
+def _jina_pipeline(cfg: RunConfig, logger, report: RunReport) -> Optional[PageResult]:
+    from .fetchers.jina_reader import fetch_markdown as jina_fetch
+
     try:
-        md = jina_fetch(cfg.page, timeout=max(cfg.timeout, 60.0))
+        with _stage(report, "fetch"):
+            if cfg.providers is not None:
+                md = cfg.providers.fetch("jina", cfg.page, timeout=_fetch_timeout(report, max(cfg.timeout, 60.0)))
+            else:
+                md = jina_fetch(cfg.page, timeout=_fetch_timeout(report, max(cfg.timeout, 60.0)))
     except Exception as e:
         logger.debug(f"Jina fetch error: {e}")
         return None
-    report = eval_heur(md, None, cfg.min_coverage)
-    return md if report.passed(cfg.min_coverage) else None
+    return _provider_result(cfg, md, report)
+
 
+def _firecrawl_pipeline(cfg: RunConfig, logger, report: RunReport) -> Optional[PageResult]:
+    from .fetchers.firecrawl_fetcher import fetch_markdown as firecrawl_fetch
 
-def _firecrawl_pipeline(cfg: RunConfig, logger) -> Optional[str]:
     try:
-        md = firecrawl_fetch(cfg.page, timeout=max(cfg.timeout, 60.0))
+        with _stage(report, "fetch"):
+            if cfg.providers is not None:
+                md = cfg.providers.fetch("firecrawl", cfg.page, timeout=_fetch_timeout(report, max(cfg.timeout, 60.0)))
+            else:
+                md = firecrawl_fetch(cfg.page, timeout=_fetch_timeout(report, max(cfg.timeout, 60.0)))
     except Exception as e:
         logger.debug(f"Firecrawl fetch error: {e}")
         return None
-    report = eval_heur(md, None, cfg.min_coverage)
-    return md if report.passed(cfg.min_coverage) else None
+    return _provider_result(cfg, md, report)
 
 
-def run(cfg: RunConfig) -> Path:
+def output_chunks(cfg: RunConfig, front_matter: str, md: str, index: Optional[SectionIndex] = None) -> Iterator[str]:
+    """Stream the final document: front matter, then (optionally reflowed) Markdown.
+
+    With an ``index``, the Markdown's sections are indexed as it streams by.
+    """
+    if front_matter:
+        yield front_matter
+    body = _body_chunks(cfg, md)
+    yield from (index.feed(body) if index is not None else body)
+
+
+def _body_chunks(cfg: RunConfig, md: str) -> Iterator[str]:
+    if not cfg.wrap:
+        yield md
+        return
+    if cfg.parallel is not None and cfg.parallel.applies(len(md)):
+        lines = reflow_lines_parallel(iter_lines(md), cfg.parallel, width=cfg.wrap_width, list_indent=cfg.list_indent)
+    else:
+        lines = reflow_lines(iter_lines(md), width=cfg.wrap_width, list_indent=cfg.list_indent)
+    for line in lines:
+        yield line
+        yield "\n"
+
+
+def _pipelines() -> Dict[str, Callable[[RunConfig, Any, RunReport], Optional[PageResult]]]:
+    return {
+        "http": _http_pipeline,
+        "browser": _browser_pipeline,
+        "jina": _jina_pipeline,
+        "firecrawl": _firecrawl_pipeline,
+    }
+
+
+def _run_sequential(
+    cfg: RunConfig, logger, report: RunReport, order: List[str], memory: Optional[StrategyMemory]
+) -> Tuple[Optional[PageResult], Optional[str]]:
+    pipelines = _pipelines()
+    # An HTTP attempt that deferred its body counts once the body's fate is known
+    held: Optional[float] = None
+    try:
+        for i, name in enumerate(order):
+            report.strategies_tried.append(name)
+            t0 = time.perf_counter()
+            result = pipelines[name](cfg, logger, report)
+            if name == "http" and result is None and report.deferred is not None:
+                held = time.perf_counter() - t0
+            elif memory is not None:
+                memory.record(report.url, name, result is not None, time.perf_counter() - t0)
+            if result is None and report.deferred is not None and "browser" not in order[i + 1 :]:
+                t0 = time.perf_counter()
+                result, name = _deferred_http(cfg, logger, report), "http"
+                if memory is not None:
+                    memory.record(report.url, "http", result is not None, (held or 0.0) + time.perf_counter() - t0)
+                held = None
+            if result is not None:
+                return result, name
+            if report.meter is not None and report.meter.expired():
+                report.meter.truncate("deadline", "fetch", strategy=name)
+                break
+    finally:
+        if held is not None and memory is not None:
+            memory.record(report.url, "http", False, held)
+    return None, None
+
+
+def _spawn(fn: Callable[[], Any]) -> Future:
+    # Daemon threads: a losing strategy stuck in a fetch must not keep the
+    # process alive after the page is written
+    future: Future = Future()
+
+    def run() -> None:
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(fn())
+            except BaseException as exc:
+                future.set_exception(exc)
+
+    threading.Thread(target=run, name="webtomd-strategy", daemon=True).start()
+    return future
+
+
+def _run_hedged(
+    cfg: RunConfig,
+    logger,
+    report: RunReport,
+    order: List[str],
+    memory: Optional[StrategyMemory],
+    started: float,
+    hedge_delay: float,
+) -> Tuple[Optional[PageResult], Optional[str]]:
+    """Run strategies in ``order``, starting the next one early instead of waiting.
+
+    The next strategy starts when the running ones have all failed, or when
+    ``hedge_delay`` seconds pass without a result. The first result
+    that passes evaluation wins and the others are cancelled (they stop at
+    their next stage boundary). A budget deadline bounds the whole race.
+    """
+    pipelines = _pipelines()
+    remaining = list(order)
+    running: Dict[Future, Tuple[str, RunReport, float]] = {}
+    deadline_at = report.meter.deadline_at if report.meter is not None else None
+    # An HTTP attempt that deferred its body counts once the body's fate is known
+    held: Optional[float] = None
+
+    def launch() -> None:
+        name = remaining.pop(0)
+        report.strategies_tried.append(name)
+        # Each strategy records into its own report; the winner's is merged back
+        scratch = RunReport(url=report.url, cancelled=threading.Event())
+        if cfg.budget is not None:
+            scratch.meter = cfg.budget.start(started, scratch.truncations)
+        running[_spawn(lambda: pipelines[name](cfg, logger, scratch))] = (name, scratch, time.perf_counter())
+        logger.debug(f"Started strategy {name}")
+
+    launch()
+    hedge_at = time.perf_counter() + hedge_delay
+    try:
+        while running:
+            now = time.perf_counter()
+            timeouts = [t - now for t in (hedge_at if remaining else None, deadline_at) if t is not None]
+            done, _ = wait(running, timeout=max(0.0, min(timeouts)) if timeouts else None, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda f: order.index(running[f][0])):
+                name, scratch, t0 = running.pop(future)
+                try:
+                    result = future.result()
+                except _Coalesced:
+                    raise
+                except Exception as exc:
+                    logger.debug(f"Strategy {name} error: {exc}")
+                    result = None
+                if scratch.js is not None:
+                    report.js = scratch.js
+                if scratch.encoding is not None:
+                    report.encoding = scratch.encoding
+                if scratch.deferred is not None:
+                    report.deferred = scratch.deferred
+                if name == "http" and result is None and scratch.deferred is not None:
+                    held = time.perf_counter() - t0
+                elif memory is not None:
+                    memory.record(report.url, name, result is not None, time.perf_counter() - t0)
+                if result is not None:
+                    report.hydration = scratch.hydration
+                    report.truncations.extend(scratch.truncations)
+                    return result, name
+            browser_pending = "browser" in remaining or any(n == "browser" for n, _, _ in running.values())
+            if report.deferred is not None and not browser_pending:
+                t0 = time.perf_counter()
+                result = _deferred_http(cfg, logger, report)
+                if memory is not None:
+                    memory.record(report.url, "http", result is not None, (held or 0.0) + time.perf_counter() - t0)
+                held = None
+                if result is not None:
+                    return result, "http"
+            if report.meter is not None and report.meter.expired():
+                report.meter.truncate("deadline", "fetch", strategies=[n for n, _, _ in running.values()])
+                break
+            if remaining and (not running or time.perf_counter() >= hedge_at):
+                launch()
+                hedge_at = time.perf_counter() + hedge_delay
+    finally:
+        if held is not None and memory is not None:
+            memory.record(report.url, "http", False, held)
+        for name, scratch, _ in running.values():
+            scratch.cancelled.set()
+            logger.debug(f"Cancelled strategy {name}")
+    return None, None
+
+
+def execute(cfg: RunConfig, report: Optional[RunReport] = None) -> RunReport:
+    """Fetch, convert and write one page.
+
+    Raises ``SystemExit`` on failure; pass ``report`` to keep what was recorded
+    up to that point. With ``cfg.flights`` set, runs for the same canonical URL
+    (or the same redirect target) share one fetch and conversion.
+    """
+    started = time.perf_counter()
+    page = canonicalize_url(cfg.page, cfg.url_rules)
+    if report is None:
+        report = RunReport(url=page)
+    else:
+        report.url = page
+    if cfg.profile is not None and report.profiler is None:
+        from .utils.profiling import PageProfiler
+
+        report.profiler = PageProfiler()
+    if cfg.flights is None:
+        return _profiled(cfg, report, started)
+    leader, shared = cfg.flights.do(page, lambda: _profiled(cfg, report, started))
+    if shared:
+        _follow(report, leader, "url")
+        _write_report(cfg, report, started)
+    return report
+
+
+def _profiled(cfg: RunConfig, report: RunReport, started: float) -> RunReport:
+    prof = report.profiler
+    if prof is None:
+        return _execute(cfg, report, started)
+    name = slugify(report.url, max_len=100)
+    if cfg.profile is not None:
+        # Batches pass their own profiler and aggregate; single pages write here
+        report.profile = str(cfg.profile / f"{name}.profile.txt")
+    prof.start()
+    try:
+        return _execute(cfg, report, started)
+    finally:
+        prof.stop()
+        if cfg.profile is not None:
+            from .utils.profiling import write_profile
+
+            _, summary = write_profile(cfg.profile, name, [prof])
+            get_logger().info(f"Profile: {summary}")
+
+
+def _execute(cfg: RunConfig, report: RunReport, started: float) -> RunReport:
     logger = get_logger()
-    page = normalize_url(cfg.page)
+    page = report.url
     logger.info(f"Source: {page}")
+    if cfg.budget is not None:
+        report.meter = cfg.budget.start(started, report.truncations)
+
+    if cfg.respect_robots and cfg.html is None:
+        from .utils.robots import is_allowed
 
-    if cfg.respect_robots:
         if not is_allowed(page):
             logger.warning("robots.txt disallows fetching this URL; use --ignore-robots to override.")
+            report.error = "robots.txt disallows fetching"
             raise SystemExit(2)
 
-    result_md: Optional[str] = None
-    tried = []
+    result: Optional[PageResult] = None
+    winner: Optional[str] = None
+    tried = report.strategies_tried
 
-    if cfg.use_jina:
-        tried.append("jina")
-        result_md = _jina_pipeline(cfg, logger)
-    elif cfg.use_firecrawl:
-        tried.append("firecrawl")
-        result_md = _firecrawl_pipeline(cfg, logger)
-    else:
-        # Default pipeline: HTTP -> (if needed) Browser -> Jina -> Firecrawl
-        tried.append("http")
-        result_md = _http_pipeline(cfg, logger)
-        if result_md is None:
-            if cfg.browser is None or cfg.browser is True:
-                tried.append("browser")
-                result_md = _browser_pipeline(cfg, logger)
-        if result_md is None:
+    try:
+        if cfg.html is not None:
+            tried.append("html")
+            result, winner = _convert(cfg, logger, cfg.html, page, report), "html"
+        elif cfg.use_jina:
             tried.append("jina")
-            result_md = _jina_pipeline(cfg, logger)
-        if result_md is None:
+            result, winner = _jina_pipeline(cfg, logger, report), "jina"
+        elif cfg.use_firecrawl:
             tried.append("firecrawl")
-            result_md = _firecrawl_pipeline(cfg, logger)
+            result, winner = _firecrawl_pipeline(cfg, logger, report), "firecrawl"
+        else:
+            # Default pipeline: HTTP -> (if needed) Browser -> Jina -> Firecrawl,
+            # reordered per domain when a strategy memory is configured
+            order = [s for s in DEFAULT_ORDER if s != "browser" or cfg.browser is not False]
+            memory = open_strategy_memory(cfg.strategy_memory, cfg.explore_every) if cfg.strategy_memory else None
+            if memory is not None:
+                order = memory.order(page, order)
+                logger.debug(f"Strategy order: {', '.join(order)}")
+            # Profiled runs stay sequential: the profiler only sees one thread
+            if cfg.hedge_delay is not None and report.profiler is None:
+                result, winner = _run_hedged(cfg, logger, report, order, memory, started, cfg.hedge_delay)
+            else:
+                result, winner = _run_sequential(cfg, logger, report, order, memory)
+            if memory is not None:
+                memory.save()
+    except _Coalesced as exc:
+        logger.info(f"Redirect target {exc.call.key} is already being converted")
+        _follow(report, exc.call.wait(), "redirect")
+        _write_report(cfg, report, started)
+        return report
 
-    if result_md is None:
+    if result is None:
         logger.error(f"Failed after strategies: {', '.join(tried)}")
+        report.error = "all strategies failed"
+        _write_report(cfg, report, started)
         raise SystemExit(1)
+    report.strategy = winner
 
-    # Compose front matter (best-effort)
-    import re
-    fm = ""
-    if cfg.front_matter:
-        title = None
-        m = re.search(r"^#\s+(.+)$", result_md, flags=re.MULTILINE)
-        if m:
-            title = m.group(1).strip()
-        meta_dict: Dict[str, str] = {"url": page, "generator": "webtomd"}
-        if title:
-            meta_dict["title"] = title
-        fm = compose_front_matter(meta_dict)
-
-    out_path = _finalize_output_path(cfg, None)
-    final_md = result_md
-    if cfg.wrap:
-        final_md = reflow_paragraphs(final_md)
-    written = write_text_file(out_path, (fm + final_md))
+    meta = result.metadata
+    if not meta.url:
+        meta.url = page
+    report.final_url = meta.url
+    if report.truncations:
+        logger.warning(f"Output truncated: {', '.join(t['limit'] for t in report.truncations)}")
+    fm = compose_front_matter(meta.to_dict()) if cfg.front_matter else ""
+    out_path = _finalize_output_path(cfg, meta.title)
+    if cfg.dedup is not None:
+        match = cfg.dedup.check(str(out_path), result.markdown)
+        if match is not None:
+            logger.info(f"Duplicate ({match.kind}) of {match.canonical}")
+            report.duplicate_of = match.canonical
+            report.duplicate_kind = match.kind
+            if link_duplicate(out_path, Path(match.canonical)):
+                report.output = out_path
+            _write_report(cfg, report, started)
+            return report
+    md = result.markdown
+    if cfg.assets is not None and cfg.keep_images:
+        from .assets import localize_images
+
+        with _stage(report, "assets"):
+            md, report.assets = localize_images(md, meta.url, out_path, cfg.assets)
+        logger.debug(f"Images: {report.assets}")
+    index = SectionIndex(cfg.chunk_tokens, offset=len(fm.encode("utf-8"))) if cfg.sections else None
+    with _stage(report, "write"):  # includes reflow and indexing, which run lazily
+        written = write_text_chunks(out_path, output_chunks(cfg, fm, md, index))
     logger.info(f"Saved: {written.path} ({written.bytes_written} bytes)")
-    return written.path
+    report.output = written.path
+    report.bytes_written = written.bytes_written
+    if result.sidecars is not None:
+        for path in result.sidecars.write(written.path.parent):
+            logger.info(f"Saved table: {path}")
+    if index is not None:
+        logger.info(f"Saved sections: {index.write(written.path, cfg.sections)}")
+    _write_report(cfg, report, started)
+    return report
+
+
+def _write_report(cfg: RunConfig, report: RunReport, started: float) -> None:
+    report.elapsed = round(time.perf_counter() - started, 3)
+    if cfg.report:
+        cfg.report.parent.mkdir(parents=True, exist_ok=True)
+        cfg.report.write_text(json.dumps(report.to_dict(), indent=2), encoding="utf-8")
+
+
+def run(cfg: RunConfig) -> Path:
+    report = execute(cfg)
+    assert report.output is not None
+    return report.output
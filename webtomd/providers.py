@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Coroutine, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+from .utils.url import canonicalize_url
+
+
+PROVIDERS = ("jina", "firecrawl")
+DEFAULT_TTL = 7 * 86400.0
+
+T = TypeVar("T")
+
+
+class ProviderError(RuntimeError):
+    pass
+
+
+class ProviderQuotaError(ProviderError):
+    """The run's provider credit budget is spent."""
+
+
+@dataclass
+class ProviderLimits:
+    concurrency: int = 4  # requests in flight
+    per_minute: Optional[float] = None  # requests started per minute
+
+
+@dataclass
+class ProviderUsage:
+    calls: int = 0  # remote requests (a batch scrape counts once)
+    pages: int = 0  # pages returned by those requests
+    cache_hits: int = 0
+    failures: int = 0
+    credits: float = 0.0  # as reported by the provider (Firecrawl), else 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class ProviderCache:
+    """Provider Markdown by (provider, URL), fresh for ``ttl`` seconds.
+
+    Entries are JSON files under ``directory/<provider>/``; without a
+    directory the cache only lives for the run, which still spares
+    retries and repeated URLs a second paid call.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, ttl: float = DEFAULT_TTL, clock: Callable[[], float] = time.time) -> None:
+        self.dir = Path(directory) if directory is not None else None
+        self.ttl = ttl
+        self.clock = clock
+        self._memory: Dict[Tuple[str, str], Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, provider: str, url: str) -> Path:
+        assert self.dir is not None
+        key = hashlib.sha256(f"{provider}\n{url}".encode("utf-8")).hexdigest()
+        return self.dir / provider / key[:2] / f"{key}.json"
+
+    def get(self, provider: str, url: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get((provider, url))
+        if entry is None and self.dir is not None:
+            try:
+                data = json.loads(self._path(provider, url).read_text(encoding="utf-8"))
+                entry = (float(data["fetched_at"]), data["markdown"])
+            except (OSError, ValueError, KeyError):
+                entry = None
+        if entry is None or self.clock() - entry[0] >= self.ttl:
+            return None
+        return entry[1]
+
+    def put(self, provider: str, url: str, markdown: str) -> None:
+        now = self.clock()
+        with self._lock:
+            self._memory[(provider, url)] = (now, markdown)
+        if self.dir is None:
+            return
+        path = self._path(provider, url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"provider": provider, "url": url, "fetched_at": now, "markdown": markdown}
+        fd, tmp = tempfile.mkstemp(prefix=".part-", dir=path.parent)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(data, fh)
+        os.replace(tmp, path)
+
+
+class _RateLimiter:
+    # Spaces request starts evenly; no bursts, which is what provider limits punish
+    def __init__(self, per_minute: Optional[float]) -> None:
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next = 0.0
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        start = max(now, self._next)
+        self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class ProviderPool:
+    """Jina and Firecrawl calls for a whole run, with caching and limits.
+
+    Calls run on one event loop in a background thread, so every pipeline
+    thread shares one HTTP client, one concurrency limit and one rate limit
+    per provider. ``fetch`` is the blocking entry point for the pipeline;
+    ``firecrawl_batch`` scrapes many URLs with one Firecrawl batch job and
+    fills the cache for the pages that follow. With ``max_credits``, paid
+    calls stop once that much has been spent in the run.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[ProviderCache] = None,
+        limits: Optional[Dict[str, ProviderLimits]] = None,
+        max_credits: Optional[float] = None,
+    ) -> None:
+        self.cache = cache or ProviderCache()
+        self.limits = {name: (limits or {}).get(name, ProviderLimits()) for name in PROVIDERS}
+        self.max_credits = max_credits
+        self.usage = {name: ProviderUsage() for name in PROVIDERS}
+        self._usage_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Any = None
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._rates: Dict[str, _RateLimiter] = {}
+
+    def _run(self, coro: Coroutine[Any, Any, T]) -> T:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name="webtomd-providers", daemon=True)
+                self._thread.start()
+                self._loop = loop
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def _http(self) -> Any:
+        # Created on the loop thread: httpx async clients belong to one loop
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(follow_redirects=True, timeout=60.0)
+            for name, lim in self.limits.items():
+                self._slots[name] = asyncio.Semaphore(lim.concurrency)
+                self._rates[name] = _RateLimiter(lim.per_minute)
+        return self._client
+
+    def close(self) -> None:
+        if self._loop is None:
+            return
+        if self._client is not None:
+            self._run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        assert self._thread is not None
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self) -> "ProviderPool":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _count(self, name: str, **deltas: float) -> None:
+        with self._usage_lock:
+            usage = self.usage[name]
+            for key, value in deltas.items():
+                setattr(usage, key, getattr(usage, key) + value)
+
+    def credits(self) -> float:
+        with self._usage_lock:
+            return sum(u.credits for u in self.usage.values())
+
+    def _check_budget(self, name: str) -> None:
+        if name == "firecrawl" and self.max_credits is not None and self.credits() >= self.max_credits:
+            raise ProviderQuotaError(f"provider credit budget spent ({self.max_credits:g})")
+
+    def fetch(self, name: str, url: str, timeout: float = 60.0) -> str:
+        """Markdown for ``url`` from provider ``name`` (``jina`` or ``firecrawl``), cached."""
+        cached = self.cache.get(name, url)
+        if cached is not None:
+            self._count(name, cache_hits=1)
+            return cached
+        self._check_budget(name)
+        try:
+            md, credits = self._run(self._limited(name, self._call(name, url, timeout)))
+        except Exception:
+            self._count(name, failures=1)
+            raise
+        self._count(name, calls=1, pages=1, credits=credits)
+        self.cache.put(name, url, md)
+        return md
+
+    async def _limited(self, name: str, coro: Coroutine[Any, Any, T]) -> T:
+        self._http()
+        try:
+            async with self._slots[name]:
+                await self._rates[name].acquire()
+                return await coro
+        finally:
+            coro.close()  # never awaited when the rate wait was cancelled
+
+    async def _call(self, name: str, url: str, timeout: float) -> Tuple[str, float]:
+        client = self._http()
+        if name == "jina":
+            from .fetchers.jina_reader import api_headers, build_jina_url
+
+            resp = await client.get(build_jina_url(url), headers=api_headers(), timeout=timeout)
+            resp.raise_for_status()
+            return resp.text, 0.0
+        if name == "firecrawl":
+            from .fetchers.firecrawl_fetcher import SCRAPE_OPTIONS, FirecrawlError, api_base, api_headers, markdown_from_response
+
+            resp = await client.post(
+                f"{api_base()}/v2/scrape", headers=api_headers(), json={"url": url, **SCRAPE_OPTIONS}, timeout=timeout
+            )
+            resp.raise_for_status()
+            data = resp.json()
+            md = markdown_from_response(data)
+            if not md:
+                raise FirecrawlError("Unexpected Firecrawl response structure")
+            meta = (data.get("data") or {}).get("metadata") or {}
+            return md, float(meta.get("creditsUsed", 1))
+        raise ProviderError(f"unknown provider: {name}")
+
+    def firecrawl_batch(self, urls: Iterable[str], poll: float = 2.0, timeout: float = 900.0) -> int:
+        """Scrape the uncached ``urls`` in one Firecrawl batch job; returns how many pages were cached."""
+        todo = [u for u in dict.fromkeys(urls) if self.cache.get("firecrawl", u) is None]
+        if not todo:
+            return 0
+        self._check_budget("firecrawl")
+        try:
+            pages, credits = self._run(self._limited("firecrawl", self._batch(todo, poll, timeout)))
+        except Exception:
+            self._count("firecrawl", failures=1)
+            raise
+        for url, md in pages.items():
+            self.cache.put("firecrawl", url, md)
+        self._count("firecrawl", calls=1, pages=len(pages), credits=credits)
+        return len(pages)
+
+    async def _batch(self, urls: List[str], poll: float, timeout: float) -> Tuple[Dict[str, str], float]:
+        from .fetchers.firecrawl_fetcher import SCRAPE_OPTIONS, FirecrawlError, api_base, api_headers
+
+        client = self._http()
+        headers = api_headers()
+        resp = await client.post(f"{api_base()}/v2/batch/scrape", headers=headers, json={"urls": urls, **SCRAPE_OPTIONS})
+        resp.raise_for_status()
+        job = resp.json()
+        status_url = f"{api_base()}/v2/batch/scrape/{job['id']}"
+        deadline = time.monotonic() + timeout
+        while True:
+            resp = await client.get(status_url, headers=headers)
+            resp.raise_for_status()
+            status = resp.json()
+            if status.get("status") == "completed":
+                break
+            if status.get("status") in ("failed", "cancelled"):
+                raise FirecrawlError(f"batch scrape {job['id']} {status['status']}")
+            if time.monotonic() > deadline:
+                raise FirecrawlError(f"batch scrape {job['id']} not done after {timeout:g}s")
+            await asyncio.sleep(poll)
+        items = list(status.get("data") or [])
+        credits = float(status.get("creditsUsed", len(items)))
+        # Large results come in pages
+        while status.get("next"):
+            resp = await client.get(status["next"], headers=headers)
+            resp.raise_for_status()
+            status = resp.json()
+            items.extend(status.get("data") or [])
+        # Results carry the URL as Firecrawl saw it; match on the canonical form
+        wanted = {canonicalize_url(u): u for u in urls}
+        pages: Dict[str, str] = {}
+        for item in items:
+            meta = item.get("metadata") or {}
+            url = wanted.get(canonicalize_url(meta.get("sourceURL") or meta.get("url") or ""))
+            if url is not None and item.get("markdown"):
+                pages[url] = item["markdown"]
+        return pages, credits
+
+    def summary(self) -> str:
+        parts = []
+        for name, u in self.usage.items():
+            if u.calls or u.cache_hits or u.failures:
+                credits = f", {u.credits:g} credits" if u.credits else ""
+                parts.append(f"{name} {u.calls} calls for {u.pages} pages, {u.cache_hits} cached, {u.failures} failed{credits}")
+        return "; ".join(parts)
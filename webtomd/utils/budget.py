@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+
+# How many elements are processed between deadline checks
+CHECK_EVERY = 2048
+
+
+@dataclass(frozen=True)
+class ResourceBudget:
+    """Per-page limits; ``None`` means unlimited."""
+
+    max_nodes: Optional[int] = None  # elements kept in the content tree
+    max_text_bytes: Optional[int] = None  # UTF-8 text kept in the content tree
+    max_table_rows: Optional[int] = None  # rows per table
+    max_table_cells: Optional[int] = None  # cells per table
+    deadline: Optional[float] = None  # wall-clock seconds for the whole page
+
+    def start(self, started: Optional[float] = None, truncations: Optional[List[Dict[str, Any]]] = None) -> "BudgetMeter":
+        return BudgetMeter(self, time.perf_counter() if started is None else started, truncations)
+
+
+class BudgetMeter:
+    """Tracks one page against a ``ResourceBudget`` and records what was cut."""
+
+    def __init__(self, budget: ResourceBudget, started: float, truncations: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.budget = budget
+        self.deadline_at = started + budget.deadline if budget.deadline is not None else None
+        self.truncations: List[Dict[str, Any]] = [] if truncations is None else truncations
+        self._expired = False
+
+    def expired(self) -> bool:
+        if self.deadline_at is None:
+            return False
+        if not self._expired and time.perf_counter() >= self.deadline_at:
+            self._expired = True
+        return self._expired
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (negative once it has passed), or None without one."""
+        return self.deadline_at - time.perf_counter() if self.deadline_at is not None else None
+
+    def truncate(self, limit: str, stage: str, **detail: Any) -> None:
+        entry: Dict[str, Any] = {"limit": limit, "stage": stage}
+        entry.update(detail)
+        self.truncations.append(entry)
+
+    @property
+    def truncated(self) -> bool:
+        return bool(self.truncations)
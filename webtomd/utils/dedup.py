@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 4
+# Hamming distance at which two 64-bit SimHashes are treated as the same page
+MAX_DISTANCE = 3
+# Documents shorter than this (in words) are only deduplicated exactly
+MIN_TOKENS = 40
+
+_word_re = re.compile(r"\w+")
+
+
+def tokens(text: str) -> List[str]:
+    return _word_re.findall(text.lower())
+
+
+def content_hash(words: List[str]) -> str:
+    """Hash of the normalized text: case, whitespace and punctuation are ignored."""
+    return hashlib.blake2b(" ".join(words).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _popcount(x: int) -> int:
+    return bin(x).count("1")
+
+
+def simhash(words: List[str], shingle_size: int = SHINGLE_SIZE) -> int:
+    """64-bit SimHash over word shingles.
+
+    Each distinct shingle is hashed to 8 bytes. Bit votes are tallied per byte
+    position with ``Counter`` (eight passes instead of 64), then expanded to
+    bits over at most 256 distinct values per position.
+    """
+    if len(words) < shingle_size:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i : i + shingle_size]) for i in range(len(words) - shingle_size + 1)}
+    digests = [hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in shingles]
+    half = len(digests) / 2.0
+    fp = 0
+    for pos in range(8):
+        counts = Counter(d[pos] for d in digests)
+        ones = [0] * 8
+        for value, n in counts.items():
+            for bit in range(8):
+                if value >> bit & 1:
+                    ones[bit] += n
+        for bit in range(8):
+            if ones[bit] > half:
+                fp |= 1 << (pos * 8 + bit)
+    return fp
+
+
+class SimHashIndex:
+    """LSH index answering "is there a fingerprint within ``max_distance`` bits?".
+
+    The fingerprint is split into ``max_distance + 1`` bands; by pigeonhole any
+    match within the distance agrees exactly on at least one band, so a lookup
+    only compares against the few fingerprints sharing a band value.
+    """
+
+    def __init__(self, max_distance: int = MAX_DISTANCE, bits: int = FINGERPRINT_BITS) -> None:
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self._width = -(-bits // self.bands)
+        self._mask = (1 << self._width) - 1
+        self._fingerprints: List[int] = []
+        self._keys: List[str] = []
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(self.bands)]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _band_values(self, fp: int) -> List[int]:
+        return [(fp >> (i * self._width)) & self._mask for i in range(self.bands)]
+
+    def add(self, fp: int, key: str) -> None:
+        idx = len(self._keys)
+        self._fingerprints.append(fp)
+        self._keys.append(key)
+        for band, value in zip(self._buckets, self._band_values(fp)):
+            band.setdefault(value, []).append(idx)
+
+    def query(self, fp: int) -> Optional[Tuple[str, int]]:
+        best: Optional[Tuple[str, int]] = None
+        for band, value in zip(self._buckets, self._band_values(fp)):
+            for idx in band.get(value, ()):
+                dist = _popcount(fp ^ self._fingerprints[idx])
+                if dist <= self.max_distance and (best is None or dist < best[1]):
+                    best = (self._keys[idx], dist)
+        return best
+
+
+@dataclass
+class DedupMatch:
+    kind: str  # "exact" | "near"
+    canonical: str
+    distance: int = 0
+
+
+class Deduplicator:
+    """Remembers converted documents and reports exact and near duplicates.
+
+    ``check`` is atomic: the first document with given content becomes the
+    canonical one, and later ones get a ``DedupMatch`` pointing at it.
+    """
+
+    def __init__(self, max_distance: int = MAX_DISTANCE, shingle_size: int = SHINGLE_SIZE, min_tokens: int = MIN_TOKENS) -> None:
+        self.shingle_size = shingle_size
+        self.min_tokens = min_tokens
+        self._exact: Dict[str, str] = {}
+        self._index = SimHashIndex(max_distance=max_distance) if max_distance >= 0 else None
+        self._lock = threading.Lock()
+
+    def check(self, key: str, text: str) -> Optional[DedupMatch]:
+        words = tokens(text)
+        digest = content_hash(words)
+        near = self._index is not None and len(words) >= self.min_tokens
+        fp = simhash(words, self.shingle_size) if near else 0
+        with self._lock:
+            canonical = self._exact.get(digest)
+            if canonical is not None:
+                return DedupMatch("exact", canonical)
+            if near:
+                assert self._index is not None
+                hit = self._index.query(fp)
+                if hit is not None:
+                    return DedupMatch("near", hit[0], hit[1])
+                self._index.add(fp, key)
+            self._exact[digest] = key
+        return None
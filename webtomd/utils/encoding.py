@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import codecs
+import re
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional, Tuple
+
+
+# Bytes scanned for <meta charset>; the HTML standard uses 1024, real pages
+# often put long <script>/<link> runs first
+PRESCAN_BYTES = 4096
+# Bytes checked for UTF-8 validity and double-encoding
+SAMPLE_BYTES = 65536
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+_header_charset_re = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.I)
+_meta_charset_re = re.compile(rb"<meta\b[^>]*?\bcharset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+_comment_re = re.compile(rb"<!--.*?-->", re.S)
+# UTF-8 text that was decoded as cp1252/latin-1 and encoded as UTF-8 again:
+# "Ã©" (é), "Ã¼" (ü), "â€™" (’) ...
+_double_utf8_re = re.compile(rb"\xc3[\x82\x83][\xc2\xc3\xc5\xcb\xe2][\x80-\xbf]|\xc3\xa2\xe2\x82\xac")
+
+# Labels browsers treat as windows-1252 (WHATWG Encoding Standard)
+_CP1252_ALIASES = {"ascii", "iso8859-1", "latin-1", "latin1", "us-ascii"}
+_single_byte_re = re.compile(r"cp125\d|iso8859-\d+|koi8-[ru]|mac-roman")
+
+
+@dataclass
+class Decoding:
+    """How a response body's bytes are to be read."""
+
+    encoding: str
+    source: str  # bom, header, meta, sniffed or default
+    declared: Optional[str] = None  # the header/meta label when it was overridden
+    mojibake: Optional[str] = None  # what looked wrong, if anything
+
+    def to_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+def normalize_encoding(label: Optional[str]) -> Optional[str]:
+    """Python codec name for an encoding label, or None when unknown."""
+    if not label:
+        return None
+    try:
+        name = codecs.lookup(label.strip().lower()).name
+    except LookupError:
+        return None
+    if name in _CP1252_ALIASES:
+        return "cp1252"
+    return name
+
+
+def _bom(content: bytes) -> Optional[str]:
+    for bom, name in _BOMS:
+        if content.startswith(bom):
+            return name
+    return None
+
+
+def header_charset(content_type: Optional[str]) -> Optional[str]:
+    m = _header_charset_re.search(content_type or "")
+    return m.group(1) if m else None
+
+
+def meta_charset(content: bytes, limit: int = PRESCAN_BYTES) -> Optional[str]:
+    """``<meta charset>`` or ``<meta http-equiv content="...; charset=">`` in the first ``limit`` bytes."""
+    head = _comment_re.sub(b"", content[:limit])
+    m = _meta_charset_re.search(head)
+    return m.group(1).decode("ascii") if m else None
+
+
+def _utf8_state(sample: bytes) -> Tuple[bool, bool]:
+    """(valid UTF-8, has non-ASCII) for a prefix that may end mid-character."""
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return False, True
+    return True, not sample.isascii()
+
+
+def sniff_encoding(content: bytes, content_type: Optional[str] = None) -> Decoding:
+    """Pick the encoding for an HTML body: BOM, then Content-Type, then ``<meta charset>``.
+
+    Without a declaration the body is UTF-8 if it decodes as such, otherwise
+    windows-1252. A single-byte declaration on a body that is valid
+    multi-byte UTF-8 is the usual server misconfiguration, so UTF-8 wins and
+    the mismatch is reported. Only a bounded prefix of the body is examined.
+    """
+    bom = _bom(content)
+    if bom is not None:
+        return Decoding(bom, "bom")
+    sample = content[:SAMPLE_BYTES]
+    valid_utf8, non_ascii = _utf8_state(sample)
+
+    decoding: Optional[Decoding] = None
+    for source, label in (("header", header_charset(content_type)), ("meta", meta_charset(content))):
+        name = normalize_encoding(label)
+        if name is None:
+            continue
+        if source == "meta" and name.startswith("utf-16"):
+            # A UTF-16 page can't declare itself in ASCII; the standard says UTF-8
+            name = "utf-8"
+        decoding = Decoding(name, source)
+        break
+    if decoding is None:
+        decoding = Decoding("utf-8" if valid_utf8 else "cp1252", "default")
+
+    if _single_byte_re.fullmatch(decoding.encoding) and valid_utf8 and non_ascii:
+        decoding = Decoding("utf-8", "sniffed", declared=decoding.encoding, mojibake=f"declared {decoding.encoding}, body is utf-8")
+    elif decoding.encoding == "utf-8" and not valid_utf8:
+        decoding.mojibake = "invalid utf-8"
+    elif decoding.encoding == "utf-8" and _double_utf8_re.search(sample):
+        decoding.mojibake = "double-encoded utf-8"
+    return decoding
+
+
+def lxml_encoding(name: str) -> str:
+    # libxml2 goes through iconv, which spells euc_jp as euc-jp
+    return name.replace("_", "-")
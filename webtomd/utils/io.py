@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
 
 @dataclass
@@ -21,3 +22,62 @@ def write_text_file(path: Path, content: str, encoding: str = "utf-8") -> WriteR
     path.write_bytes(data)
     return WriteResult(path=path, bytes_written=len(data))
 
+
+def link_duplicate(path: Path, target: Path) -> bool:
+    """Point ``path`` at an existing output with a relative symlink.
+
+    Returns False when the platform refuses symlinks; callers then rely on the
+    run report to record the mapping.
+    """
+    ensure_parent(path)
+    try:
+        if path.is_symlink() or path.exists():
+            path.unlink()
+        os.symlink(os.path.relpath(target, path.parent), path)
+    except OSError:
+        return False
+    return True
+
+
+def write_text_chunks(path: Path, chunks: Iterable[str], encoding: str = "utf-8", buffer_size: int = 1 << 16) -> WriteResult:
+    """Encode and write text chunks as they are produced.
+
+    Chunks are coalesced up to ``buffer_size`` characters before each write, so
+    memory stays bounded by the buffer rather than by the document.
+    """
+    ensure_parent(path)
+    total = 0
+    pending = []
+    pending_len = 0
+    with path.open("wb") as fh:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            pending.append(chunk)
+            pending_len += len(chunk)
+            if pending_len >= buffer_size:
+                data = "".join(pending).encode(encoding)
+                fh.write(data)
+                total += len(data)
+                pending = []
+                pending_len = 0
+        if pending:
+            data = "".join(pending).encode(encoding)
+            fh.write(data)
+            total += len(data)
+    return WriteResult(path=path, bytes_written=total)
+
+
+def iter_lines(text: str) -> Iterator[str]:
+    """Yield lines of ``text`` without building a list of all lines."""
+    start = 0
+    n = len(text)
+    while start < n:
+        end = text.find("\n", start)
+        if end < 0:
+            end = n
+        line = text[start:end]
+        if line.endswith("\r"):
+            line = line[:-1]
+        yield line
+        start = end + 1
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from lxml import html
+
+
+ARTICLE_TYPES = {"Article", "NewsArticle", "BlogPosting", "TechArticle", "Report", "ScholarlyArticle", "WebPage"}
+
+TITLE_KEYS = ("headline", "title", "name")
+AUTHOR_KEYS = ("author", "authors", "byline")
+PUBLISHED_KEYS = ("datePublished", "publishedAt", "published_at", "publishDate", "date", "createdAt")
+MODIFIED_KEYS = ("dateModified", "updatedAt", "updated_at", "modifiedAt")
+
+# A "description" this long is the article body, not a summary
+MAX_DESCRIPTION_CHARS = 200
+
+
+def parse_json_ld(doc: html.HtmlElement) -> List[Any]:
+    """Every ``application/ld+json`` block of the page, parsed; invalid blocks are skipped.
+
+    Parse once and pass the result to both ``extract_metadata`` and
+    ``extract_hydrated_content``.
+    """
+    blocks = []
+    for el in doc.iter("script"):
+        if (el.get("type") or "").lower() != "application/ld+json":
+            continue
+        try:
+            blocks.append(json.loads(el.text or ""))
+        except ValueError:
+            continue
+    return blocks
+
+
+def walk(data: Any) -> Iterator[Tuple[Optional[dict], Optional[str], Any]]:
+    # Iterative walk yielding (parent dict, key, value) for every node
+    stack: List[Tuple[Optional[dict], Optional[str], Any]] = [(None, None, data)]
+    while stack:
+        parent, key, value = stack.pop()
+        yield parent, key, value
+        if isinstance(value, dict):
+            stack.extend((value, k, v) for k, v in value.items())
+        elif isinstance(value, list):
+            stack.extend((parent, key, v) for v in value)
+
+
+def as_text(value: Any) -> Optional[str]:
+    if isinstance(value, str):
+        return value.strip() or None
+    if isinstance(value, dict):
+        return as_text(value.get("name") or value.get("@value"))
+    if isinstance(value, list):
+        names = [n for n in (as_text(v) for v in value) if n]
+        return ", ".join(names) or None
+    return None
+
+
+def first_text(obj: dict, keys: Tuple[str, ...]) -> Optional[str]:
+    for k in keys:
+        if k in obj:
+            text = as_text(obj[k])
+            if text:
+                return text
+    return None
+
+
+def is_article(obj: Any) -> bool:
+    if not isinstance(obj, dict):
+        return False
+    types = obj.get("@type")
+    if isinstance(types, str):
+        return types in ARTICLE_TYPES
+    return isinstance(types, list) and any(isinstance(t, str) and t in ARTICLE_TYPES for t in types)
+
+
+def iter_json_ld_articles(data: Any) -> Iterator[dict]:
+    for _, _, value in walk(data):
+        if is_article(value):
+            yield value
+
+
+def article_metadata(obj: dict) -> Dict[str, str]:
+    """Author, dates, description and publisher of a schema.org-like object."""
+    meta: Dict[str, str] = {}
+    for name, keys in (
+        ("author", AUTHOR_KEYS),
+        ("date_published", PUBLISHED_KEYS),
+        ("date_modified", MODIFIED_KEYS),
+        ("description", ("description", "excerpt", "summary")),
+    ):
+        value = first_text(obj, keys)
+        if value and not (name == "description" and len(value) >= MAX_DESCRIPTION_CHARS):
+            meta[name] = value
+    publisher = obj.get("publisher")
+    if isinstance(publisher, dict) and as_text(publisher):
+        meta["site_name"] = as_text(publisher) or ""
+    return meta
@@ -3,16 +3,23 @@ from __future__ import annotations
 import logging
 from typing import Optional
 
-from rich.console import Console
-from rich.logging import RichHandler
 
-
-def setup_logger(level: str = "INFO") -> logging.Logger:
+def setup_logger(level: str = "INFO", plain: bool = False) -> logging.Logger:
+    """Configure the ``webtomd`` logger; ``plain`` skips Rich (and its import)."""
     level_name = level.upper()
     numeric_level = getattr(logging, level_name, logging.INFO)
-    console = Console(stderr=True, highlight=False)
-    handler = RichHandler(console=console, show_time=False, show_path=False, rich_tracebacks=True)
-    fmt = "%(message)s"
+    handler: logging.Handler
+    if plain:
+        handler = logging.StreamHandler()
+        fmt = "%(levelname)s %(message)s"
+        handler.setFormatter(logging.Formatter(fmt))
+    else:
+        from rich.console import Console
+        from rich.logging import RichHandler
+
+        console = Console(stderr=True, highlight=False)
+        handler = RichHandler(console=console, show_time=False, show_path=False, rich_tracebacks=True)
+        fmt = "%(message)s"
     logging.basicConfig(level=numeric_level, format=fmt, handlers=[handler])
     logger = logging.getLogger("webtomd")
     logger.setLevel(numeric_level)
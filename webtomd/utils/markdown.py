@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import re
+from typing import Callable
+
+
+_FENCE_RE = re.compile(r"^(```|~~~).*?^\1[^\n]*$", re.M | re.S)
+
+
+def outside_fences(text: str, fn: Callable[[str], str]) -> str:
+    """Apply ``fn`` to the parts of Markdown ``text`` outside fenced code blocks."""
+    out, pos = [], 0
+    for m in _FENCE_RE.finditer(text):
+        out.append(fn(text[pos : m.start()]))
+        out.append(m.group(0))
+        pos = m.end()
+    out.append(fn(text[pos:]))
+    return "".join(out)
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, asdict
-from datetime import datetime
-from typing import Dict, Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
 
 from lxml import html
 
+from .json_ld import article_metadata, iter_json_ld_articles, parse_json_ld
+
 
 @dataclass
 class PageMetadata:
@@ -22,40 +24,72 @@ class PageMetadata:
     def to_dict(self) -> Dict[str, str]:
         return {k: v for k, v in asdict(self).items() if v}
 
+    def fill_missing(self, values: Dict[str, str]) -> "PageMetadata":
+        """Set fields that are still empty from ``values`` (unknown keys are ignored)."""
+        for k, v in values.items():
+            if v and hasattr(self, k) and not getattr(self, k):
+                setattr(self, k, v)
+        return self
+
+
+def collect_meta_tags(doc: html.HtmlElement, json_ld: Optional[List[Any]] = None) -> Dict[str, str]:
+    """Collect title, h1, meta/og/itemprop tags and JSON-LD fields in one pass.
+
+    Keys are ``title``, ``h1``, ``name:<name>``, ``property:<property>``,
+    ``itemprop:<itemprop>`` and ``ld:<field>``; the first occurrence wins. Must
+    run on the parsed document before the cleaner drops ``<head>``.
+    ``json_ld`` is the page's parsed JSON-LD, read from ``doc`` when not given.
+    """
+    found: Dict[str, str] = {}
+    for el in doc.iter("title", "meta", "h1"):
+        tag = el.tag
+        if tag == "meta":
+            content = el.get("content")
+            if not content or not content.strip():
+                continue
+            for attr in ("name", "property", "itemprop"):
+                key = el.get(attr)
+                if key:
+                    found.setdefault(f"{attr}:{key.strip().lower()}", content.strip())
+        elif tag == "title":
+            if el.text and el.text.strip():
+                found.setdefault("title", el.text.strip())
+        elif "h1" not in found:
+            text = " ".join(el.text_content().split())
+            if text:
+                found["h1"] = text
+    for data in parse_json_ld(doc) if json_ld is None else json_ld:
+        for article in iter_json_ld_articles(data):
+            headline = article.get("headline") or article.get("name")
+            if isinstance(headline, str) and headline.strip():
+                found.setdefault("ld:title", headline.strip())
+            for k, v in article_metadata(article).items():
+                found.setdefault(f"ld:{k}", v)
+            break
+    return found
 
-def extract_metadata(doc: html.HtmlElement, url: Optional[str]) -> PageMetadata:
-    def get_meta(name: str) -> Optional[str]:
-        node = doc.xpath(f"//meta[@name='{name}']/@content")
-        return node[0].strip() if node else None
-
-    def get_og(name: str) -> Optional[str]:
-        node = doc.xpath(f"//meta[@property='og:{name}']/@content")
-        return node[0].strip() if node else None
-
-    def get_itemprop(name: str) -> Optional[str]:
-        node = doc.xpath(f"//meta[@itemprop='{name}']/@content")
-        return node[0].strip() if node else None
-
-    title_nodes = doc.xpath("//title/text()")
-    h1_nodes = doc.xpath("//h1[normalize-space(string())!='']")
-    title = None
-    if h1_nodes:
-        title = h1_nodes[0].text_content().strip()
-    if not title and title_nodes:
-        title = title_nodes[0].strip()
-    if not title:
-        title = get_og("title") or get_meta("title")
-
-    meta = PageMetadata(
-        title=title,
-        description=get_og("description") or get_meta("description"),
-        author=get_meta("author") or get_itemprop("author"),
-        date_published=get_meta("article:published_time") or get_itemprop("datePublished"),
-        date_modified=get_meta("article:modified_time") or get_itemprop("dateModified"),
-        site_name=get_og("site_name"),
-        url=url or get_og("url"),
-        retrieved_at=datetime.utcnow().isoformat(timespec="seconds") + "Z",
+
+def extract_metadata(doc: html.HtmlElement, url: Optional[str], json_ld: Optional[List[Any]] = None) -> PageMetadata:
+    found = collect_meta_tags(doc, json_ld)
+
+    def first(*keys: str) -> Optional[str]:
+        for k in keys:
+            if found.get(k):
+                return found[k]
+        return None
+
+    return PageMetadata(
+        title=first("h1", "title", "property:og:title", "name:title", "ld:title"),
+        description=first("property:og:description", "name:description", "ld:description"),
+        author=first("name:author", "itemprop:author", "property:article:author", "ld:author"),
+        date_published=first(
+            "property:article:published_time", "name:article:published_time", "itemprop:datepublished", "ld:date_published"
+        ),
+        date_modified=first(
+            "property:article:modified_time", "name:article:modified_time", "itemprop:datemodified", "ld:date_modified"
+        ),
+        site_name=first("property:og:site_name", "ld:site_name"),
+        url=url or first("property:og:url"),
+        retrieved_at=datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
         generator="webtomd",
     )
-    return meta
-
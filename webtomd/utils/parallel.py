@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+
+# Partitions per worker: more than one evens out uneven blocks
+PARTS_PER_WORKER = 4
+
+
+@dataclass(frozen=True)
+class ParallelOptions:
+    """When a single page is converted and wrapped in worker processes."""
+
+    threshold: int  # characters of stage input (cleaned HTML, Markdown) from which a stage runs in parallel
+    workers: Optional[int] = None  # None = CPU count
+
+    def worker_count(self) -> int:
+        return self.workers or os.cpu_count() or 1
+
+    def applies(self, size: int) -> bool:
+        return size >= self.threshold and self.worker_count() > 1
+
+
+_pools: Dict[int, "ProcessPoolExecutor"] = {}
+_pools_lock = threading.Lock()
+
+
+def process_pool(workers: int) -> "ProcessPoolExecutor":
+    """A process pool shared by every page (and batch thread) of the run.
+
+    Workers are spawned rather than forked: batches run pages on threads,
+    and forking a threaded process can copy held locks into the child.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            if not _pools:
+                atexit.register(shutdown_pools)
+            pool = _pools[workers] = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        return pool
+
+
+def shutdown_pools() -> None:
+    # Before interpreter teardown, which otherwise collects the pools half-way
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(cancel_futures=True)
+
+
+def partition(sizes: Sequence[int], parts: int) -> List[Tuple[int, int]]:
+    """Split ``len(sizes)`` items into at most ``parts`` contiguous ``(start, end)`` ranges of similar total size."""
+    total = sum(sizes)
+    ranges: List[Tuple[int, int]] = []
+    start, acc = 0, 0
+    for i, size in enumerate(sizes):
+        acc += size
+        # Cut once this range reaches its share of what has been seen so far
+        if acc * parts >= total * (len(ranges) + 1) and len(ranges) < parts - 1:
+            ranges.append((start, i + 1))
+            start = i + 1
+    if start < len(sizes):
+        ranges.append((start, len(sizes)))
+    return ranges
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Modules whose hot functions are listed separately in the summary
+FOCUS_MODULES: Tuple[Tuple[str, str], ...] = (
+    ("html_cleaner", "normalize/html_cleaner.py"),
+    ("html_to_markdown", "convert/html_to_markdown.py"),
+    ("tables", "convert/tables.py"),
+    ("wrap", "convert/wrap.py"),
+    ("heuristics", "evaluate/heuristics.py"),
+)
+
+
+class PageProfiler:
+    """cProfile plus per-stage wall time and tracemalloc peaks for one page.
+
+    Only one profiler can be active per interpreter (and tracemalloc is
+    process-wide), so profiled pages must run one at a time.
+    """
+
+    def __init__(self) -> None:
+        self.profile = cProfile.Profile()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.started = False
+        self._owns_tracemalloc = False
+
+    def start(self) -> None:
+        self.started = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self.profile.enable()
+
+    def stop(self) -> None:
+        self.profile.disable()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "peak_bytes": 0})
+            entry["calls"] += 1
+            entry["seconds"] += time.perf_counter() - t0
+            if tracing:
+                peak = tracemalloc.get_traced_memory()[1] - base
+                entry["peak_bytes"] = max(entry["peak_bytes"], peak)
+
+
+def merge_stages(profilers: Sequence[PageProfiler]) -> Dict[str, Dict[str, float]]:
+    merged: Dict[str, Dict[str, float]] = {}
+    for prof in profilers:
+        for name, entry in prof.stages.items():
+            m = merged.setdefault(name, {"calls": 0, "seconds": 0.0, "peak_bytes": 0})
+            m["calls"] += entry["calls"]
+            m["seconds"] += entry["seconds"]
+            m["peak_bytes"] = max(m["peak_bytes"], entry["peak_bytes"])
+    return merged
+
+
+def _top_functions(stats: pstats.Stats, suffix: Optional[str], top: int) -> List[str]:
+    rows = []
+    for (filename, lineno, func), (_, ncalls, tottime, cumtime, _) in stats.stats.items():  # type: ignore[attr-defined]
+        if suffix is not None and not filename.replace("\\", "/").endswith(suffix):
+            continue
+        rows.append((cumtime, tottime, ncalls, f"{Path(filename).name}:{lineno}({func})"))
+    rows.sort(reverse=True)
+    return [f"  {cum * 1000:10.1f} {tot * 1000:10.1f} {n:9d}  {where}" for cum, tot, n, where in rows[:top]]
+
+
+def format_summary(stats: pstats.Stats, stages: Dict[str, Dict[str, float]], top: int = 15) -> str:
+    """Stage table followed by the top functions by cumulative time."""
+    out = io.StringIO()
+    out.write("stage            calls    wall ms   peak MiB\n")
+    for name, entry in stages.items():
+        out.write(
+            f"{name:<15} {int(entry['calls']):6d} {entry['seconds'] * 1000:10.1f} {entry['peak_bytes'] / (1 << 20):10.2f}\n"
+        )
+    header = "     cum ms     own ms     calls  function\n"
+    out.write(f"\ntop {top} functions overall\n{header}")
+    out.write("\n".join(_top_functions(stats, None, top)) + "\n")
+    for label, suffix in FOCUS_MODULES:
+        lines = _top_functions(stats, suffix, top)
+        if lines:
+            out.write(f"\n{label}\n{header}")
+            out.write("\n".join(lines) + "\n")
+    return out.getvalue()
+
+
+def write_profile(
+    directory: Path, name: str, profilers: Sequence[PageProfiler], top: int = 15
+) -> Tuple[Path, Path]:
+    """Write ``<name>.pstats`` and a ``<name>.profile.txt`` summary; profiles are merged."""
+    profilers = [p for p in profilers if p.started]
+    if not profilers:
+        raise ValueError("no profiles were recorded")
+    directory.mkdir(parents=True, exist_ok=True)
+    stats = pstats.Stats(profilers[0].profile)
+    for prof in profilers[1:]:
+        stats.add(prof.profile)
+    pstats_path = directory / f"{name}.pstats"
+    summary_path = directory / f"{name}.profile.txt"
+    stats.dump_stats(str(pstats_path))
+    summary_path.write_text(format_summary(stats, merge_stages(profilers), top), encoding="utf-8")
+    return pstats_path, summary_path
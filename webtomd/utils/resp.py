@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import socket
+import threading
+from typing import Any, List, Optional, Sequence, Union
+from urllib.parse import unquote, urlparse
+
+
+class RespError(Exception):
+    """Error reply from the server (``-ERR ...``)."""
+
+
+Arg = Union[str, bytes, int, float]
+
+
+def _encode(args: Sequence[Arg]) -> bytes:
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        elif isinstance(arg, float):
+            data = repr(arg).encode()
+        else:
+            data = str(arg).encode("utf-8")
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+class RespClient:
+    """Minimal Redis (RESP2) client: one socket, blocking, with pipelining.
+
+    Replies come back as ``str`` (bulk strings decoded as UTF-8), ``int``,
+    ``None`` or lists. Enough for the job queue; not a general Redis client.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        username: Optional[str] = None,
+        timeout: float = 30.0,
+    ) -> None:
+        self.host, self.port, self.db = host, port, db
+        self.username, self.password = username, password
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._buf = b""
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_url(cls, url: str, timeout: float = 30.0) -> "RespClient":
+        """``redis://[[user]:password@]host[:port][/db]``"""
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"not a redis:// URL: {url}")
+        db = int(parsed.path.strip("/") or 0)
+        return cls(
+            parsed.hostname or "localhost",
+            parsed.port or 6379,
+            db,
+            unquote(parsed.password) if parsed.password else None,
+            unquote(parsed.username) if parsed.username else None,
+            timeout,
+        )
+
+    def _connect(self) -> socket.socket:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock, self._buf = sock, b""
+        if self.password is not None:
+            auth = ["AUTH", self.username, self.password] if self.username else ["AUTH", self.password]
+            self._roundtrip([auth])
+        if self.db:
+            self._roundtrip([["SELECT", self.db]])
+        return sock
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def _readline(self) -> bytes:
+        while b"\r\n" not in self._buf:
+            self._fill()
+        line, self._buf = self._buf.split(b"\r\n", 1)
+        return line
+
+    def _fill(self) -> None:
+        assert self._sock is not None
+        data = self._sock.recv(65536)
+        if not data:
+            raise ConnectionError("connection closed by server")
+        self._buf += data
+
+    def _read(self) -> Any:
+        line = self._readline()
+        kind, rest = line[:1], line[1:]
+        if kind == b"+":
+            return rest.decode("utf-8")
+        if kind == b"-":
+            return RespError(rest.decode("utf-8"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            n = int(rest)
+            if n < 0:
+                return None
+            while len(self._buf) < n + 2:
+                self._fill()
+            data, self._buf = self._buf[:n], self._buf[n + 2 :]
+            return data.decode("utf-8")
+        if kind == b"*":
+            n = int(rest)
+            return None if n < 0 else [self._read() for _ in range(n)]
+        raise ConnectionError(f"bad reply: {line[:40]!r}")
+
+    def _roundtrip(self, commands: Sequence[Sequence[Arg]]) -> List[Any]:
+        assert self._sock is not None
+        self._sock.sendall(b"".join(_encode(c) for c in commands))
+        return [self._read() for _ in commands]
+
+    def pipeline(self, commands: Sequence[Sequence[Arg]]) -> List[Any]:
+        """Send all commands, then read all replies; error replies raise after the batch is read."""
+        if not commands:
+            return []
+        with self._lock:
+            if self._sock is None:
+                self._connect()
+            try:
+                replies = self._roundtrip(commands)
+            except (OSError, ConnectionError):
+                self.close()
+                raise
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    def execute(self, *args: Arg) -> Any:
+        return self.pipeline([args])[0]
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class Call:
+    """One in-flight (or finished) computation shared by every key aliased to it."""
+
+    __slots__ = ("key", "done", "result", "error")
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+    def wait(self) -> Any:
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """Coalesce concurrent work by key.
+
+    The first caller of ``do`` for a key runs the function; callers arriving
+    while it runs block and receive the same result (or exception). With
+    ``remember=True`` successful calls are kept, so later callers in the same
+    batch reuse the result too; failed calls are always forgotten so the work
+    can be retried.
+    """
+
+    def __init__(self, remember: bool = False) -> None:
+        self.remember = remember
+        self._calls: Dict[str, Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return ``(result, shared)``; ``shared`` is True when another caller did the work."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = Call(key)
+                leader = True
+            else:
+                leader = False
+        if not leader:
+            return call.wait(), True
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            call.done.set()
+            if not self.remember or call.error is not None:
+                self._forget(call)
+        return call.result, False
+
+    def alias(self, key: str, owner: str) -> Optional[Call]:
+        """Attach ``key`` to the call running under ``owner``.
+
+        Used when work discovers another name for itself (a redirect target).
+        Returns the existing call if ``key`` is already taken, in which case the
+        caller should abandon its own work and wait on that call instead.
+        """
+        with self._lock:
+            existing = self._calls.get(key)
+            if existing is not None:
+                return existing if existing is not self._calls.get(owner) else None
+            call = self._calls.get(owner)
+            if call is not None:
+                self._calls[key] = call
+            return None
+
+    def _forget(self, call: Call) -> None:
+        with self._lock:
+            for key in [k for k, c in self._calls.items() if c is call]:
+                del self._calls[key]
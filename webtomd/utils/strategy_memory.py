@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+
+# Default fallback order (cheapest first) and relative cost units per attempt;
+# remote providers are rate-limited or paid, so they rank above the browser
+DEFAULT_ORDER = ("http", "browser", "jina", "firecrawl")
+STRATEGY_COSTS: Dict[str, float] = {"http": 1.0, "browser": 5.0, "jina": 10.0, "firecrawl": 20.0}
+
+
+@dataclass
+class StrategyStats:
+    successes: int = 0
+    failures: int = 0
+    total_latency: float = 0.0
+    total_cost: float = 0.0
+
+    @property
+    def attempts(self) -> int:
+        return self.successes + self.failures
+
+    def success_rate(self) -> float:
+        # Laplace smoothing so a single outcome does not dominate
+        return (self.successes + 1) / (self.attempts + 2)
+
+    def expected_cost(self, strategy: str) -> float:
+        """Expected cost per successful page: (cost units + mean seconds) / p(success)."""
+        if self.attempts:
+            per_attempt = (self.total_cost + self.total_latency) / self.attempts
+        else:
+            per_attempt = STRATEGY_COSTS.get(strategy, 1.0)
+        return per_attempt / self.success_rate()
+
+
+@dataclass
+class DomainRecord:
+    runs: int = 0
+    strategies: Optional[Dict[str, StrategyStats]] = None
+
+    def stats(self, strategy: str) -> StrategyStats:
+        if self.strategies is None:
+            self.strategies = {}
+        return self.strategies.setdefault(strategy, StrategyStats())
+
+
+def domain_of(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+class StrategyMemory:
+    """Per-domain record of which fetch strategy succeeded, how fast and at what cost.
+
+    ``order`` puts the historically cheapest successful strategy first. Every
+    ``explore_every``-th run for a domain uses the default order instead, so a
+    cheaper path that starts working again is noticed.
+    """
+
+    def __init__(self, path: Optional[Path] = None, explore_every: int = 20) -> None:
+        self.path = path
+        self.explore_every = max(1, explore_every)
+        self._domains: Dict[str, DomainRecord] = {}
+        self._lock = threading.Lock()
+        if path is not None and path.exists():
+            self.load()
+
+    def order(self, url: str, candidates: Sequence[str] = DEFAULT_ORDER) -> List[str]:
+        domain = domain_of(url)
+        with self._lock:
+            rec = self._domains.setdefault(domain, DomainRecord())
+            rec.runs += 1
+            if not rec.strategies or rec.runs % self.explore_every == 0:
+                return list(candidates)
+            known = rec.strategies
+            ranked = sorted(
+                candidates,
+                key=lambda s: ((known.get(s) or StrategyStats()).expected_cost(s), candidates.index(s)),
+            )
+        return ranked
+
+    def record(self, url: str, strategy: str, success: bool, latency: float, cost: Optional[float] = None) -> None:
+        with self._lock:
+            rec = self._domains.setdefault(domain_of(url), DomainRecord())
+            st = rec.stats(strategy)
+            if success:
+                st.successes += 1
+            else:
+                st.failures += 1
+            st.total_latency += latency
+            st.total_cost += STRATEGY_COSTS.get(strategy, 1.0) if cost is None else cost
+
+    def stats(self, url: str) -> Dict[str, StrategyStats]:
+        rec = self._domains.get(domain_of(url))
+        return dict(rec.strategies or {}) if rec else {}
+
+    def load(self) -> None:
+        assert self.path is not None
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            for domain, raw in (data.get("domains") or {}).items():
+                rec = DomainRecord(runs=int(raw.get("runs", 0)))
+                rec.strategies = {
+                    name: StrategyStats(**{k: v for k, v in st.items() if k in StrategyStats.__dataclass_fields__})
+                    for name, st in (raw.get("strategies") or {}).items()
+                }
+                self._domains[domain] = rec
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            data = {
+                "version": 1,
+                "domains": {
+                    d: {"runs": r.runs, "strategies": {k: asdict(v) for k, v in (r.strategies or {}).items()}}
+                    for d, r in self._domains.items()
+                },
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps(data, indent=1, sort_keys=True), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+
+_open: Dict[Path, StrategyMemory] = {}
+_open_lock = threading.Lock()
+
+
+def open_strategy_memory(path: Path, explore_every: int = 20) -> StrategyMemory:
+    """Return the shared in-process memory for ``path``, loading it on first use."""
+    key = Path(path).resolve()
+    with _open_lock:
+        mem = _open.get(key)
+        if mem is None:
+            mem = StrategyMemory(key, explore_every=explore_every)
+            _open[key] = mem
+        return mem
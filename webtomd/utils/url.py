@@ -1,18 +1,143 @@
 from __future__ import annotations
 
 import re
-from urllib.parse import urlparse, urlunparse
+from dataclasses import dataclass
+from typing import FrozenSet, List, Optional
+from urllib.parse import unquote_plus, urlparse, urlunparse
 
 
 _slug_re = re.compile(r"[^a-z0-9]+")
+_pct_re = re.compile(r"%([0-9A-Fa-f]{2})")
+_UNRESERVED = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~")
 
+# Query parameters that only track the visitor and never change the content
+TRACKING_PARAMS = frozenset(
+    {
+        "fbclid",
+        "gclid",
+        "dclid",
+        "msclkid",
+        "mc_cid",
+        "mc_eid",
+        "igshid",
+        "yclid",
+        "_hsenc",
+        "_hsmi",
+        "ref_src",
+    }
+)
+TRACKING_PREFIXES = ("utm_",)
+DEFAULT_PORTS = {"http": 80, "https": 443}
 
-def normalize_url(url: str) -> str:
-    parsed = urlparse(url)
-    scheme = parsed.scheme or "http"
+
+@dataclass(frozen=True)
+class CanonicalRules:
+    lowercase_host: bool = True
+    strip_default_port: bool = True
+    strip_fragment: bool = True  # "#!" and "#/" client-side routes are kept
+    strip_tracking: bool = True
+    sort_query: bool = True
+    normalize_path: bool = True  # dot segments and percent-encoding case
+    strip_www: bool = False
+    strip_params: FrozenSet[str] = frozenset()
+
+
+DEFAULT_RULES = CanonicalRules()
+
+
+def is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def _canonical_query(query: str, rules: CanonicalRules) -> str:
+    # Work on raw "k=v" pairs so the original encoding of values is preserved
+    if not query:
+        return query
+    pairs = [p for p in query.split("&") if p]
+    extra = {p.lower() for p in rules.strip_params}
+    kept: List[str] = []
+    for pair in pairs:
+        name = unquote_plus(pair.split("=", 1)[0]).lower()
+        if rules.strip_tracking and is_tracking_param(name):
+            continue
+        if name in extra:
+            continue
+        kept.append(pair)
+    if rules.sort_query:
+        kept.sort(key=lambda p: unquote_plus(p.split("=", 1)[0]))
+    return "&".join(kept)
+
+
+def strip_tracking_params(query: str) -> str:
+    return _canonical_query(query, CanonicalRules(sort_query=False))
+
+
+def _pct_normalize(m: "re.Match[str]") -> str:
+    ch = chr(int(m.group(1), 16))
+    return ch if ch in _UNRESERVED else "%" + m.group(1).upper()
+
+
+def _normalize_path(path: str) -> str:
+    path = _pct_re.sub(_pct_normalize, path)
+    if "/." not in path:
+        return path
+    out: List[str] = []
+    segments = path.split("/")
+    for seg in segments[1:]:
+        if seg == ".":
+            continue
+        if seg == "..":
+            if out:
+                out.pop()
+            continue
+        out.append(seg)
+    if segments[-1] in (".", ".."):
+        out.append("")
+    return "/" + "/".join(out)
+
+
+def canonicalize_url(url: str, rules: Optional[CanonicalRules] = None) -> str:
+    """Rewrite ``url`` so equivalent addresses compare equal.
+
+    Lowercases scheme and host, drops default ports, tracking parameters and
+    fragments, sorts query parameters and resolves dot segments, each step
+    switchable through ``rules``.
+    """
+    rules = rules or DEFAULT_RULES
+    parsed = urlparse(url.strip())
+    scheme = (parsed.scheme or "http").lower()
     netloc = parsed.netloc
+    if parsed.hostname is not None:
+        hostport = netloc.rsplit("@", 1)[-1]
+        host = hostport[1 : hostport.find("]")] if hostport.startswith("[") else hostport.split(":")[0]
+        host = host.rstrip(".")
+        if rules.lowercase_host:
+            host = host.lower()
+        if rules.strip_www and host.lower().startswith("www."):
+            host = host[4:]
+        if ":" in host:
+            host = f"[{host}]"
+        try:
+            port = parsed.port
+        except ValueError:
+            port = None
+        if port is not None and not (rules.strip_default_port and DEFAULT_PORTS.get(scheme) == port):
+            host = f"{host}:{port}"
+        userinfo = netloc.rsplit("@", 1)[0] + "@" if "@" in netloc else ""
+        netloc = userinfo + host
     path = parsed.path or "/"
-    return urlunparse((scheme, netloc, path, "", parsed.query, parsed.fragment))
+    if rules.normalize_path:
+        path = _normalize_path(path)
+    query = _canonical_query(parsed.query, rules)
+    fragment = parsed.fragment
+    if rules.strip_fragment and not fragment.startswith(("!", "/")):
+        fragment = ""
+    return urlunparse((scheme, netloc, path, parsed.params, query, fragment))
+
+
+def normalize_url(url: str) -> str:
+    return canonicalize_url(url)
 
 
 def slugify(text: str, max_len: int = 80) -> str:
@@ -25,4 +150,3 @@ def slugify(text: str, max_len: int = 80) -> str:
         text = text[:max_len]
         text = text.rstrip("-")
     return text
-
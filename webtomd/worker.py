@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .batch import read_url_list
+from .jobs import DONE, FAILED, IN_FLIGHT, PENDING, Job, JobQueue, JobStore, check_options
+from .pipeline import RunReport
+from .utils.resp import RespClient
+from .utils.url import CanonicalRules, canonicalize_url
+
+
+class RedisQueue(JobQueue):
+    """Job queue shared by workers on many hosts, over the Redis protocol.
+
+    Keys (under ``prefix``):
+
+    - ``queue``: sorted set of job ids scored by when they may next be
+      claimed. Claimed jobs are pushed to their lease deadline, so a
+      crashed worker's jobs surface again once the lease runs out.
+    - ``lease:<id>``: owner of a claimed job, ``SET NX`` with an expiry.
+    - ``jobs``, ``state``, ``reports``: job payloads, states and final reports.
+    - ``held:<worker>``, ``workers:*``: per-worker holdings and progress.
+
+    Only plain commands are used (no Lua or transactions), so a small
+    stand-in server is enough for tests.
+    """
+
+    def __init__(
+        self,
+        client: RespClient,
+        prefix: str = "webtomd",
+        max_attempts: int = 3,
+        backoff: float = 30.0,
+        max_backoff: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        super().__init__(max_attempts, backoff, max_backoff, clock)
+        self.r = client
+        self.p = prefix
+
+    def _k(self, *parts: str) -> str:
+        return ":".join((self.p,) + parts)
+
+    def close(self) -> None:
+        self.r.close()
+
+    @staticmethod
+    def _record(job: Job) -> str:
+        return json.dumps({"attempts": job.attempts, "html": job.html, "options": job.options})
+
+    def _load(self, job_id: str, raw: Optional[str]) -> Job:
+        data = json.loads(raw) if raw else {}
+        return Job(job_id, data.get("attempts", 0), data.get("html"), data.get("options") or {})
+
+    def put(self, jobs: Iterable[Job]) -> int:
+        jobs = list(jobs)
+        created = self.r.pipeline([("HSETNX", self._k("jobs"), job.url, self._record(job)) for job in jobs])
+        new = [job for job, ok in zip(jobs, created) if ok]
+        commands: List[Tuple[Any, ...]] = []
+        for job in new:
+            commands.append(("HSET", self._k("state"), job.url, PENDING))
+            commands.append(("ZADD", self._k("queue"), "NX", 0, job.url))
+        self.r.pipeline(commands)
+        return len(new)
+
+    def claim(self, limit: int, worker: str = "local", lease: float = 600.0) -> List[Job]:
+        now = self.clock()
+        candidates = self.r.execute("ZRANGEBYSCORE", self._k("queue"), "-inf", now, "LIMIT", 0, limit)
+        if not candidates:
+            return []
+        won = self.r.pipeline(
+            [("SET", self._k("lease", job_id), worker, "NX", "PX", int(lease * 1000)) for job_id in candidates]
+        )
+        ids = [job_id for job_id, ok in zip(candidates, won) if ok == "OK"]
+        if not ids:
+            return []
+        # A job finished by another worker between the range read and the lease
+        states = self.r.pipeline([("HGET", self._k("state"), job_id) for job_id in ids])
+        stale = [job_id for job_id, state in zip(ids, states) if state in (DONE, FAILED, None)]
+        self.r.pipeline([("DEL", self._k("lease", job_id)) for job_id in stale])
+        ids = [job_id for job_id in ids if job_id not in stale]
+        raws = self.r.pipeline([("HGET", self._k("jobs"), job_id) for job_id in ids])
+        jobs = []
+        commands: List[Tuple[Any, ...]] = []
+        for job_id, raw in zip(ids, raws):
+            job = self._load(job_id, raw)
+            job.attempts += 1
+            jobs.append(job)
+            commands += [
+                ("HSET", self._k("jobs"), job_id, self._record(job)),
+                ("HSET", self._k("state"), job_id, IN_FLIGHT),
+                ("ZADD", self._k("queue"), "XX", now + lease, job_id),
+                ("SADD", self._k("held", worker), job_id),
+            ]
+        commands += [
+            ("HSETNX", self._k("workers", "started"), worker, now),
+            ("HSET", self._k("workers", "seen"), worker, now),
+        ]
+        self.r.pipeline(commands)
+        return jobs
+
+    def _owned(self, jobs: List[Job], worker: str) -> List[Job]:
+        owners = self.r.pipeline([("GET", self._k("lease", job.url)) for job in jobs])
+        return [job for job, owner in zip(jobs, owners) if owner == worker]
+
+    def heartbeat(self, jobs: Iterable[Job], worker: str, lease: float) -> None:
+        now = self.clock()
+        commands: List[Tuple[Any, ...]] = [("HSET", self._k("workers", "seen"), worker, now)]
+        for job in self._owned(list(jobs), worker):
+            commands.append(("PEXPIRE", self._k("lease", job.url), int(lease * 1000)))
+            commands.append(("ZADD", self._k("queue"), "XX", now + lease, job.url))
+        self.r.pipeline(commands)
+
+    def release(self, jobs: Iterable[Job], worker: str = "local") -> None:
+        now = self.clock()
+        commands: List[Tuple[Any, ...]] = []
+        for job in self._owned(list(jobs), worker):
+            job.attempts -= 1
+            commands += [
+                ("HSET", self._k("jobs"), job.url, self._record(job)),
+                ("HSET", self._k("state"), job.url, PENDING),
+                ("ZADD", self._k("queue"), "XX", now, job.url),
+                ("SREM", self._k("held", worker), job.url),
+                ("DEL", self._k("lease", job.url)),
+            ]
+        self.r.pipeline(commands)
+
+    def release_worker(self, worker: str) -> int:
+        ids = self.r.execute("SMEMBERS", self._k("held", worker)) or []
+        raws = self.r.pipeline([("HGET", self._k("jobs"), job_id) for job_id in ids])
+        jobs = self._owned([self._load(i, raw) for i, raw in zip(ids, raws)], worker)
+        self.release(jobs, worker)
+        self.r.execute("DEL", self._k("held", worker))
+        return len(jobs)
+
+    def complete(self, results: Iterable[Tuple[Job, RunReport]], worker: str = "local") -> None:
+        now = self.clock()
+        results = list(results)
+        owned = {job.url for job in self._owned([job for job, _ in results], worker)}
+        counts: Counter = Counter()
+        commands: List[Tuple[Any, ...]] = []
+        for job, report in results:
+            if job.url not in owned:
+                continue
+            state, next_at = self.outcome(job, report, now)
+            counts[state] += 1
+            # State first: a worker that wins the lease after DEL sees the job is finished
+            commands.append(("HSET", self._k("state"), job.url, state))
+            if state == PENDING:
+                commands.append(("ZADD", self._k("queue"), "XX", next_at, job.url))
+            else:
+                commands.append(("HSET", self._k("reports"), job.url, json.dumps(report.to_dict())))
+                commands.append(("ZREM", self._k("queue"), job.url))
+            commands.append(("SREM", self._k("held", worker), job.url))
+            commands.append(("DEL", self._k("lease", job.url)))
+        commands += [
+            ("HINCRBY", self._k("workers", "done"), worker, counts[DONE]),
+            ("HINCRBY", self._k("workers", "failed"), worker, counts[FAILED]),
+            ("HSET", self._k("workers", "seen"), worker, now),
+        ]
+        self.r.pipeline(commands)
+
+    def counts(self) -> Dict[str, int]:
+        counts = {PENDING: 0, IN_FLIGHT: 0, DONE: 0, FAILED: 0}
+        states = self.r.execute("HGETALL", self._k("state")) or []
+        counts.update(Counter(states[1::2]))
+        return counts
+
+    def next_wakeup(self) -> Optional[float]:
+        first = self.r.execute("ZRANGE", self._k("queue"), 0, 0, "WITHSCORES")
+        return float(first[1]) if first else None
+
+    def reports(self, states: Iterable[str] = (DONE, FAILED)) -> Iterator[Dict]:
+        states = set(states)
+        flat = self.r.execute("HGETALL", self._k("reports")) or []
+        current = self.r.pipeline([("HGET", self._k("state"), job_id) for job_id in flat[::2]])
+        for report, state in zip(flat[1::2], current):
+            if state in states:
+                yield json.loads(report)
+
+    def worker_stats(self) -> Dict[str, Dict[str, float]]:
+        fields = ("started", "seen", "done", "failed")
+        hashes = self.r.pipeline([("HGETALL", self._k("workers", f)) for f in fields])
+        stats: Dict[str, Dict[str, float]] = {}
+        for name, flat in zip(fields, hashes):
+            for worker, value in zip(flat[::2], flat[1::2]):
+                key = "last_seen" if name == "seen" else name
+                stats.setdefault(worker, {"done": 0, "failed": 0})[key] = float(value)
+        return stats
+
+
+def open_queue(spec: str, prefix: str = "webtomd", **kwargs: Any) -> JobQueue:
+    """``redis://host:port/db`` or ``sqlite:///path`` (a bare path means SQLite)."""
+    if spec.startswith("redis://"):
+        return RedisQueue(RespClient.from_url(spec), prefix, **kwargs)
+    if spec.startswith("sqlite://"):
+        spec = spec[len("sqlite://") :]
+    return JobStore(Path(spec), **kwargs)
+
+
+def read_jobs(path: Path, rules: Optional[CanonicalRules] = None) -> List[Job]:
+    """URL list, or JSONL with ``{"url", "html"?, "options"?}`` per line (``.jsonl``)."""
+    if path.suffix != ".jsonl":
+        return [Job(canonicalize_url(u, rules)) for u in read_url_list(path)]
+    jobs = []
+    for n, line in enumerate(path.read_text(encoding="utf-8").splitlines(), 1):
+        if not line.strip():
+            continue
+        data = json.loads(line)
+        if not data.get("url"):
+            raise ValueError(f"{path}:{n}: job without url")
+        jobs.append(Job(canonicalize_url(data["url"], rules), 0, data.get("html"), check_options(data.get("options") or {})))
+    return jobs
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def format_progress(queue: JobQueue, now: Optional[float] = None) -> str:
+    """Queue totals plus per-worker counts and pages per minute."""
+    now = queue.clock() if now is None else now
+    counts = queue.counts()
+    total = sum(counts.values())
+    lines = [f"jobs      {total}  " + "  ".join(f"{k} {v}" for k, v in counts.items())]
+    stats = queue.worker_stats()
+    rate_sum = 0.0
+    for worker, s in stats.items():
+        elapsed = max(s.get("last_seen", now) - s.get("started", now), 1e-9)
+        rate = s["done"] * 60 / elapsed if s["done"] else 0.0
+        idle = now - s.get("last_seen", now)
+        if idle < 300:
+            rate_sum += rate
+        lines.append(f"  {worker:<32} done {int(s['done']):6d}  failed {int(s['failed']):5d}  {rate:7.1f}/min  seen {idle:5.0f}s ago")
+    remaining = counts[PENDING] + counts[IN_FLIGHT]
+    eta = f"  eta {remaining / rate_sum:.0f} min" if rate_sum and remaining else ""
+    lines.append(f"throughput {rate_sum:.1f} pages/min{eta}")
+    return "\n".join(lines)